@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Hammer `progress`/`pause`/`resume` from several processes sharing one data
+dir, then check that no update was lost.
+
+    python benchmarks/concurrency_stress.py
+    python benchmarks/concurrency_stress.py --processes 8 --iterations 50 --store sqlite
+
+Every worker owns a few todos and drives each one through `progress`, then
+`pause`/`resume` cycles, ending on `pause`. Afterwards each of those todos
+must be Paused with a stopped timer in the timer store; anything else is a lost
+update. Per-command latency (including time spent waiting for locks) is
+reported as p50/p99.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def worker(data_dir, store, todo_ids, iterations, start, results):
+    os.environ["FLECK_DATA_DIR"] = data_dir
+    os.environ["FLECK_NO_DAEMON"] = "1"
+    os.environ["FLECK_STORE"] = store
+    sys.path.insert(0, str(REPO_ROOT))
+    from click.testing import CliRunner
+    from fleck.cli_new_1 import cli
+
+    runner = CliRunner()
+    samples, failures = [], []
+
+    def run(*args):
+        started = time.perf_counter()
+        result = runner.invoke(cli, list(args))
+        samples.append(time.perf_counter() - started)
+        if result.exit_code != 0:
+            failures.append(f"{' '.join(args)}: {result.output.strip() or result.exception!r}")
+
+    start.wait()
+    for todo_id in todo_ids:
+        run("progress", todo_id)
+    for _ in range(iterations):
+        for todo_id in todo_ids:
+            run("pause", todo_id)
+        for todo_id in todo_ids:
+            run("resume", todo_id)
+    for todo_id in todo_ids:
+        run("pause", todo_id)
+    results.put((samples, failures))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4, help="concurrent worker processes")
+    parser.add_argument("--todos", type=int, default=3, help="todos driven by each worker")
+    parser.add_argument("--iterations", type=int, default=20, help="pause/resume cycles per todo")
+    parser.add_argument("--store", choices=["json", "sqlite"], default="json", help="todo store to run against")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="fleck-stress-")
+    os.environ["FLECK_DATA_DIR"] = data_dir
+    os.environ["FLECK_NO_DAEMON"] = "1"
+    os.environ["FLECK_STORE"] = "json"
+    sys.path.insert(0, str(REPO_ROOT))
+    sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+    from click.testing import CliRunner
+    from datagen import generate
+    from fleck.cli_new_1 import cli
+    from fleck.config import get_current_workspace
+
+    try:
+        generate(data_dir, workspaces=1, todos=0, timers=0, apps=0, folders=0, tabs=0)
+        runner = CliRunner()
+        total = args.processes * args.todos
+        for n in range(total):
+            runner.invoke(cli, ["add", f"stress todo {n}"])
+        if args.store == "sqlite":
+            result = runner.invoke(cli, ["store", "migrate"])
+            if result.exit_code != 0:
+                raise RuntimeError(f"`fleck store migrate` failed:\n{result.output}")
+        os.environ["FLECK_STORE"] = args.store
+
+        from fleck.todo_store import get_store, reset_store
+        reset_store()
+        workspace = get_current_workspace()
+        ids = sorted(get_store().todos(workspace), key=int)[:total]
+
+        ctx = multiprocessing.get_context("spawn")
+        start, results = ctx.Event(), ctx.Queue()
+        workers = [
+            ctx.Process(target=worker, args=(data_dir, args.store, ids[i::args.processes], args.iterations, start, results))
+            for i in range(args.processes)
+        ]
+        for process in workers:
+            process.start()
+        started = time.perf_counter()
+        start.set()
+        samples, failures = [], []
+        for _ in workers:
+            worker_samples, worker_failures = results.get()
+            samples.extend(worker_samples)
+            failures.extend(worker_failures)
+        for process in workers:
+            process.join()
+        wall = time.perf_counter() - started
+
+        from fleck.timer_utils import load_timer_data
+        reset_store()
+        store = get_store()
+        timers = load_timer_data()
+        lost = []
+        for todo_id in ids:
+            status = store.get_todo(workspace, todo_id)["status"]
+            timer = timers.get(f"{workspace}:{todo_id}")
+            if status != "Paused":
+                lost.append(f"#{todo_id}: todo is {status}")
+            if timer is None or timer["is_running"]:
+                lost.append(f"#{todo_id}: timer is {'missing' if timer is None else 'still running'}")
+
+        print(f"{args.processes} processes x {args.todos} todos x {args.iterations} cycles, {args.store} store: "
+              f"{len(samples)} commands in {wall:.1f} s")
+        print(f"  latency   p50 {percentile(samples, 0.5) * 1000:7.1f} ms   p99 {percentile(samples, 0.99) * 1000:7.1f} ms")
+        print(f"  failed commands  {len(failures)}")
+        print(f"  lost updates     {len(lost)}")
+        for line in (failures + lost)[:10]:
+            print(f"    {line}")
+        sys.exit(1 if failures or lost else 0)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
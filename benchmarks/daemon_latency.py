@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Latency comparison of fleckd (daemon mode) vs. direct file access.
+
+Builds a scratch data dir with one active workspace holding --todos todos,
+then times the same commands end to end (`python -m fleck ...`) with the
+daemon stopped and running, plus the raw request round trip without process
+startup.
+
+    python benchmarks/daemon_latency.py --todos 2000 --runs 20
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = [
+    ["flag", "1", "high"],
+    ["add", "benchmark todo"],
+    ["list", "todo"],
+]
+
+
+def build_data_dir(path, todo_count):
+    sessions = Path(path) / "sessions"
+    sessions.mkdir(parents=True, exist_ok=True)
+    with open(sessions / "current_session.json", "w") as f:
+        json.dump({"current": "bench"}, f)
+    with open(sessions / "bench.json", "w") as f:
+        json.dump({"timestamp": "", "applications": [], "explorer": [],
+                   "chrome_tabs": [], "brave_tabs": [], "edge_tabs": []}, f)
+
+    now = "2025-01-01T09:00:00"
+    todos = {
+        str(i): {"description": f"todo {i}", "status": "To Do", "priority": None,
+                 "created_at": now, "updated_at": now}
+        for i in range(1, todo_count + 1)
+    }
+    data = {"current_task": None, "tasks": {"bench": {"id": 1, "created_at": now, "updated_at": now, "todos": todos}}}
+    with open(Path(path) / "todos.json", "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"median {statistics.median(samples) * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms"
+
+
+def time_process(argv, env, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "fleck"] + argv, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def time_request(argv, runs):
+    from fleck import client
+
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = client.request({"op": "run", "argv": argv, "width": 120, "color": False})
+        samples.append(time.perf_counter() - started)
+        if response is None:
+            raise RuntimeError("fleckd stopped answering")
+    return samples
+
+
+def time_direct_in_process(argv, runs):
+    import io
+    from contextlib import redirect_stdout
+    from fleck.shell import invoke
+
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            invoke(argv)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--todos", type=int, default=2000, help="todos in the benchmark workspace")
+    parser.add_argument("--runs", type=int, default=15, help="samples per command and mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        build_data_dir(data_dir, args.todos)
+        os.environ["FLECK_DATA_DIR"] = data_dir
+        sys.path.insert(0, str(REPO_ROOT))
+        env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+        direct_env = dict(env, FLECK_NO_DAEMON="1")
+
+        print(f"{args.todos} todos, {args.runs} runs per command\n")
+        print("end to end (python -m fleck ...):")
+        direct = {" ".join(argv): time_process(argv, direct_env, args.runs) for argv in COMMANDS}
+
+        server = subprocess.Popen([sys.executable, "-m", "fleck.daemon"], env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            from fleck import client
+            for _ in range(100):
+                if client.request({"op": "ping"}, timeout=1) is not None:
+                    break
+                time.sleep(0.05)
+            else:
+                raise RuntimeError("fleckd did not start")
+
+            via_daemon = {" ".join(argv): time_process(argv, env, args.runs) for argv in COMMANDS}
+            for name in direct:
+                print(f"  {name:<20} direct  {summarize(direct[name])}")
+                print(f"  {'':<20} daemon  {summarize(via_daemon[name])}")
+
+            print("\nin process (no interpreter startup):")
+            requests = {" ".join(argv): time_request(argv, args.runs) for argv in COMMANDS}
+        finally:
+            client.request({"op": "shutdown"}, timeout=5)
+            server.wait(timeout=10)
+
+        in_process = {" ".join(argv): time_direct_in_process(argv, args.runs) for argv in COMMANDS}
+        for name in direct:
+            print(f"  {name:<20} direct  {summarize(in_process[name])}")
+            print(f"  {'':<20} daemon  {summarize(requests[name])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Synthetic data dir generator for the benchmarks.
+
+Builds a FLECK_DATA_DIR with N workspaces of M todos each, K running or
+paused timers in per-workspace timer shards and a session file per workspace with the
+given number of apps, Explorer folders and browser tabs. Output is
+deterministic for a given --seed.
+
+    python benchmarks/datagen.py /tmp/fleck-bench --workspaces 50 --todos 200 --timers 100
+    FLECK_DATA_DIR=/tmp/fleck-bench fleck list
+"""
+import json
+import random
+import argparse
+from urllib.parse import quote
+from pathlib import Path
+
+STATUSES = ["To Do", "Done"]
+PRIORITIES = ["high", "medium", "low", None]
+APP_NAMES = ["chrome", "brave", "msedge", "code", "slack", "notepad", "explorer", "spotify", "teams", "outlook"]
+BROWSER_KEYS = {"chrome": "chrome_tabs", "brave": "brave_tabs", "msedge": "edge_tabs"}
+
+
+def _timestamp(rng):
+    return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00"
+
+
+def _session(rng, name, apps, folders, tabs):
+    session = {
+        "timestamp": _timestamp(rng),
+        "applications": [
+            {"name": APP_NAMES[i % len(APP_NAMES)], "title": f"{name} window {i}",
+             "path": f"C:\\Program Files\\App{i}\\app{i}.exe"}
+            for i in range(apps)
+        ],
+        "explorer": [{"title": f"folder{i}", "path": f"C:\\Users\\bench\\{name}\\folder{i}"} for i in range(folders)],
+    }
+    for browser, key in BROWSER_KEYS.items():
+        session[key] = [
+            {"title": f"{browser} tab {i}", "url": f"https://example.com/{name}/{browser}/{i}",
+             "browser": browser, "timestamp": 13300000000000000 + rng.randint(0, 10 ** 9)}
+            for i in range(tabs)
+        ]
+    return session
+
+
+def generate(path, workspaces=10, todos=100, timers=10, apps=10, folders=5, tabs=20, seed=0):
+    """Write a synthetic data dir to ``path`` and return a summary dict."""
+    rng = random.Random(seed)
+    root = Path(path)
+    sessions_dir = root / "sessions"
+    sessions_dir.mkdir(parents=True, exist_ok=True)
+
+    names = [f"ws{i:04d}" for i in range(workspaces)]
+    data = {"current_task": None, "tasks": {}}
+    for task_id, name in enumerate(names, start=1):
+        created = _timestamp(rng)
+        task_todos = {}
+        for i in range(1, todos + 1):
+            status = rng.choice(STATUSES)
+            todo = {
+                "description": f"{name} todo {i}",
+                "status": status,
+                "priority": rng.choice(PRIORITIES),
+                "created_at": created,
+                "updated_at": created,
+            }
+            if status == "Done":
+                todo["time_spent"] = rng.uniform(60, 7200)
+            task_todos[str(i)] = todo
+        data["tasks"][name] = {"id": task_id, "created_at": created, "updated_at": created, "todos": task_todos}
+
+        with open(sessions_dir / f"{name}.json", "w") as f:
+            json.dump(_session(rng, name, apps, folders, tabs), f, indent=2)
+
+    # Spread the timers over random open todos; even ones run, odd ones are paused
+    timer_data = {}  # workspace -> {todo_id: timer}
+    candidates = [(name, todo_id) for name in names for todo_id, todo in data["tasks"][name]["todos"].items()
+                  if todo["status"] != "Done"]
+    for n, (name, todo_id) in enumerate(rng.sample(candidates, min(timers, len(candidates)))):
+        running = n % 2 == 0
+        start = 1_700_000_000 + rng.randint(0, 10 ** 6)
+        timer_data.setdefault(name, {})[todo_id] = {
+            "start_time": start,
+            "elapsed": rng.uniform(0, 3600),
+            "is_running": running,
+            "paused_at": None if running else start + 60,
+        }
+        data["tasks"][name]["todos"][todo_id]["status"] = "In Progress" if running else "Paused"
+
+    with open(root / "todos.json", "w") as f:
+        json.dump(data, f, indent=2)
+    timer_dir = root / "timers"
+    timer_dir.mkdir(exist_ok=True)
+    for name, shard in timer_data.items():
+        with open(timer_dir / f"{quote(name, safe='')}.json", "w") as f:
+            json.dump(shard, f, indent=2)
+    with open(sessions_dir / "current_session.json", "w") as f:
+        json.dump({"current": names[0] if names else ""}, f)
+
+    return {"workspaces": workspaces, "todos": workspaces * todos, "timers": sum(map(len, timer_data.values()))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Data dir to create (used as FLECK_DATA_DIR)")
+    parser.add_argument("--workspaces", type=int, default=10)
+    parser.add_argument("--todos", type=int, default=100, help="Todos per workspace")
+    parser.add_argument("--timers", type=int, default=10, help="Running/paused timers in total")
+    parser.add_argument("--apps", type=int, default=10, help="Applications per session file")
+    parser.add_argument("--folders", type=int, default=5, help="Explorer folders per session file")
+    parser.add_argument("--tabs", type=int, default=20, help="Tabs per browser per session file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    summary = generate(args.path, args.workspaces, args.todos, args.timers, args.apps, args.folders, args.tabs, args.seed)
+    print(f"Wrote {summary['workspaces']} workspaces, {summary['todos']} todos and {summary['timers']} timers to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
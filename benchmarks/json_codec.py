@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Encode/decode speed of the JSON codec backends on large todo and session
+files, against the `json.load`/`json.dump(indent=2)` the stores used before.
+
+    python benchmarks/json_codec.py
+    python benchmarks/json_codec.py --todos 20000 --tabs 20000 --runs 20
+
+A data dir is generated with datagen.py; todos.json and one session file are
+then decoded and re-encoded with every installed backend (stdlib, orjson,
+msgspec) through fleck.json_codec.
+"""
+import gc
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import statistics
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def median_ms(fn, runs):
+    # Like timeit, keep the collector from charging one backend for another's garbage
+    samples = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(runs):
+            started = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspaces", type=int, default=10, help="workspaces in todos.json")
+    parser.add_argument("--todos", type=int, default=5000, help="todos per workspace")
+    parser.add_argument("--tabs", type=int, default=10000, help="browser tabs per session file")
+    parser.add_argument("--runs", type=int, default=10, help="timed repetitions per measurement")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="fleck-codec-")
+    os.environ["FLECK_DATA_DIR"] = data_dir
+    sys.path.insert(0, str(REPO_ROOT))
+    sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+    from datagen import generate
+    from fleck import json_codec
+
+    try:
+        generate(data_dir, workspaces=args.workspaces, todos=args.todos, timers=0, apps=50, folders=50, tabs=args.tabs)
+        files = {
+            "todos.json": Path(data_dir) / "todos.json",
+            "session": next((Path(data_dir) / "sessions").glob("ws*.json")),
+        }
+        for label, path in files.items():
+            raw = path.read_bytes()
+            doc = json.loads(raw)
+            pretty = json.dumps(doc, indent=2).encode("utf-8")
+            print(f"{label}: {len(pretty) / 1024:.0f} KiB with indent=2, "
+                  f"{len(json_codec.dumpb(doc, pretty=False)) / 1024:.0f} KiB compact")
+
+            before_decode = median_ms(lambda: json.loads(pretty), args.runs)
+            before_encode = median_ms(lambda: json.dumps(doc, indent=2), args.runs)
+            print(f"  {'json indent=2 (before)':24} decode {before_decode:8.2f} ms   encode {before_encode:8.2f} ms")
+            for name in json_codec.BACKENDS:
+                try:
+                    json_codec.use(name)
+                except ImportError:
+                    print(f"  {name:24} not installed")
+                    continue
+                compact = json_codec.dumpb(doc, pretty=False)
+                decode = median_ms(lambda: json_codec.loads(compact), args.runs)
+                encode = median_ms(lambda: json_codec.dumpb(doc, pretty=False), args.runs)
+                print(f"  {name:24} decode {decode:8.2f} ms   encode {encode:8.2f} ms   "
+                      f"({before_decode / decode:4.1f}x / {before_encode / encode:4.1f}x)")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
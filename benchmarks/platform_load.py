@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Load test of session capture, restore, focus mode and the session tracker
+against the simulated platform backend (runs headlessly on any OS).
+
+    python benchmarks/platform_load.py --apps 300 --tabs 5000 --folders 100
+    python benchmarks/platform_load.py --apps 300 --latency window_processes=0.4 --latency explorer_folders=0.1
+
+--latency adds a fixed delay (seconds) to a backend operation, e.g. to mimic
+a slow PowerShell Get-Process on a loaded machine.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"median {statistics.median(samples) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms"
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def parse_latency(values):
+    latency = {}
+    for value in values:
+        op, _, seconds = value.partition("=")
+        latency[op] = float(seconds)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", type=int, default=200, help="windowed applications")
+    parser.add_argument("--folders", type=int, default=50, help="open Explorer folders")
+    parser.add_argument("--tabs", type=int, default=2000, help="History entries per browser")
+    parser.add_argument("--background", type=int, default=300, help="windowless processes")
+    parser.add_argument("--latency", action="append", default=[], metavar="OP=SECONDS")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=200, help="tracker samples to take")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ["FLECK_DATA_DIR"] = data_dir
+        os.environ["FLECK_NO_DAEMON"] = "1"
+        sys.path.insert(0, str(REPO_ROOT))
+
+        import logging
+        from contextlib import redirect_stdout
+        from io import StringIO
+        from fleck.platform_backend import set_backend
+        from fleck.simulated_backend import SimulatedBackend, BROWSERS
+        from fleck.session_manager import save_session, restore_session
+        from fleck.session_tracker import track_once
+        from fleck.workspace_commands import kill_only_gui_apps
+
+        # The capture/restore code logs and prints per item; keep the output readable
+        logging.disable(logging.CRITICAL)
+        latency = parse_latency(args.latency)
+
+        def backend(apps):
+            return SimulatedBackend(apps=apps, explorer_folders=args.folders, tabs=dict.fromkeys(BROWSERS, args.tabs),
+                                    background_processes=args.background, latency=latency, root=Path(data_dir) / "sim")
+
+        print(f"{args.apps} apps, {args.folders} folders, {args.tabs} history entries per browser, "
+              f"{args.background} background processes, latency {latency or 'none'}\n")
+
+        with redirect_stdout(StringIO()):
+            set_backend(backend(args.apps))
+            # The first save has no previous session to look up browsers in; do it untimed
+            save_session("load")
+            save = timed(lambda: save_session("load"), args.runs)
+
+            # Restore onto an empty desktop so every app, tab and folder is reopened
+            restore = []
+            for _ in range(args.runs):
+                set_backend(backend(0))
+                restore += timed(lambda: restore_session("load"), 1)
+
+            focus = []
+            for _ in range(args.runs):
+                set_backend(backend(args.apps))
+                focus += timed(lambda: kill_only_gui_apps(["explorer.exe"], dry_run=False), 1)
+
+            set_backend(backend(args.apps))
+            started = time.perf_counter()
+            for _ in range(args.samples):
+                track_once("load")
+            tracker_rate = args.samples / (time.perf_counter() - started)
+
+        print(f"  save_session         {summarize(save)}")
+        print(f"  restore_session      {summarize(restore)}")
+        print(f"  kill_only_gui_apps   {summarize(focus)}")
+        print(f"  tracker              {tracker_rate:8.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
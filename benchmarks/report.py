@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Speed of `fleck report time` over years of tracked intervals, with the
+NumPy kernels and with the pure-Python fallback.
+
+    python benchmarks/report.py
+    python benchmarks/report.py --intervals 1000000 --years 3 --runs 3
+
+A data dir is generated with datagen.py, then --intervals stretches spread
+over --years of history are appended to the interval log through
+fleck.intervals. Loading (reading the log and the stores into columns) is
+timed on its own, first while it builds the column cache and then warm,
+followed by the whole report for every --by with each engine.
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import statistics
+import tempfile
+from datetime import date
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def median_ms(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--intervals", type=int, default=1_000_000, help="stretches in the interval log")
+    parser.add_argument("--years", type=float, default=3, help="history the stretches are spread over")
+    parser.add_argument("--workspaces", type=int, default=20, help="workspaces in todos.json")
+    parser.add_argument("--todos", type=int, default=500, help="todos per workspace")
+    parser.add_argument("--runs", type=int, default=3, help="timed repetitions per measurement")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="fleck-report-")
+    os.environ["FLECK_DATA_DIR"] = data_dir
+    os.environ["FLECK_NO_DAEMON"] = "1"
+    sys.path.insert(0, str(REPO_ROOT))
+    sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+    from datagen import generate
+    from fleck import intervals, report
+
+    try:
+        generate(data_dir, workspaces=args.workspaces, todos=args.todos, timers=0, apps=0, folders=0, tabs=0)
+        rng = random.Random(args.seed)
+        names = [f"ws{n:04d}" for n in range(args.workspaces)]
+        end = time.time()
+        start = end - args.years * 365 * 86400
+        step = (end - start) / args.intervals
+        started = time.perf_counter()
+        batch = []
+        for n in range(args.intervals):
+            at = start + n * step
+            batch.append((rng.choice(names), str(rng.randint(1, args.todos)), at, at + rng.uniform(60, 5400)))
+            if len(batch) == 50_000:
+                intervals.append(batch)
+                batch = []
+        intervals.append(batch)
+        size = sum(path.stat().st_size for path in Path(data_dir, "intervals").iterdir())
+        print(f"{args.intervals} intervals over {args.years:g} years appended in {time.perf_counter() - started:.1f} s "
+              f"({size / 2 ** 20:.0f} MiB)")
+
+        first, last = intervals.first_day(), date.today()
+        if report.np is not None:
+            # The first NumPy load also writes the per-segment column caches
+            build = median_ms(lambda: report.load_tracked(first, last), 1)
+            print(f"  build column cache         {build:9.1f} ms")
+        load = median_ms(lambda: report.load_tracked(first, last), args.runs)
+        print(f"  load interval log          {load:9.1f} ms")
+        for enabled in (True, False):
+            try:
+                report.use_numpy(enabled)
+            except ImportError:
+                print("  numpy not installed")
+                continue
+            for by in report.BY_CHOICES:
+                result = {}
+                elapsed = median_ms(lambda: result.update(report.time_report(by, None)), args.runs)
+                print(f"  {report.engine():6} --by {by:10} {elapsed:9.1f} ms   ({result['intervals']} intervals)")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
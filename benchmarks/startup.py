@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Startup benchmark for the fleck CLI based on `python -X importtime`.
+
+Runs `python -X importtime -m fleck <command>` against a scratch data dir and
+fails (exit code 1) when the command imports one of the heavy stacks that only
+workspace commands need, or when the import time attributable to fleck goes
+over the budget.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --command list --budget-ms 80 --runs 7
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that trivial commands must never pull in
+FORBIDDEN_MODULES = [
+    "psutil",
+    "win32gui",
+    "win32process",
+    "win32com",
+    "git",
+    "requests",
+    "fleck.session_manager",
+    "fleck.session_tracker",
+    "fleck.git_support",
+    "fleck.workspace_commands",
+]
+
+
+def prepare_data_dir(path):
+    """Create a small data dir with an active workspace."""
+    sessions = Path(path) / "sessions"
+    sessions.mkdir(parents=True, exist_ok=True)
+    with open(sessions / "current_session.json", "w") as f:
+        json.dump({"current": "bench"}, f)
+    with open(sessions / "bench.json", "w") as f:
+        json.dump({"timestamp": "", "applications": [], "explorer": [],
+                   "chrome_tabs": [], "brave_tabs": [], "edge_tabs": []}, f)
+    todos = {"current_task": None, "tasks": {"bench": {"id": 1, "todos": {}}}}
+    with open(Path(path) / "todos.json", "w") as f:
+        json.dump(todos, f)
+
+
+def parse_importtime(stderr):
+    """Return {module: cumulative_us} for top-level entries and the set of all imported modules."""
+    top_level = {}
+    imported = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        module = name.strip()
+        imported.add(module)
+        # Nested imports are indented by two extra spaces per level
+        if len(name) - len(name.lstrip()) == 1:
+            top_level[module] = int(cumulative_us)
+    return top_level, imported
+
+
+def run_once(command, data_dir):
+    env = dict(os.environ, FLECK_DATA_DIR=data_dir, PYTHONPATH=str(REPO_ROOT))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "fleck"] + command,
+        capture_output=True, text=True, env=env, cwd=data_dir, input="n\n"
+    )
+    top_level, imported = parse_importtime(result.stderr)
+    fleck_us = sum(us for module, us in top_level.items() if module == "fleck" or module.startswith("fleck."))
+    total_us = sum(top_level.values())
+    return fleck_us, total_us, imported, result.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--command", default="current", help="fleck subcommand to time (default: current)")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="max import time attributable to fleck")
+    parser.add_argument("--runs", type=int, default=5, help="number of runs; the best one is reported")
+    args = parser.parse_args()
+
+    command = args.command.split()
+    with tempfile.TemporaryDirectory() as data_dir:
+        prepare_data_dir(data_dir)
+        run_once(command, data_dir)  # warm the bytecode cache
+
+        samples = [run_once(command, data_dir) for _ in range(args.runs)]
+
+    fleck_ms = min(s[0] for s in samples) / 1000
+    total_ms = min(s[1] for s in samples) / 1000
+    imported = samples[0][2]
+    forbidden = sorted(m for m in imported if any(m == f or m.startswith(f + ".") for f in FORBIDDEN_MODULES))
+
+    print(f"fleck {args.command}: fleck imports {fleck_ms:.1f} ms, all imports {total_ms:.1f} ms "
+          f"(best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if forbidden:
+        print(f"FAIL: imported heavy modules: {', '.join(forbidden)}")
+        failed = True
+    if fleck_ms > args.budget_ms:
+        print(f"FAIL: fleck import time {fleck_ms:.1f} ms is over budget")
+        failed = True
+    if any(s[3] != 0 for s in samples):
+        print("FAIL: command exited with a non-zero status")
+        failed = True
+
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
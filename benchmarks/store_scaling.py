@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""How `fleck done` latency scales with the number of stored todos, for the
+JSON store (todos.json rewritten whole) and the SQLite store (one row updated).
+
+    python benchmarks/store_scaling.py
+    python benchmarks/store_scaling.py --sizes 1000,10000,100000 --workspaces 10 --runs 20
+
+For every size a data dir is generated with datagen.py, `done` is timed
+through click's CliRunner against todos.json, then the same data is migrated
+with `fleck store migrate` and timed again against todos.db.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import statistics
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"median {statistics.median(samples) * 1000:8.2f} ms   p95 {p95 * 1000:8.2f} ms"
+
+
+def time_done(runner, cli, todo_ids):
+    samples = []
+    for todo_id in todo_ids:
+        started = time.perf_counter()
+        result = runner.invoke(cli, ["done", todo_id, "--no-push"])
+        samples.append(time.perf_counter() - started)
+        if result.exit_code != 0:
+            raise RuntimeError(f"`fleck done {todo_id}` failed:\n{result.output}")
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated total todo counts")
+    parser.add_argument("--workspaces", type=int, default=10, help="workspaces the todos are spread over")
+    parser.add_argument("--runs", type=int, default=20, help="`done` calls per store and size")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    data_dir = tempfile.mkdtemp(prefix="fleck-store-")
+    # fleck reads FLECK_DATA_DIR at import time, so set it before importing anything
+    os.environ["FLECK_DATA_DIR"] = data_dir
+    os.environ["FLECK_NO_DAEMON"] = "1"
+    sys.path.insert(0, str(REPO_ROOT))
+    sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+    from click.testing import CliRunner
+    from datagen import generate
+    from fleck.cli_new_1 import cli
+    from fleck.config import get_current_workspace
+    from fleck.todo_store import STORE_ENV, get_store, reset_store
+
+    runner = CliRunner()
+    try:
+        for size in sizes:
+            shutil.rmtree(data_dir)
+            generate(data_dir, workspaces=args.workspaces, todos=size // args.workspaces, timers=0,
+                     apps=0, folders=0, tabs=0)
+            os.environ[STORE_ENV] = "json"
+            reset_store()
+            open_ids = list(get_store().todos(get_current_workspace(), "To Do"))
+            if len(open_ids) < 2 * args.runs:
+                raise RuntimeError(f"need {2 * args.runs} open todos in the current workspace, got {len(open_ids)}")
+
+            print(f"{size} todos ({args.workspaces} workspaces, {os.path.getsize(Path(data_dir) / 'todos.json') / 1024:.0f} KiB JSON)")
+            json_samples = time_done(runner, cli, open_ids[:args.runs])
+
+            del os.environ[STORE_ENV]
+            result = runner.invoke(cli, ["store", "migrate"])
+            if result.exit_code != 0:
+                raise RuntimeError(f"`fleck store migrate` failed:\n{result.output}")
+            os.environ[STORE_ENV] = "sqlite"
+            reset_store()
+            sqlite_samples = time_done(runner, cli, open_ids[args.runs:2 * args.runs])
+
+            print(f"  json     done  {summarize(json_samples)}")
+            print(f"  sqlite   done  {summarize(sqlite_samples)}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Benchmark suite for the todo/timer stores and the CLI commands.
+
+For every scale a synthetic data dir is generated (see datagen.py) and the
+suite times load_data/save_data, get_timer_status(es) and end-to-end `add`,
+`done`, `list` and `tasks` through click's CliRunner. Results are written as
+JSON so runs from different commits can be compared:
+
+    python benchmarks/suite.py --scales small,medium --output before.json
+    python benchmarks/suite.py --scales small,medium --compare before.json
+
+Commands that can't run on this machine (e.g. `tasks` without the Windows
+stack) are reported as skipped.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+SCALES = {
+    "small": {"workspaces": 5, "todos": 50, "timers": 10, "apps": 10, "folders": 5, "tabs": 20},
+    "medium": {"workspaces": 50, "todos": 200, "timers": 100, "apps": 20, "folders": 10, "tabs": 50},
+    "large": {"workspaces": 200, "todos": 1000, "timers": 1000, "apps": 50, "folders": 20, "tabs": 200},
+}
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+        "min_ms": round(samples[0] * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+
+def time_calls(fn, runs):
+    samples = []
+    for i in range(runs):
+        started = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+class Skipped(Exception):
+    pass
+
+
+def bench_stores(runs):
+    from fleck.todo_store import load_data, save_data
+    from fleck.timer_utils import load_timer_data, get_timer_status, get_timer_statuses
+
+    data = load_data()
+    keys = [key.split(":", 1) for key in load_timer_data()] or [["none", "1"]]
+    return {
+        "load_data": time_calls(lambda i: load_data(), runs),
+        "save_data": time_calls(lambda i: save_data(data), runs),
+        "get_timer_status": time_calls(lambda i: get_timer_status(*keys[i % len(keys)]), runs),
+        "get_timer_statuses": time_calls(lambda i: get_timer_statuses(keys[i % len(keys)][0]), runs),
+    }
+
+
+def bench_cli(runs):
+    from click.testing import CliRunner
+    from fleck.cli_new_1 import cli
+    from fleck.todo_store import load_data
+    from fleck.config import get_current_workspace
+
+    runner = CliRunner()
+
+    def invoke(argv):
+        result = runner.invoke(cli, argv, catch_exceptions=True)
+        if isinstance(result.exception, ImportError):
+            raise Skipped(f"{type(result.exception).__name__}: {result.exception}")
+        if result.exit_code != 0:
+            raise RuntimeError(f"`fleck {' '.join(argv)}` failed:\n{result.output}")
+
+    workspace = get_current_workspace()
+    open_ids = [todo_id for todo_id, todo in load_data()["tasks"][workspace]["todos"].items()
+                if todo["status"] == "To Do"]
+    if len(open_ids) < runs + 1:
+        raise RuntimeError(f"need at least {runs + 1} open todos for `done`, scale has {len(open_ids)}")
+
+    commands = {
+        "cli.add": lambda i: ["add", f"benchmark todo {i}"],
+        "cli.done": lambda i: ["done", open_ids[i + 1], "--no-push"],
+        "cli.list": lambda i: ["list"],
+        "cli.list_json": lambda i: ["list", "--json"],
+        "cli.tasks": lambda i: ["tasks"],
+    }
+    results = {}
+    for name, argv in commands.items():
+        try:
+            # Warm-up run: first-call imports are startup cost, measured by startup.py
+            invoke(argv(-1) if name != "cli.done" else ["done", open_ids[0], "--no-push"])
+            results[name] = time_calls(lambda i: invoke(argv(i)), runs)
+        except Skipped as e:
+            results[name] = str(e)
+    return results
+
+
+def run_scale(data_dir, scale, runs):
+    from datagen import generate
+
+    for child in Path(data_dir).iterdir():
+        if child.is_dir():
+            shutil.rmtree(child)
+        else:
+            child.unlink()
+    generate(data_dir, **SCALES[scale])
+
+    results = []
+    for group in (bench_stores, bench_cli):
+        for name, samples in group(runs).items():
+            entry = {"scale": scale, "name": name}
+            if isinstance(samples, str):
+                entry["skipped"] = samples
+            else:
+                entry.update(summarize(samples))
+            results.append(entry)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print the change against a previous results file. Returns the number of regressions."""
+    with open(baseline_path) as f:
+        baseline = {(r["scale"], r["name"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"\nvs. {baseline_path}:")
+    for r in results:
+        old = baseline.get((r["scale"], r["name"]))
+        if not old or "median_ms" not in old or "median_ms" not in r:
+            continue
+        change = (r["median_ms"] - old["median_ms"]) / old["median_ms"] * 100 if old["median_ms"] else 0.0
+        marker = ""
+        if change > threshold:
+            marker = "  REGRESSION"
+            regressions += 1
+        print(f"  {r['scale']:<7} {r['name']:<18} {old['median_ms']:9.2f} -> {r['median_ms']:9.2f} ms  {change:+6.1f}%{marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="small,medium", help=f"comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument("--runs", type=int, default=10, help="samples per benchmark and scale")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+
+    data_dir = tempfile.mkdtemp(prefix="fleck-bench-")
+    # fleck reads FLECK_DATA_DIR at import time, so set it before importing anything
+    os.environ["FLECK_DATA_DIR"] = data_dir
+    os.environ["FLECK_NO_DAEMON"] = "1"
+    sys.path.insert(0, str(REPO_ROOT))
+    sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+    results = []
+    try:
+        for scale in scales:
+            print(f"{scale}: {SCALES[scale]}")
+            for r in run_scale(data_dir, scale, args.runs):
+                results.append(r)
+                if "skipped" in r:
+                    print(f"  {r['name']:<18} skipped ({r['skipped']})")
+                else:
+                    print(f"  {r['name']:<18} median {r['median_ms']:9.2f} ms   p95 {r['p95_ms']:9.2f} ms")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "runs": args.runs,
+            "scales": {s: SCALES[s] for s in scales},
+        },
+        "results": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{commit or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from fleck.client import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+import os
+import gzip
+import re
+from datetime import datetime, timedelta
+
+import click
+
+from fleck import json_codec
+from fleck.config import ARCHIVE_DIR
+
+# Cold storage for finished work. Done todos are moved out of the todo store
+# into one gzip-compressed NDJSON file per workspace (archive/<name>.jsonl.gz),
+# one line per todo with its time_spent and an archived_at stamp. Every
+# archive run appends a new gzip member, and readers stream the file line by
+# line, so neither side ever holds the whole archive in memory.
+#
+# Moving a todo is a journaled delete in the store, so `fleck undo` brings it
+# back; readers skip archived copies of todos that are live again.
+#
+# `done` archives automatically once a workspace has more than
+# AUTO_ARCHIVE_MIN_DONE done todos, moving those finished more than
+# FLECK_ARCHIVE_AFTER ago (default 30d, "off" disables it).
+
+ARCHIVE_AFTER_ENV = "FLECK_ARCHIVE_AFTER"
+DEFAULT_ARCHIVE_AFTER = "30d"
+AUTO_ARCHIVE_MIN_DONE = 200
+AGE_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+def parse_age(value):
+    """Parse an age like "30d", "12h" or "2w" (a bare number means days) into a timedelta."""
+    match = re.fullmatch(r"\s*(\d+)\s*([mhdw]?)\s*", value or "")
+    if not match:
+        raise click.BadParameter(f"'{value}' is not an age like 30d, 12h or 2w")
+    return timedelta(**{AGE_UNITS[match.group(2) or "d"]: int(match.group(1))})
+
+
+def archive_path(task):
+    return ARCHIVE_DIR / f"{task}.jsonl.gz"
+
+
+def iter_archived(task, priority=None, skip_ids=()):
+    """Yield (todo_id, todo) for a workspace's archived todos, oldest archive first."""
+    path = archive_path(task)
+    if not path.exists():
+        return
+    seen = set(skip_ids)
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            try:
+                todo = json_codec.loads(line)
+            except json_codec.JSONDecodeError:
+                # A run interrupted mid-write leaves a torn last line behind
+                continue
+            todo_id = todo.pop("id")
+            if todo_id in seen:
+                continue
+            seen.add(todo_id)
+            if priority is not None and (todo.get("priority") or "none") != priority:
+                continue
+            yield todo_id, todo
+
+
+def archived_count(task):
+    return sum(1 for _ in iter_archived(task))
+
+
+def archive_todos(store, task, older_than):
+    """Move the task's done todos last updated more than ``older_than`` ago to its archive.
+
+    Returns the number of todos moved.
+    """
+    cutoff = (datetime.now() - older_than).isoformat()
+    with store.transaction():
+        todos = [(todo_id, todo) for todo_id, todo in store.todos(task, "Done").items()
+                 if (todo.get("updated_at") or "") <= cutoff]
+        if not todos:
+            return 0
+
+        # Archive first: a crash before the store commits leaves copies that
+        # readers skip, never lost todos
+        archived_at = datetime.now().isoformat()
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        with gzip.open(archive_path(task), 'at', encoding='utf-8') as f:
+            for todo_id, todo in todos:
+                f.write(json_codec.dumps(dict(todo, id=todo_id, archived_at=archived_at), pretty=False) + "\n")
+        for todo_id, _ in todos:
+            store.delete_todo(task, todo_id)
+    return len(todos)
+
+
+def maybe_archive(store, task):
+    """Apply the automatic archive policy to a workspace. Returns the number of todos moved."""
+    setting = os.environ.get(ARCHIVE_AFTER_ENV, DEFAULT_ARCHIVE_AFTER)
+    if setting.lower() in ("off", "never", "0"):
+        return 0
+    if store.count(task, "Done") <= AUTO_ARCHIVE_MIN_DONE:
+        return 0
+    return archive_todos(store, task, parse_age(setting))
+
+
+@click.command()
+@click.option('--older-than', 'older_than', default="30d", show_default=True,
+              help="Only archive todos finished at least this long ago (e.g. 0d, 12h, 2w)")
+@click.option('--all', 'all_workspaces', is_flag=True, help="Archive in every workspace, not just the current one")
+@click.option('--dry-run', is_flag=True, help="Only count what would be archived")
+def archive(older_than, all_workspaces, dry_run):
+    """Move done todos out of the todo store into compressed per-workspace archives."""
+    from fleck.config import get_current_workspace
+    from fleck.todo_store import get_store
+
+    age = parse_age(older_than)
+    store = get_store()
+    if all_workspaces:
+        tasks = store.task_names()
+    else:
+        current = get_current_workspace()
+        if not current:
+            raise click.ClickException("No active workspace. Use --all or switch to one first.")
+        tasks = [current]
+
+    total = 0
+    for task in tasks:
+        if dry_run:
+            cutoff = (datetime.now() - age).isoformat()
+            moved = sum(1 for todo in store.todos(task, "Done").values() if (todo.get("updated_at") or "") <= cutoff)
+        else:
+            moved = archive_todos(store, task, age)
+        if moved:
+            click.echo(f"{task}: {moved} todos {'would be ' if dry_run else ''}archived")
+        total += moved
+
+    verb = "Would archive" if dry_run else "Archived"
+    click.secho(f"{verb} {total} done todos finished more than {older_than} ago", fg="green" if total else "yellow")
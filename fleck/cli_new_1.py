@@ -1,170 +1,121 @@
 #!/usr/bin/env python3
 import os
-import sys
-import json
 import click
+from itertools import chain, islice
 from pathlib import Path
 from datetime import datetime
+from contextlib import contextmanager
 import logging
-from rich.console import Console
-from rich.table import Table
-from rich import box
-import subprocess
-from appdirs import user_data_dir
-
-# Add parent directory to path to import session_manager
-sys.path.append(str(Path(__file__).parent))
-from session_manager import (
-    save_session, 
-    load_session, 
-    restore_session, 
-    list_sessions, 
-    delete_session, 
-    get_session_summary
-)
-
-from config import get_current_workspace
-import getpass
-
-APP_NAME = "FleckCLI"
-APP_AUTHOR = getpass.getuser() # Replace as needed
-
-DATA_DIR = Path(user_data_dir(APP_NAME)+"/Data")
-SESSIONS_DIR = DATA_DIR / "sessions"
-TODO_FILE = DATA_DIR / "todos.json"
-LOGS_DIR = DATA_DIR / "logs"
 
-print(DATA_DIR)
-print(SESSIONS_DIR)
-
-os.makedirs(DATA_DIR,exist_ok=True)
-os.makedirs(SESSIONS_DIR, exist_ok=True)
-os.makedirs(LOGS_DIR, exist_ok=True)
+from fleck.config import (
+    SESSIONS_DIR,
+    TODO_FILE,
+    ensure_data_dirs,
+    get_current_workspace
+)
+from fleck.lazy_group import LazyGroup
+from fleck.profiling import PROFILE_MODES
+from fleck import state_cache
+from fleck import json_codec
+from fleck import completion
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("workspace_cli")
 
-# Setup rich console
-console = Console()
 
-CURRENT_WORKSPACE = get_current_workspace()
+class _LazyConsole:
+    """Create the rich console on first use so commands that never print
+    through rich (e.g. `fleck current`) don't pay for importing it."""
+    _console = None
 
-@click.group()
-def cli():
+    def __getattr__(self, name):
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console()
+        return getattr(_LazyConsole._console, name)
+
+# Setup rich console
+console = _LazyConsole()
+
+@contextmanager
+def console_output(file, width=None, color=None):
+    """Temporarily send rich output to ``file`` (fleckd uses this to capture a command's output)."""
+    from rich.console import Console
+    previous = _LazyConsole._console
+    _LazyConsole._console = Console(file=file, width=width, force_terminal=color, no_color=not color)
+    try:
+        yield
+    finally:
+        _LazyConsole._console = previous
+
+# Resolved in the group callback, right before a subcommand runs
+CURRENT_WORKSPACE = ""
+
+# Commands that need the session/platform stack are imported only when invoked
+LAZY_SUBCOMMANDS = {
+    "save": "fleck.workspace_commands:save",
+    "restore": "fleck.workspace_commands:restore",
+    "focus": "fleck.workspace_commands:focus",
+    "tasks": "fleck.workspace_commands:tasks",
+    "delete-workspace": "fleck.workspace_commands:delete_workspace",
+    "show": "fleck.workspace_commands:show",
+    "gui": "fleck.workspace_commands:gui",
+    "track-session": "fleck.workspace_commands:track_session",
+    "switch": "fleck.workspace_commands:switch",
+    "shell": "fleck.shell:shell",
+    "batch": "fleck.shell:batch",
+    "daemon": "fleck.daemon:daemon",
+    "perf": "fleck.metrics:perf",
+    "archive": "fleck.archive:archive",
+    "search": "fleck.search:search_command",
+    "store": "fleck.todo_store:store",
+    "undo": "fleck.journal:undo",
+    "log": "fleck.journal:log",
+    "history": "fleck.intervals:history",
+    "report": "fleck.report:report",
+    "today": "fleck.rollups:today",
+    "week": "fleck.rollups:week",
+    "rebuild-rollups": "fleck.rollups:rebuild_rollups",
+    "watch": "fleck.watch:watch",
+}
+
+class FleckGroup(LazyGroup):
+    def parse_args(self, ctx, args):
+        # --profile takes an optional value; don't let `fleck --profile list`
+        # read the command name as the profiling mode
+        args = [*args]
+        i = 0
+        while i < len(args) and args[i].startswith("-"):
+            if args[i] == "--profile" and (i + 1 == len(args) or args[i + 1] not in PROFILE_MODES):
+                args[i] = "--profile=cpu"
+            elif args[i] in ("--profile", "--profile-top"):
+                i += 1
+            i += 1
+        return super().parse_args(ctx, args)
+
+@click.group(cls=FleckGroup, lazy_subcommands=LAZY_SUBCOMMANDS)
+@click.option('--profile', type=click.Choice(PROFILE_MODES), is_flag=False, flag_value="cpu", default=None,
+              help="Profile the command with cProfile (cpu), tracemalloc (mem) or both (all)")
+@click.option('--profile-top', type=click.IntRange(min=1), default=20, help="Number of hotspots to print with --profile")
+@click.pass_context
+def cli(ctx, profile, profile_top):
     """
     Workspace Manager CLI - Save and restore application workspaces.
     
     This tool helps you save your current workspace (applications and browser tabs)
     and restore them later, making task switching more efficient.
     """
-    pass
-
-@cli.command()
-# @click.argument('task_name')
-def save():
-    """Save the current workspace for a specific task."""
-    with console.status(f"Saving workspace for task '{CURRENT_WORKSPACE}'...", spinner="dots"):
-        success, message = save_session(CURRENT_WORKSPACE)
-    
-    if success:
-        console.print(f"[green]✓[/green] {message}")
-    else:
-        console.print(f"[red]✗[/red] {message}")
-
-@cli.command()
-@click.argument('task_name')
-def restore(task_name):
-    """Restore a saved workspace for a specific task."""
-    # Check if session exists first
-    session_data = load_session(task_name)
-    if not session_data:
-        console.print(f"[red]✗[/red] No saved workspace found for task: {task_name}")
-        return
-    
-    # Show summary before restoring
-    display_summary(task_name)
-    
-    if click.confirm(f"Do you want to restore the workspace for '{task_name}'?"):
-        with console.status(f"Restoring workspace for task '{task_name}'...", spinner="dots"):
-            success, message = restore_session(task_name)
-        
-        if success:
-            console.print(f"[green]✓[/green] {message}")
-        else:
-            console.print(f"[red]✗[/red] {message}")
-
-import os
-import psutil
-import win32gui
-import win32process
-
-def get_gui_pids():
-    """Get the PIDs of all top-level visible GUI windows."""
-    gui_pids = set()
-
-    def callback(hwnd, _):
-        if win32gui.IsWindowVisible(hwnd) and win32gui.GetWindowText(hwnd):
-            try:
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                gui_pids.add(pid)
-            except Exception:
-                pass
-        return True
-
-    win32gui.EnumWindows(callback, None)
-    return gui_pids
-
-
-def kill_only_gui_apps(exclude_names=None, dry_run=True):
-    exclude_names = set(name.lower() for name in (exclude_names or []))
-    gui_pids = get_gui_pids()
-
-    for proc in psutil.process_iter(['pid', 'name']):
-        try:
-            name = proc.info['name'].lower()
-            pid = proc.info['pid']
-
-            if name in exclude_names or pid not in gui_pids:
-                continue
-
-            if dry_run:
-                print(f"[Dry Run] Would kill GUI app: {name} (PID: {pid})")
-            else:
-                proc.kill()
-                print(f"Killed GUI app: {name} (PID: {pid})")
-
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-
-
-@click.command()
-@click.argument('task_name')
-def focus(task_name):
-    """Enter Focus Mode: Close all apps and restore workspace for the given task."""
-    session_data = load_session(task_name)
-    if not session_data:
-        console.print(f"[red]✗[/red] No saved workspace found for task: {task_name}")
-        return
-
-    display_summary(task_name)
-    if click.confirm(f"Do you want to enter focus mode for '{task_name}'?"):
-        # with console.status(f"[yellow]Closing apps and restoring workspace for '{task_name}'...[/yellow]", spinner="dots"):
-            # Define processes to exclude (system critical + Python + this script)
-            exclude = ['explorer.exe', 'python.exe', 'code.exe', 'cmd.exe', 'powershell.exe','brave.exe',"fleck.exe"]  # Add more if needed
-
-            kill_only_gui_apps(exclude,False)
-            print("works")
-            switch_helper(task_name)
-            # success, message = switch_helper(task_name)
+    global CURRENT_WORKSPACE
+    CURRENT_WORKSPACE = get_current_workspace()
 
-            # if success:
-            #     console.print(f"[green]✓[/green] {message}")
-            # else:
-            #     console.print(f"[red]✗[/red] {message}")
+    if profile:
+        from fleck.profiling import Profiler
+        profiler = Profiler(ctx.invoked_subcommand or "fleck", profile, profile_top)
+        profiler.start()
+        # Runs once the subcommand has returned or raised (including Ctrl+C)
+        ctx.call_on_close(profiler.stop)
 
-cli.add_command(focus, name="focus")
-    
 from enum import Enum
 # Constants
 # TODO_FILE = Path(__file__).parent / "data" / "todos.json"
@@ -190,112 +141,79 @@ class Status(Enum):
 
 
 
-def load_data():
-    """Load todo data from file."""
-    if not TODO_FILE.exists():
-        return {"current_task": None, "tasks": {}}
-    
-    try:
-        with open(TODO_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {"current_task": None, "tasks": {}}
-
-def save_data(data):
-    """Save todo data to file."""
-    with open(TODO_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
 
 
-@cli.command()
-def tasks():
-    """List all available tasks."""
-    data = load_data()
-    sessions = list_sessions()
-
-    if not sessions:
-        console.print("[yellow]No saved workspaces found.[/yellow]")
-        return
-
-    table = Table(title="Saved Workspaces", box=box.ROUNDED)
-    table.add_column("ID")
-    table.add_column("Task", style="cyan")
-    table.add_column("Last Saved", style="green")
-    table.add_column("Apps", justify="right")
-    table.add_column("Chrome Tabs", justify="right")
-    table.add_column("Brave Tabs", justify="right")
-    table.add_column("Edge Tabs", justify="right")
-    table.add_column("Folders", justify="right")
-    table.add_column("Todo Count", justify="right")
-
-    for task_data in sessions:
-        task_name_raw = task_data["name"]
-        if task_name_raw == "current_session":
-            continue
-
-        # Highlight current workspace
-        task_name_display = (
-            f"[bold green]{task_name_raw} (current)[/bold green]"
-            if task_name_raw == CURRENT_WORKSPACE else task_name_raw
-        )
-
-        timestamp = "Unknown"
-        if task_data.get("timestamp"):
-            try:
-                dt = datetime.fromisoformat(task_data["timestamp"])
-                timestamp = dt.strftime("%Y-%m-%d %H:%M:%S")
-            except Exception:
-                pass
-
-        todo_count = len(data["tasks"].get(task_name_raw, {}).get("todos", []))
+def refresh_completion(store, task):
+    """Refresh the completion index for ``task``; SQLite serves todo completions itself."""
+    if not store.has_task(task):
+        completion.remove_workspace(task)
+    else:
+        completion.update_workspace(task, None if store.name == "sqlite" else store.open_todos(task))
 
-        table.add_row(
-            str(task_data.get("id", "-")),
-            task_name_display,
-            str(timestamp),
-            str(task_data.get("app_count", 0)),
-            str(task_data.get("chrome_tabs", 0)),
-            str(task_data.get("brave_tabs", 0)),
-            str(task_data.get("edge_tabs", 0)),
-            str(task_data.get("explorer", 0)),
-            str(todo_count)
-        )
 
-    console.print(table)
+def expand_todo_ids(values):
+    """Expand todo ID arguments like ("3", "5", "7-12") into a list of unique IDs."""
+    todo_ids = []
+    seen = set()
+    for value in values:
+        for part in value.split(","):
+            if not part:
+                continue
+            if "-" in part:
+                start, _, end = part.partition("-")
+                if not (start.isdigit() and end.isdigit()) or int(start) > int(end):
+                    raise click.BadParameter(f"'{part}' is not a valid range of todo IDs")
+                expanded = [str(i) for i in range(int(start), int(end) + 1)]
+            else:
+                expanded = [part]
+            for todo_id in expanded:
+                if todo_id not in seen:
+                    seen.add(todo_id)
+                    todo_ids.append(todo_id)
+    return todo_ids
 
 
 @cli.command()
-@click.argument('description')
+@click.argument('description', required=False)
 @click.option('--priority', type=click.Choice([p.value for p in Priority]), 
               default=Priority.NONE.value, help="Priority of the todo")
-def add(description, priority):
+@click.option('--from-file', 'from_file', type=click.File('r'),
+              help="Add one todo per non-empty line of FILE ('-' for stdin)")
+def add(description, priority, from_file):
     """Add a new todo to the current task."""
-    data = load_data()
+    from fleck.todo_store import get_store
+
+    if (description is None) == (from_file is None):
+        raise click.UsageError("Give either a DESCRIPTION or --from-file.")
+
     current_task = CURRENT_WORKSPACE
     
     if not current_task:
         console.print("[red]No active task. Use 'start <task_name>' to begin.[/red]")
         return
     
-    todo_id = str(len(data["tasks"][current_task]["todos"]) + 1)
-    data["tasks"][current_task]["todos"][todo_id] = {
-        "description": description,
-        "status": Status.TODO.value,
-        "priority": priority if priority != "None" else None,
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat()
-    }
-    
-    data["tasks"][current_task]["updated_at"] = datetime.now().isoformat()
-    save_data(data)
-    console.print(f"[green]Added todo #{todo_id} to task '{current_task}'[/green]")
-
-
-from fleck.timer_utils import start_timer, pause_timer
-from fleck.timer_utils import stop_timer_and_get_elapsed
-from fleck.timer_utils import get_timer_status, display_live_timer\
+    descriptions = [description] if from_file is None else [line.strip() for line in from_file if line.strip()]
+    store = get_store()
+    now = datetime.now().isoformat()
+    added = []
+    with store.transaction():
+        for description in descriptions:
+            added.append(store.add_todo(current_task, {
+                "description": description,
+                "status": Status.TODO.value,
+                "priority": priority if priority != "None" else None,
+                "created_at": now,
+                "updated_at": now
+            }))
+        if added:
+            refresh_completion(store, current_task)
+    if len(added) == 1:
+        console.print(f"[green]Added todo #{added[0]} to task '{current_task}'[/green]")
+    elif added:
+        console.print(f"[green]Added {len(added)} todos (#{added[0]}-#{added[-1]}) to task '{current_task}'[/green]")
+    else:
+        console.print(f"[yellow]No todos found in {from_file.name}[/yellow]")
 
-from fleck.git_support import git_push
 
 # @cli.command()
 # @click.argument('todo_id')
@@ -321,38 +239,66 @@ from fleck.git_support import git_push
 #     save_data(data)
 #     console.print(f"[green]Marked todo #{todo_id} as done. Total time: {format_seconds(elapsed)}[/green]")
 
+def _stop_timer(current_task, todo_id, todo):
+    """Stop the todo's timer, skipping the timer store for todos that never started one."""
+    from fleck.timer_utils import stop_timer_and_get_elapsed
+
+    if todo["status"] in (Status.IN_PROGRESS.value, Status.PAUSED.value):
+        return stop_timer_and_get_elapsed(current_task, todo_id)
+    return todo.get("time_spent", 0)
+
 @cli.command()
-@click.argument('todo_id')
-def done(todo_id):
-    """Mark a todo as done."""
-    data = load_data()
+@click.argument('todo_ids', nargs=-1, required=True, shell_complete=completion.complete_todo_ids)
+@click.option('--push/--no-push', default=None, help="Git push after marking done (asks when not given)")
+def done(todo_ids, push):
+    """Mark one or more todos as done (e.g. `fleck done 3 5 7-12`)."""
+    from fleck.todo_store import get_store
+    from fleck.timer_utils import timer_batch
+
     current_task = CURRENT_WORKSPACE
 
     if not current_task:
         console.print("[red]No active task. Use 'start <task_name>' to begin.[/red]")
         return
 
-    if todo_id not in data["tasks"][current_task]["todos"]:
-        console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
-        return
+    # One transaction, and one read and write of the timer store, for the whole batch of IDs
+    finished = []
+    store = get_store()
+    with state_cache.cached(), store.transaction(), timer_batch():
+        for todo_id in expand_todo_ids(todo_ids):
+            todo = store.get_todo(current_task, todo_id)
+            if todo is None:
+                console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
+                continue
 
-    elapsed = stop_timer_and_get_elapsed(current_task, todo_id)
+            elapsed = _stop_timer(current_task, todo_id, todo)
+            store.update_todo(current_task, todo_id, status=Status.DONE.value,
+                              updated_at=datetime.now().isoformat(), time_spent=elapsed)
+            finished.append(todo)
+            console.print(f"[green]✓ Marked todo #{todo_id} as done. Total time: {format_seconds(elapsed)}[/green]")
 
-    todo = data["tasks"][current_task]["todos"][todo_id]
-    todo["status"] = Status.DONE.value
-    todo["updated_at"] = datetime.now().isoformat()
-    todo["time_spent"] = elapsed
-    data["tasks"][current_task]["updated_at"] = datetime.now().isoformat()
+        if finished:
+            refresh_completion(store, current_task)
 
-    save_data(data)
+    if not finished:
+        return
 
-    console.print(f"[green]✓ Marked todo #{todo_id} as done. Total time: {format_seconds(elapsed)}[/green]")
+    from fleck.archive import maybe_archive
+
+    archived = maybe_archive(store, current_task)
+    if archived:
+        console.print(f"[dim]Archived {archived} older done todos (see `fleck archive`)[/dim]")
 
     # Ask user if they want to push
-    if click.confirm("Do you want to git push this change?"):
-        commit_msg = f"Mark todo '{todo['description']}' as done"
-        git_push(todo['description'])
+    if push is None:
+        push = click.confirm("Do you want to git push this change?")
+    if push:
+        from fleck.git_support import git_push
 
+        if len(finished) == 1:
+            git_push(finished[0]['description'])
+        else:
+            git_push("Mark todos as done: " + ", ".join(todo['description'] for todo in finished))
 
 
 def format_seconds(seconds):
@@ -361,56 +307,171 @@ def format_seconds(seconds):
     return str(timedelta(seconds=int(seconds)))
 
 @cli.command()
-@click.argument('todo_id')
+@click.argument('todo_ids', nargs=-1, required=True, shell_complete=completion.complete_flag_args)
 @click.argument('priority', type=click.Choice([p.value for p in Priority]))
-def flag(todo_id, priority):
-    """Set priority for a todo."""
-    data = load_data()
+def flag(todo_ids, priority):
+    """Set priority for one or more todos (e.g. `fleck flag 3 5-7 high`)."""
+    from fleck.todo_store import get_store
+
     current_task = CURRENT_WORKSPACE
     
     if not current_task:
         console.print("[red]No active task. Use 'start <task_name>' to begin.[/red]")
         return
     
-    if todo_id not in data["tasks"][current_task]["todos"]:
-        console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
-        return
-    
+    store = get_store()
     priority_value = priority if priority != "None" else None
-    data["tasks"][current_task]["todos"][todo_id]["priority"] = priority_value
-    data["tasks"][current_task]["todos"][todo_id]["updated_at"] = datetime.now().isoformat()
-    data["tasks"][current_task]["updated_at"] = datetime.now().isoformat()
-    save_data(data)
-    console.print(f"[green]Set priority for todo #{todo_id} to {priority_value or 'none'}[/green]")
+    now = datetime.now().isoformat()
+    with store.transaction():
+        for todo_id in expand_todo_ids(todo_ids):
+            if store.get_todo(current_task, todo_id) is None:
+                console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
+                continue
+            store.update_todo(current_task, todo_id, priority=priority_value, updated_at=now)
+            console.print(f"[green]Set priority for todo #{todo_id} to {priority_value or 'none'}[/green]")
+
+LIST_FILTERS = {
+    "todo": Status.TODO.value,
+    "running": Status.IN_PROGRESS.value,
+    "paused": Status.PAUSED.value,
+    "done": Status.DONE.value,
+}
+PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2, None: 3}
+STATUS_ORDER = {
+    Status.IN_PROGRESS.value: 0,
+    Status.PAUSED.value: 1,
+    Status.TODO.value: 2,
+    Status.DONE.value: 3,
+}
+STATUS_COLORS = {
+    Status.DONE.value: "green",
+    Status.IN_PROGRESS.value: "yellow",
+    Status.PAUSED.value: "blue",
+}
+
+def _todo_sort_key(sort):
+    if sort == "created":
+        return lambda item: (item[1].get("created_at", ""), completion.todo_id_key(item[0]))
+    if sort == "priority":
+        return lambda item: (PRIORITY_ORDER.get(item[1].get("priority"), 3), completion.todo_id_key(item[0]))
+    if sort == "status":
+        return lambda item: (STATUS_ORDER.get(item[1].get("status"), 4), completion.todo_id_key(item[0]))
+    return lambda item: completion.todo_id_key(item[0])
+
+def select_todos(todos, status_filter=None, sort="id"):
+    """Return the (todo_id, todo) pairs matching ``status_filter``, sorted by ``sort``."""
+    items = [(todo_id, todo) for todo_id, todo in todos.items()
+             if not status_filter or todo.get("status") == status_filter]
+    items.sort(key=_todo_sort_key(sort))
+    return items
+
+def iter_todo_rows(task_name, items):
+    """Yield a plain dict per todo. Timers are looked up in one batch, and only if a row needs them."""
+    from fleck.models import Todo
+    from fleck.timer_utils import get_timer_statuses
+
+    timers = None
+    for todo_id, todo in items:
+        todo = Todo.from_dict(todo)
+        status = todo.status
+        if status in (Status.IN_PROGRESS.value, Status.PAUSED.value):
+            if timers is None:
+                timers = get_timer_statuses(task_name).get(task_name, {})
+            timer_status = timers.get(todo_id)
+            time_spent = timer_status["elapsed"] if timer_status else 0
+        elif status == Status.DONE.value:
+            time_spent = todo.time_spent or 0
+        else:
+            time_spent = None
+
+        yield {
+            "id": todo_id,
+            "description": todo.description,
+            "status": status,
+            "priority": todo.priority,
+            "created_at": todo.created_at,
+            "updated_at": todo.updated_at,
+            "time_spent": time_spent,
+        }
+
+def echo_json_rows(rows, ndjson=False):
+    """Write rows as a JSON array, or one object per line, as they are produced."""
+    if ndjson:
+        for row in rows:
+            click.echo(json_codec.dumps(row, pretty=False))
+        return
+
+    separator = "\n"
+    click.echo("[", nl=False)
+    for row in rows:
+        click.echo(separator + "  " + json_codec.dumps(row, pretty=False), nl=False)
+        separator = ",\n"
+    click.echo("]" if separator == "\n" else "\n]")
 
 @cli.command()
 @click.argument('filter', required=False, type=click.Choice(["todo", "running", "paused", "done"]))
-def list(filter):
+@click.option('--priority', type=click.Choice(["high", "medium", "low", "none"]), default=None,
+              help="Only todos with this priority")
+@click.option('--sort', type=click.Choice(["id", "created", "priority", "status"]), default="id",
+              help="Sort order (IDs sort numerically)")
+@click.option('--limit', type=click.IntRange(min=0), default=None, help="Show at most N todos")
+@click.option('--offset', type=click.IntRange(min=0), default=0, help="Skip the first N todos")
+@click.option('--json', 'as_json', is_flag=True, help="Print a JSON array instead of a table")
+@click.option('--ndjson', is_flag=True, help="Print one JSON object per line")
+@click.option('--include-archive', is_flag=True, help="Also list archived done todos (after the active ones)")
+@click.option('--watch', is_flag=True, help="Keep the table on screen, updating it as todos and timers change")
+def list(filter, priority, sort, limit, offset, as_json, ndjson, include_archive, watch):
     """List all todos for the current task with a TUI display."""
-    data = load_data()
+    from fleck.todo_store import get_store
+
+    if as_json and ndjson:
+        raise click.UsageError("--json and --ndjson are mutually exclusive.")
+    if watch and (as_json or ndjson or include_archive or limit is not None or offset):
+        raise click.UsageError("--watch can't be combined with --json, --ndjson, --include-archive, --limit or --offset.")
+
     current_task = CURRENT_WORKSPACE
 
     if not current_task:
         console.print("[red]No active task. Use 'start <task_name>' to begin.[/red]")
         return
 
-    todos = data["tasks"][current_task]["todos"]
-    if not todos:
+    status_filter = LIST_FILTERS.get(filter)
+    if watch:
+        from fleck.watch import live_todos
+
+        live_todos(current_task, status_filter and (status_filter,), priority, sort,
+                   title=f"Todos for Task: {current_task}" + (f" (Filtered: {filter})" if filter else ""))
+        return
+
+    # The store filters through its status/priority indexes, so only matching todos are read
+    store = get_store()
+    todos = store.todos(current_task, status_filter, priority)
+    items = select_todos(todos, sort=sort)
+    total = len(items)
+    pairs = items
+    include_archive = include_archive and status_filter in (None, Status.DONE.value)
+    if include_archive:
+        from fleck.archive import iter_archived
+
+        # Archived todos are streamed from disk as the page needs them
+        live_ids = todos.keys() if status_filter is None and priority is None else store.todos(current_task).keys()
+        pairs = chain(items, iter_archived(current_task, priority, skip_ids=live_ids))
+    page = islice(pairs, offset, None if limit is None else offset + limit)
+
+    # Machine-readable output streams rows straight through, without rich
+    if as_json or ndjson:
+        echo_json_rows(iter_todo_rows(current_task, page), ndjson=ndjson)
+        return
+
+    if not todos and not status_filter and not priority and not include_archive:
         console.print(f"[yellow]No todos found in task '{current_task}'[/yellow]")
         return
 
-    # Normalize filter value
-    status_filter = None
-    if filter == "todo":
-        status_filter = "To Do"
-    elif filter == "running":
-        status_filter = "In Progress"
-    elif filter == "paused":
-        status_filter = "Paused"
-    elif filter == "done":
-        status_filter = "Done"
-
-    table = Table(title=f"Todos for Task: {current_task}" + (f" (Filtered: {status_filter})" if status_filter else ""), box=box.ROUNDED)
+    from rich.table import Table
+    from rich import box
+
+    filters = ", ".join(f for f in (status_filter, priority and f"priority {priority}") if f)
+    table = Table(title=f"Todos for Task: {current_task}" + (f" (Filtered: {filters})" if filters else ""), box=box.ROUNDED)
     table.add_column("ID", style="cyan", no_wrap=True)
     table.add_column("Description")
     table.add_column("Status")
@@ -419,74 +480,71 @@ def list(filter):
     table.add_column("Time")
 
     rowCnt = 0
-    for todo_id, todo in sorted(todos.items(), key=lambda x: x[0]):
-        priority = todo.get("priority")
-        status = todo.get("status")
-        
-        # Get time info based on status
-        if status == Status.DONE.value:
-            time_str = format_seconds(todo.get("time_spent", 0))
-            status_color = "green"
-        elif status == Status.IN_PROGRESS.value:
-            # Get current timer status
-            timer_status = get_timer_status(current_task, todo_id)
-            time_str = timer_status["formatted_time"] + " (running)"
-            status_color = "yellow"
+    for row in iter_todo_rows(current_task, page):
+        row_priority = row["priority"]
+        status = row["status"]
+        status_color = STATUS_COLORS.get(status, "white")
+
+        if status == Status.IN_PROGRESS.value:
+            time_str = format_seconds(row["time_spent"]) + " (running)"
         elif status == Status.PAUSED.value:
-            # Get paused timer status
-            timer_status = get_timer_status(current_task, todo_id)
-            time_str = timer_status["formatted_time"] + " (paused)"
-            status_color = "blue"
+            time_str = format_seconds(row["time_spent"]) + " (paused)"
+        elif status == Status.DONE.value:
+            time_str = format_seconds(row["time_spent"])
         else:
             time_str = "-"
-            status_color = "white"
 
-        created_at = datetime.fromisoformat(todo["created_at"]).strftime("%Y-%m-%d %H:%M")
+        # ISO timestamps already start with "YYYY-MM-DDTHH:MM"; no need to parse them
+        created_at = (row["created_at"] or "")[:16].replace("T", " ")
 
-        if not status_filter or status == status_filter:
-            table.add_row(
-                todo_id,
-                todo["description"],
-                f"[{status_color}]{status}[/{status_color}]",
-                f"[{PRIORITY_COLORS[priority]}]{priority or 'none'}[/{PRIORITY_COLORS[priority]}]",
-                created_at,
-                time_str
-            )
-            rowCnt += 1
+        table.add_row(
+            row["id"],
+            row["description"],
+            f"[{status_color}]{status}[/{status_color}]",
+            f"[{PRIORITY_COLORS.get(row_priority, 'white')}]{row_priority or 'none'}[/{PRIORITY_COLORS.get(row_priority, 'white')}]",
+            created_at,
+            time_str
+        )
+        rowCnt += 1
 
+    if include_archive:
+        total += sum(1 for _ in iter_archived(current_task, priority, skip_ids=live_ids))
     if rowCnt > 0:
         console.print(table)
+        if rowCnt < total:
+            console.print(f"[dim]Showing {offset + 1}-{offset + rowCnt} of {total} todos[/dim]")
+    elif total:
+        console.print(f"[yellow]No todos on this page ({total} in total)[/yellow]")
     else:
-        console.print(f"[green]No todos left with status '{status_filter}'[/green]")
+        console.print(f"[green]No todos left matching '{filters}'[/green]")
 
 
 @cli.command()
-@click.argument('todo_id')
+@click.argument('todo_id', shell_complete=completion.complete_todo_ids)
 def gui_timer(todo_id):
     """Launch a GUI timer window for a todo."""
-    data = load_data()
+    from fleck.todo_store import get_store
+    from fleck.timer_utils import start_timer
+
     current_task = CURRENT_WORKSPACE
     
     if not current_task:
         console.print("[red]No active task. Use 'start <task_name>' to begin.[/red]")
         return
     
-    if todo_id not in data["tasks"][current_task]["todos"]:
+    store = get_store()
+    todo = store.get_todo(current_task, todo_id)
+    if todo is None:
         console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
         return
     
-    todo = data["tasks"][current_task]["todos"][todo_id]
-    
     if todo["status"] == Status.DONE.value:
         console.print(f"[yellow]Todo #{todo_id} is already done. Cannot start timer.[/yellow]")
         return
         
     # If the todo is not in progress, mark it as in progress
     if todo["status"] != Status.IN_PROGRESS.value and todo["status"] != Status.PAUSED.value:
-        data["tasks"][current_task]["todos"][todo_id]["status"] = Status.IN_PROGRESS.value
-        data["tasks"][current_task]["todos"][todo_id]["updated_at"] = datetime.now().isoformat()
-        data["tasks"][current_task]["updated_at"] = datetime.now().isoformat()
-        save_data(data)
+        store.update_todo(current_task, todo_id, status=Status.IN_PROGRESS.value, updated_at=datetime.now().isoformat())
         start_timer(current_task, todo_id)
         console.print(f"[green]Marked todo #{todo_id} as in progress.[/green]")
     
@@ -507,25 +565,25 @@ def gui_timer(todo_id):
 
 
 @cli.command()
-@click.argument('todo_id')
+@click.argument('todo_id', shell_complete=completion.complete_todo_ids)
 @click.option('--gui', is_flag=True, help="Start the timer and show in a GUI window")
 def progress(todo_id, gui):
     """Mark a todo as in progress and start the timer."""
-    data = load_data()
+    from fleck.todo_store import get_store
+    from fleck.timer_utils import start_timer
+
     current_task = CURRENT_WORKSPACE
     
     if not current_task:
         console.print("[red]No active task. Use 'start <task_name>' to begin.[/red]")
         return
     
-    if todo_id not in data["tasks"][current_task]["todos"]:
+    store = get_store()
+    if store.get_todo(current_task, todo_id) is None:
         console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
         return
     
-    data["tasks"][current_task]["todos"][todo_id]["status"] = Status.IN_PROGRESS.value
-    data["tasks"][current_task]["todos"][todo_id]["updated_at"] = datetime.now().isoformat()
-    data["tasks"][current_task]["updated_at"] = datetime.now().isoformat()
-    save_data(data)
+    store.update_todo(current_task, todo_id, status=Status.IN_PROGRESS.value, updated_at=datetime.now().isoformat())
     start_timer(current_task, todo_id)
     console.print(f"[green]Marked todo #{todo_id} as in progress. Timer started.[/green]")
     
@@ -546,78 +604,82 @@ def progress(todo_id, gui):
             console.print(f"[red]Error launching timer GUI: {e}[/red]")
 
 @cli.command()
-@click.argument('todo_id')
-def pause(todo_id):
-    """Pause a todo that's in progress."""
-    data = load_data()
+@click.argument('todo_ids', nargs=-1, required=True, shell_complete=completion.complete_todo_ids)
+def pause(todo_ids):
+    """Pause one or more todos that are in progress."""
+    from fleck.todo_store import get_store
+    from fleck.timer_utils import pause_timer, timer_batch
+
     current_task = CURRENT_WORKSPACE
     
     if not current_task:
         console.print("[red]No active task. Use 'start <task_name>' to begin.[/red]")
         return
     
-    if todo_id not in data["tasks"][current_task]["todos"]:
-        console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
-        return
-    
-    todo = data["tasks"][current_task]["todos"][todo_id]
-    if todo["status"] != Status.IN_PROGRESS.value:
-        console.print(f"[yellow]Todo #{todo_id} is not in progress. Cannot pause.[/yellow]")
-        return
-    
-    # elapsed = pause_timer(current_task, todo_id)
-    # pause_timer(current_task,todo_id)
-    
-    data["tasks"][current_task]["todos"][todo_id]["status"] = Status.PAUSED.value
-    data["tasks"][current_task]["todos"][todo_id]["updated_at"] = datetime.now().isoformat()
-    data["tasks"][current_task]["updated_at"] = datetime.now().isoformat()
-    save_data(data)
-    console.print(f"[green]Paused todo #{todo_id}. Current elapsed time: {format_seconds(pause_timer(current_task,todo_id))}[/green]")
+    store = get_store()
+    with state_cache.cached(), store.transaction(), timer_batch():
+        for todo_id in expand_todo_ids(todo_ids):
+            todo = store.get_todo(current_task, todo_id)
+            if todo is None:
+                console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
+                continue
+
+            if todo["status"] != Status.IN_PROGRESS.value:
+                console.print(f"[yellow]Todo #{todo_id} is not in progress. Cannot pause.[/yellow]")
+                continue
+
+            store.update_todo(current_task, todo_id, status=Status.PAUSED.value, updated_at=datetime.now().isoformat())
+            console.print(f"[green]Paused todo #{todo_id}. Current elapsed time: {format_seconds(pause_timer(current_task,todo_id))}[/green]")
 
 @cli.command()
-@click.argument('todo_id')
-def resume(todo_id):
-    """Resume a paused todo."""
-    data = load_data()
+@click.argument('todo_ids', nargs=-1, required=True, shell_complete=completion.complete_todo_ids)
+def resume(todo_ids):
+    """Resume one or more paused todos."""
+    from fleck.todo_store import get_store
+    from fleck.timer_utils import start_timer, timer_batch
+
     current_task = CURRENT_WORKSPACE
     
     if not current_task:
         console.print("[red]No active task. Use 'start <task_name>' to begin.[/red]")
         return
     
-    if todo_id not in data["tasks"][current_task]["todos"]:
-        console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
-        return
-    
-    todo = data["tasks"][current_task]["todos"][todo_id]
-    if todo["status"] != Status.PAUSED.value:
-        console.print(f"[yellow]Todo #{todo_id} is not paused. Cannot resume.[/yellow]")
-        return
-    
-    data["tasks"][current_task]["todos"][todo_id]["status"] = Status.IN_PROGRESS.value
-    data["tasks"][current_task]["todos"][todo_id]["updated_at"] = datetime.now().isoformat()
-    data["tasks"][current_task]["updated_at"] = datetime.now().isoformat()
-    save_data(data)
-    start_timer(current_task, todo_id)
-    console.print(f"[green]Resumed todo #{todo_id}. Timer started.[/green]")
+    store = get_store()
+    with state_cache.cached(), store.transaction(), timer_batch():
+        for todo_id in expand_todo_ids(todo_ids):
+            todo = store.get_todo(current_task, todo_id)
+            if todo is None:
+                console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
+                continue
+
+            if todo["status"] != Status.PAUSED.value:
+                console.print(f"[yellow]Todo #{todo_id} is not paused. Cannot resume.[/yellow]")
+                continue
+
+            store.update_todo(current_task, todo_id, status=Status.IN_PROGRESS.value, updated_at=datetime.now().isoformat())
+            start_timer(current_task, todo_id)
+            console.print(f"[green]Resumed todo #{todo_id}. Timer started.[/green]")
 
 @cli.command()
-@click.argument('todo_id')
+@click.argument('todo_id', shell_complete=completion.complete_todo_ids)
 @click.option('--gui', is_flag=True, help="Show timer in a GUI window")
 def timer(todo_id, gui):
     """Show a live timer for a todo that's in progress."""
-    data = load_data()
+    from fleck.todo_store import get_store
+    from fleck.timer_utils import start_timer, get_timer_status, display_live_timer
+
     current_task = CURRENT_WORKSPACE
     
     if not current_task:
         console.print("[red]No active task. Use 'start <task_name>' to begin.[/red]")
         return
     
-    if todo_id not in data["tasks"][current_task]["todos"]:
+    store = get_store()
+    todo = store.get_todo(current_task, todo_id)
+    if todo is None:
         console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
         return
     
-    todo = data["tasks"][current_task]["todos"][todo_id]
     status = get_timer_status(current_task, todo_id)
     
     if todo["status"] == Status.DONE.value:
@@ -626,10 +688,7 @@ def timer(todo_id, gui):
     
     if todo["status"] == Status.TODO.value:
         # Automatically set to in progress if it's not started yet
-        data["tasks"][current_task]["todos"][todo_id]["status"] = Status.IN_PROGRESS.value
-        data["tasks"][current_task]["todos"][todo_id]["updated_at"] = datetime.now().isoformat()
-        data["tasks"][current_task]["updated_at"] = datetime.now().isoformat()
-        save_data(data)
+        store.update_todo(current_task, todo_id, status=Status.IN_PROGRESS.value, updated_at=datetime.now().isoformat())
         start_timer(current_task, todo_id)
         console.print(f"[green]Marked todo #{todo_id} as in progress.[/green]")
     
@@ -655,224 +714,47 @@ def timer(todo_id, gui):
         display_live_timer(current_task, todo_id)
 
 @cli.command()
-@click.argument('todo_id')
-def delete(todo_id):
-    """Delete a todo from the current task."""
-    data = load_data()
+@click.argument('todo_ids', nargs=-1, required=True, shell_complete=completion.complete_todo_ids)
+def delete(todo_ids):
+    """Delete one or more todos from the current task."""
+    from fleck.todo_store import get_store
+    from fleck.timer_utils import stop_timer_and_get_elapsed, timer_batch
+
     current_task = CURRENT_WORKSPACE
     
     if not current_task:
         console.print("[red]No active task. Use 'start <task_name>' to begin.[/red]")
         return
     
-    if todo_id not in data["tasks"][current_task]["todos"]:
-        console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
-        return
-    
-    # Stop any running timer for this todo
-    stop_timer_and_get_elapsed(current_task, todo_id)
-    
-    del data["tasks"][current_task]["todos"][todo_id]
-    data["tasks"][current_task]["updated_at"] = datetime.now().isoformat()
-    save_data(data)
-    console.print(f"[green]Deleted todo #{todo_id} from task '{current_task}'[/green]")
-
-
-
-
-
-
-
-
-@cli.command()
-def delete_workspace():
-    """Delete a saved workspace."""
-    global CURRENT_WORKSPACE
-    # sessions_dir = Path(__file__).parent / "data" / "sessions"
-    sessions_dir = SESSIONS_DIR
-    current_file = sessions_dir / "current_session.json"
-    # todos_file = Path("data") / "todos.json"
-    todos_file = TODO_FILE
-
-    if click.confirm(f"Are you sure you want to delete the workspace for '{CURRENT_WORKSPACE}'?"):
-        success, message = delete_session(CURRENT_WORKSPACE)
-
-        if success:
-            # Clear current session
-            with open(current_file, "w") as f:
-                json.dump({"current": ""}, f)
-
-            # Remove from todos.json
-            if todos_file.exists():
-                with open(todos_file, "r") as f:
-                    todos_data = json.load(f)
-                if CURRENT_WORKSPACE in todos_data.get("tasks", {}):
-                    del todos_data["tasks"][CURRENT_WORKSPACE]
-                    with open(todos_file, "w") as f:
-                        json.dump(todos_data, f, indent=4)
-                    console.print(f"[green]✓[/green] Removed '{CURRENT_WORKSPACE}' from todos.json")
-                else:
-                    console.print(f"[yellow]⚠[/yellow] Workspace not found in todos.json")
-
-            # Reset the in-memory global variable
-            CURRENT_WORKSPACE = ""
-
-            console.print(f"[green]✓[/green] {message}")
-        else:
-            console.print(f"[red]✗[/red] {message}")
+    store = get_store()
+    with state_cache.cached(), store.transaction(), timer_batch():
+        changed = False
 
+        for todo_id in expand_todo_ids(todo_ids):
+            todo = store.get_todo(current_task, todo_id)
+            if todo is None:
+                console.print(f"[red]Todo #{todo_id} not found in current task.[/red]")
+                continue
 
-@cli.command()
-# @click.argument('task_name')
-def show():
-    """Show details of a saved workspace."""
-    display_summary(CURRENT_WORKSPACE)
-
-@cli.command()
-# @click.argument('task_name')
-def gui():
-    """Open the workspace in the GUI viewer."""
-    # Check if the session exists
-    session_data = load_session(CURRENT_WORKSPACE)
-    if not session_data:
-        console.print(f"[red]✗[/red] No saved workspace found for task: {CURRENT_WORKSPACE}")
-        return
-    
-    # Get the path to the workspace_gui.py file
-    workspace_gui_path = Path(__file__).parent / "workspace_gui.py"
-    
-    if not workspace_gui_path.exists():
-        console.print(f"[red]✗[/red] Workspace GUI not found at: {workspace_gui_path}")
-        return
-    
-    # Launch the GUI
-    try:
-        subprocess.Popen([sys.executable, str(workspace_gui_path), CURRENT_WORKSPACE])
-        console.print(f"[green]✓[/green] Launched workspace viewer for '{CURRENT_WORKSPACE}'")
-    except Exception as e:
-        console.print(f"[red]✗[/red] Failed to launch workspace viewer: {e}")
-
-def display_summary(task_name):
-    """Display a summary of a workspace."""
-    summary = get_session_summary(task_name)
-    
-    if not summary:
-        console.print(f"[red]✗[/red] No saved workspace found for task: {task_name}")
-        return
-    
-    # Format timestamp
-    timestamp = "Unknown"
-    if summary.get("timestamp"):
-        try:
-            dt = datetime.fromisoformat(summary["timestamp"])
-            timestamp = dt.strftime("%Y-%m-%d %H:%M:%S")
-        except:
-            pass
-    
-    # Print summary header
-    console.print(f"\n[bold cyan]Workspace Summary for '{task_name}'[/bold cyan]")
-    console.print(f"[dim]Last saved: {timestamp}[/dim]\n")
-    
-    # Applications table
-    if summary["applications"]:
-        app_table = Table(title="Applications", box=box.SIMPLE)
-        app_table.add_column("Name", style="green")
-        app_table.add_column("Window Title")
-        
-        for app in summary["applications"]:
-            app_table.add_row(app["name"], app["title"])
-        
-        console.print(app_table)
-    else:
-        console.print("[yellow]No applications saved in this workspace.[/yellow]")
-    
-    # Chrome tabs table
-    if summary["chrome_tabs"]:
-        chrome_table = Table(title="Chrome Tabs", box=box.SIMPLE)
-        chrome_table.add_column("Title", style="blue")
-        # chrome_table.add_column("URL", style="cyan")
-        
-        for tab in summary["chrome_tabs"]:
-            url = tab["url"] or ""
-            title = tab["title"] or "No Title"
-            # chrome_table.add_row(f"[link={url}]{title}[/link]", url)
-            chrome_table.add_row(f"[link={url}]{title}[/link]")
-        
-        console.print(chrome_table)
-    
-    # Brave tabs table
-    if summary["brave_tabs"]:
-        brave_table = Table(title="Brave Tabs", box=box.SIMPLE)
-        brave_table.add_column("Title", style="orange1")
-        # brave_table.add_column("URL", style="cyan")
-        
-        for tab in summary["brave_tabs"]:
-            url = tab["url"] or ""
-            title = tab["title"] or "No Title"
-            # brave_table.add_row(f"[link={url}]{title}[/link]", url)
-            brave_table.add_row(f"[link={url}]{title}[/link]")
-        
-        console.print(brave_table)
-    else:
-        console.print("[yellow]No Brave tabs saved in this workspace.[/yellow]")
-    
-    console.print("")
-    
-    if summary["edge_tabs"]:
-        edge_table = Table(title="Edge Tabs", box=box.SIMPLE)
-        edge_table.add_column("Title", style="orange1")
-        # edge_table.add_column("URL", style="cyan")
-        
-        for tab in summary["edge_tabs"]:
-            url = tab["url"] or ""
-            title = tab["title"] or "No Title"
-            # edge_table.add_row(f"[link={url}]{title}[/link]", url)
-            edge_table.add_row(f"[link=${url}]{title}[/link]")
-        
-        console.print(edge_table)
-    else:
-        console.print("[yellow]No Edge tabs saved in this workspace.[/yellow]")
-    
-    console.print("")
-
-    if summary["explorer"]:
-        explorer_table = Table(title="File Explorer",box=box.SIMPLE)
-        explorer_table.add_column("Folder",style="magenta")
-        explorer_table.add_column("Path",style="cyan")
-
-        for tab in summary["explorer"]:
-            path = tab["path"]
-            title = tab["title"]
-            explorer_table.add_row(title,path)
-        console.print(explorer_table)
-    else:
-        console.print("[yellow]No files saved in this workspace.[/yellow]")
-    
-    console.print("")  # Add a blank line at the end
-
-from session_tracker import start_session_tracking
-from workspace_manager import restore_workspace_state
-import time
+            # Drop the todo's timer, whatever its status, so no stale entry is left behind
+            stop_timer_and_get_elapsed(current_task, todo_id)
 
+            store.delete_todo(current_task, todo_id)
+            changed = True
+            console.print(f"[green]Deleted todo #{todo_id} from task '{current_task}'[/green]")
 
-@cli.command()
-# @click.argument('task_name')
-def track_session():
-    """Start session tracking (app + browser tab) with auto-browser launch"""
-    click.echo("🚀 Starting session tracking...")
-    start_session_tracking(CURRENT_WORKSPACE)
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        click.echo("🛑 Session tracking stopped.")
+        if changed:
+            refresh_completion(store, current_task)
 
 
 @cli.command()
 @click.argument('workspace_name')
 def create(workspace_name):
     """Create a new workspace"""
+    from fleck.todo_store import get_store
+
     # os.makedirs('data/sessions', exist_ok=True)
+    ensure_data_dirs()
     # session_path = os.path.join('data/sessions', f"{workspace_name}.json")
     session_path = os.path.join(SESSIONS_DIR,f"{workspace_name}.json")
 
@@ -889,38 +771,23 @@ def create(workspace_name):
         "brave_tabs": [],
         "edge_tabs": []
     }
-    with open(session_path, 'w') as f:
-        json.dump(initial_data, f, indent=4)
-
-    # Update todos.json
-    # todos_path = Path("data") / "todos.json"
-    todos_path = TODO_FILE
-    if todos_path.exists():
-        with open(todos_path, "r") as f:
-            todos_data = json.load(f)
-    else:
-        todos_data = {"tasks": {}}
+    json_codec.write(session_path, initial_data)
 
-    if workspace_name in todos_data["tasks"]:
-        console.print(f"[yellow]Warning: Task '{workspace_name}' already exists in todos.json[/yellow]")
-    else:
-        now = datetime.now().isoformat()
-        todos_data["tasks"][workspace_name] = {
-            "id":len(todos_data["tasks"])+1,
-            "created_at": now,
-            "updated_at": now,
-            "todos": {}
-        }
-        with open(todos_path, "w") as f:
-            json.dump(todos_data, f, indent=4)
-        console.print(f"[green]✓[/green] Added '{workspace_name}' to todos.json")
+    # Add the task to the todo store
+    store = get_store()
+    with store.transaction():
+        if not store.create_task(workspace_name):
+            console.print(f"[yellow]Warning: Task '{workspace_name}' already exists in the todo store[/yellow]")
+        else:
+            console.print(f"[green]✓[/green] Added '{workspace_name}' to the todo store")
+
+        refresh_completion(store, workspace_name)
 
     click.echo(f"Workspace '{workspace_name}' created.")
 
     # ✅ Update current workspace (persist it)
     current_path = Path(f"{SESSIONS_DIR}/current_session.json")
-    with open(current_path, "w") as f:
-        json.dump({"current": workspace_name}, f)
+    json_codec.write(current_path, {"current": workspace_name})
 
 
 
@@ -930,111 +797,18 @@ def current():
     # curr_file = Path(__file__).parent / "data" / "sessions" / "current_session.json"
     curr_file = Path(f"{SESSIONS_DIR}/current_session.json")
 
+    # Plain click styling keeps this command free of the rich import
     if not curr_file.exists():
-        console.print("[yellow]No current active file[/yellow]")
+        click.secho("No current active file", fg="yellow")
         return
 
-    with open(curr_file, "r") as f:
-        data = json.load(f)
+    data = json_codec.read(curr_file)
 
     curr = data.get("current", "")
     if curr == "":
-        console.print("[yellow]No current active workspace[/yellow]")
-    else:
-        console.print(f"[green]{curr} is active[/green]")
-
-def switch_helper(workspace_name):
-    # sessions_dir = Path(__file__).parent / "data" / "sessions"
-    sessions_dir = SESSIONS_DIR
-    session_path = sessions_dir / f"{workspace_name}.json"
-    current_file = sessions_dir / "current_session.json"
-
-    if not session_path.exists():
-        console.print(f"[red]✗ Workspace '{workspace_name}' does not exist.[/red]")
-        return
-
-    # Save current session if exists and confirmed
-    if current_file.exists():
-        with open(current_file, "r") as f:
-            current_data = json.load(f)
-        current_workspace = current_data.get("current", "")
-
-        # if current_workspace and current_workspace != workspace_name:
-        if click.confirm(f"Do you want to save the current workspace '{CURRENT_WORKSPACE}' before switching?"):
-                success, msg = save_session(CURRENT_WORKSPACE)  # Assuming this returns (bool, str)
-                if success:
-                    console.print(f"[green]✓[/green] {msg}")
-                else:
-                    console.print(f"[red]✗[/red] Failed to save: {msg}")
-
-    # Set new current workspace
-    with open(current_file, "w") as f:
-        json.dump({"current": workspace_name}, f)
-    console.print(f"[blue]→ Switched to workspace:[/blue] '{workspace_name}'")
-
-    # Display and optionally restore
-    display_summary(workspace_name)
-    if click.confirm(f"Do you want to restore the workspace for '{workspace_name}'?"):
-        with console.status(f"Restoring workspace '{workspace_name}'...", spinner="dots"):
-            success, message = restore_session(workspace_name)
-        if success:
-            console.print(f"[green]✓[/green] {message}")
-        else:
-            console.print(f"[red]✗[/red] {message}")
-    else:
-        console.print(f"[yellow]⚠ Workspace switched but not restored.[/yellow]")
-
-
-
-@cli.command()
-@click.argument("workspace_name")
-def switch(workspace_name):
-    """Switch to another workspace and restore its session."""
-    # sessions_dir = Path(__file__).parent / "data" / "sessions"
-    sessions_dir = SESSIONS_DIR
-    session_path = sessions_dir / f"{workspace_name}.json"
-    current_file = sessions_dir / "current_session.json"
-
-    if not session_path.exists():
-        console.print(f"[red]✗ Workspace '{workspace_name}' does not exist.[/red]")
-        return
-
-    # Save current session if exists and confirmed
-    if current_file.exists():
-        with open(current_file, "r") as f:
-            current_data = json.load(f)
-        current_workspace = current_data.get("current", "")
-
-        # if current_workspace and current_workspace != workspace_name:
-        if click.confirm(f"Do you want to save the current workspace '{CURRENT_WORKSPACE}' before switching?"):
-                success, msg = save_session(CURRENT_WORKSPACE)  # Assuming this returns (bool, str)
-                if success:
-                    console.print(f"[green]✓[/green] {msg}")
-                else:
-                    console.print(f"[red]✗[/red] Failed to save: {msg}")
-
-    # Set new current workspace
-    with open(current_file, "w") as f:
-        json.dump({"current": workspace_name}, f)
-    console.print(f"[blue]→ Switched to workspace:[/blue] '{workspace_name}'")
-
-    # Display and optionally restore
-    display_summary(workspace_name)
-    if click.confirm(f"Do you want to restore the workspace for '{workspace_name}'?"):
-        with console.status(f"Restoring workspace '{workspace_name}'...", spinner="dots"):
-            success, message = restore_session(workspace_name)
-        if success:
-            console.print(f"[green]✓[/green] {message}")
-        else:
-            console.print(f"[red]✗[/red] {message}")
+        click.secho("No current active workspace", fg="yellow")
     else:
-        console.print(f"[yellow]⚠ Workspace switched but not restored.[/yellow]")
-
-
-
-
-
-
+        click.secho(f"{curr} is active", fg="green")
 
 # cli.py
 # import click
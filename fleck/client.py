@@ -0,0 +1,90 @@
+import os
+import sys
+import socket
+import shutil
+
+from fleck import json_codec
+from fleck.config import DATA_DIR
+
+# Thin client for fleckd. This module is the console entry point, so it must
+# stay cheap to import: only the stdlib and fleck.config. The click CLI is
+# imported only when the daemon is not running (or can't serve the command).
+
+SOCKET_PATH = DATA_DIR / "fleckd.sock"
+
+# Non-interactive commands the daemon can run on the client's behalf
+DAEMON_COMMANDS = {"add", "flag", "list", "progress", "pause", "resume", "delete", "current"}
+# Options that need the user's own session, terminal or working directory
+LOCAL_OPTIONS = {"--gui", "--watch", "--from-file"}
+
+
+def daemon_supported():
+    return hasattr(socket, "AF_UNIX") and not os.environ.get("FLECK_NO_DAEMON")
+
+
+def request(payload, timeout=30):
+    """Send one request to fleckd and return its decoded response, or None if it is not running."""
+    if not daemon_supported() or not SOCKET_PATH.exists():
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(SOCKET_PATH))
+            sock.sendall(json_codec.dumpb(payload, pretty=False) + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+
+    if not chunks:
+        return None
+    return json_codec.loads(b"".join(chunks))
+
+
+def should_forward(argv):
+    """Return True if fleckd can run this command line without user interaction."""
+    if not argv or argv[0] not in DAEMON_COMMANDS:
+        return False
+    # GUI timers must be spawned from the user's session, not the daemon's,
+    # live views keep running in the user's terminal, and files (or stdin)
+    # are read relative to the user's cwd, not fleckd's
+    return not any(arg.partition("=")[0] in LOCAL_OPTIONS for arg in argv)
+
+
+def forward(argv):
+    """Run a command through fleckd. Returns its exit code, or None to fall back to direct mode."""
+    response = request({
+        "op": "run",
+        "argv": argv,
+        "width": shutil.get_terminal_size().columns,
+        "color": sys.stdout.isatty(),
+    })
+    if response is None or "exit_code" not in response:
+        return None
+
+    sys.stdout.write(response.get("output", ""))
+    sys.stdout.flush()
+    return response["exit_code"]
+
+
+def main():
+    """Console entry point: hand the command to fleckd when it is running."""
+    if "_FLECK_COMPLETE" in os.environ:
+        from fleck import completion
+        if completion.fast_complete():
+            return
+
+    argv = sys.argv[1:]
+    if should_forward(argv):
+        exit_code = forward(argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from fleck.cli_new_1 import cli
+    cli(prog_name="fleck")
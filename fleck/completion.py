@@ -0,0 +1,225 @@
+import os
+import sys
+import shlex
+
+from fleck import state_cache
+from fleck import json_codec
+from fleck.config import DATA_DIR, SESSIONS_DIR, TODO_DB, get_current_workspace, get_store_name
+
+# Tiny precomputed index for shell completion:
+#   {"workspaces": [names], "todos": {workspace: {todo_id: description}}}
+# Only open (not done) todos are listed. Commands that change the set of
+# workspaces or open todos keep it up to date, so completing a workspace name
+# or todo ID never has to import the CLI or read the todo store/session files.
+# With the SQLite store the index holds no todos: todo IDs are completed with
+# one indexed query on todos.db, which is as cheap as reading the index and
+# keeps commands from rewriting an index the size of every open todo.
+
+INDEX_FILE = DATA_DIR / "completion_index.json"
+COMPLETE_VAR = "_FLECK_COMPLETE"
+
+WORKSPACE_COMMANDS = {"switch", "restore", "focus"}
+# Commands taking todo IDs, mapped to how many leading arguments are IDs (None = all)
+TODO_ID_COMMANDS = {
+    "done": None,
+    "delete": None,
+    "pause": None,
+    "resume": None,
+    "progress": 1,
+    "timer": 1,
+    "gui-timer": 1,
+}
+# `flag` takes any number of todo IDs followed by one of these
+PRIORITIES = ("high", "medium", "low")
+
+
+def _read_index():
+    try:
+        return json_codec.read(INDEX_FILE)
+    except (OSError, json_codec.JSONDecodeError):
+        return rebuild_index()
+
+
+def load_index():
+    """Return the completion index, rebuilding it if it is missing or unreadable."""
+    return state_cache.load(INDEX_FILE, _read_index)
+
+
+def _save_index(index):
+    state_cache.save(INDEX_FILE, index, _write_index)
+
+
+def _write_index(index):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    tmp_file = INDEX_FILE.with_suffix(".tmp")
+    json_codec.write(tmp_file, index, pretty=False)
+    # Completions may read the index at any moment; never show them a half-written file
+    os.replace(tmp_file, INDEX_FILE)
+
+
+def rebuild_index():
+    """Recompute the index from the todo store and the session files."""
+    from fleck.todo_store import get_store
+
+    store = get_store()
+    task_names = store.task_names()
+    workspaces = set(task_names)
+    if SESSIONS_DIR.exists():
+        workspaces.update(p.stem for p in SESSIONS_DIR.glob("*.json") if p.stem != "current_session")
+
+    index = {
+        "workspaces": sorted(workspaces),
+        "todos": {} if store.name == "sqlite" else {name: store.open_todos(name) for name in task_names},
+    }
+    _write_index(index)
+    return index
+
+
+def update_workspace(workspace_name, open_todos=None):
+    """Record a workspace and its open todos ({todo_id: description}) in the index.
+
+    With open_todos=None only the workspace name is recorded (the SQLite
+    store answers todo completions itself), and nothing is written if the
+    index already lists it.
+    """
+    index = load_index()
+    changed = False
+    if workspace_name not in index["workspaces"]:
+        index["workspaces"] = sorted(index["workspaces"] + [workspace_name])
+        changed = True
+    if open_todos is not None:
+        index["todos"][workspace_name] = dict(open_todos)
+        changed = True
+    elif index["todos"].pop(workspace_name, None) is not None:
+        changed = True
+    if changed:
+        _save_index(index)
+
+
+def remove_workspace(workspace_name):
+    """Drop a deleted workspace from the index."""
+    index = load_index()
+    index["workspaces"] = [name for name in index["workspaces"] if name != workspace_name]
+    index["todos"].pop(workspace_name, None)
+    _save_index(index)
+
+
+def todo_id_key(todo_id):
+    """Sort key that orders todo IDs numerically ("2" before "10")."""
+    return (0, int(todo_id), "") if todo_id.isdigit() else (1, 0, todo_id)
+
+
+def workspace_candidates(incomplete):
+    return [(name, None) for name in load_index()["workspaces"] if name.startswith(incomplete)]
+
+
+def _db_open_todos(workspace_name):
+    import sqlite3
+
+    try:
+        conn = sqlite3.connect(f"{TODO_DB.as_uri()}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("SELECT id, description FROM todos WHERE task = ? AND status != 'Done'", (workspace_name,))
+            return {str(todo_id): description or "" for todo_id, description in rows}
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+
+
+def todo_candidates(incomplete, workspace_name=None):
+    workspace_name = workspace_name or get_current_workspace()
+    if get_store_name() == "sqlite":
+        todos = _db_open_todos(workspace_name)
+    else:
+        todos = load_index()["todos"].get(workspace_name, {})
+    return [(todo_id, todos[todo_id]) for todo_id in sorted(todos, key=todo_id_key) if todo_id.startswith(incomplete)]
+
+
+def flag_candidates(previous, incomplete):
+    """Complete `flag ID... PRIORITY`: an ID first, then the priority unless another ID is being typed."""
+    if previous and not incomplete[:1].isdigit():
+        return [(priority, "priority") for priority in PRIORITIES if priority.startswith(incomplete)]
+    return todo_candidates(incomplete)
+
+
+# click shell_complete callbacks, used when completion goes through click itself
+
+def complete_workspaces(ctx, param, incomplete):
+    from click.shell_completion import CompletionItem
+    return [CompletionItem(name) for name, _ in workspace_candidates(incomplete)]
+
+
+def complete_todo_ids(ctx, param, incomplete):
+    from click.shell_completion import CompletionItem
+    return [CompletionItem(todo_id, help=description) for todo_id, description in todo_candidates(incomplete)]
+
+
+def complete_flag_args(ctx, param, incomplete):
+    from click.shell_completion import CompletionItem
+    # click hands a trailing ID to the priority argument and then drops it as
+    # an invalid choice, so count the words typed after `flag` instead
+    args, _ = _completion_args(os.environ.get(COMPLETE_VAR, "").partition("_")[0], os.environ)
+    previous = [arg for arg in args[args.index("flag") + 1:] if not arg.startswith("-")] if "flag" in args else []
+    return [CompletionItem(value, help=help_text) for value, help_text in flag_candidates(previous, incomplete)]
+
+
+def _split(line):
+    try:
+        return shlex.split(line)
+    except ValueError:
+        return line.split()
+
+
+def _completion_args(shell, environ):
+    """Mirror click's get_completion_args for bash, zsh and fish."""
+    cwords = _split(environ.get("COMP_WORDS", ""))
+    if shell == "fish":
+        incomplete = environ.get("COMP_CWORD", "")
+        args = cwords[1:]
+        if incomplete and args and args[-1] == incomplete:
+            args.pop()
+        return args, incomplete
+
+    cword = int(environ.get("COMP_CWORD", "0"))
+    args = cwords[1:cword]
+    incomplete = cwords[cword] if cword < len(cwords) else ""
+    return args, incomplete
+
+
+def _format(shell, value, help_text):
+    if shell == "zsh":
+        return f"plain\n{value}\n{help_text or '_'}"
+    if shell == "fish" and help_text:
+        return f"plain,{value}\t{help_text}"
+    return f"plain,{value}"
+
+
+def fast_complete(environ=None):
+    """Answer workspace-name and todo-ID completions straight from the index.
+
+    Returns True when the completion was handled. Anything else (command
+    names, options, ...) returns False and goes through click's own completion.
+    """
+    environ = os.environ if environ is None else environ
+    shell, _, instruction = environ.get(COMPLETE_VAR, "").partition("_")
+    if instruction != "complete" or shell not in ("bash", "zsh", "fish"):
+        return False
+
+    args, incomplete = _completion_args(shell, environ)
+    if not args or incomplete.startswith("-") or any(arg.startswith("-") for arg in args[1:]):
+        return False
+
+    command, positional = args[0], args[1:]
+    if command in WORKSPACE_COMMANDS and not positional:
+        candidates = workspace_candidates(incomplete)
+    elif command == "flag":
+        candidates = flag_candidates(positional, incomplete)
+    elif command in TODO_ID_COMMANDS and (TODO_ID_COMMANDS[command] is None or len(positional) < TODO_ID_COMMANDS[command]):
+        candidates = todo_candidates(incomplete)
+    else:
+        return False
+
+    sys.stdout.write("\n".join(_format(shell, value, help_text) for value, help_text in candidates))
+    sys.stdout.write("\n")
+    return True
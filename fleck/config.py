@@ -1,11 +1,41 @@
-import json
+import os
 from pathlib import Path
+from appdirs import user_data_dir
 
-CURRENT_SESSION_PATH = Path(__file__).parent / "data" / "sessions" / "current_session.json"
+from fleck import json_codec
+
+APP_NAME = "FleckCLI"
+
+# FLECK_DATA_DIR lets benchmarks and scripts point the CLI at a scratch data dir
+DATA_DIR = Path(os.environ.get("FLECK_DATA_DIR") or user_data_dir(APP_NAME) + "/Data")
+SESSIONS_DIR = DATA_DIR / "sessions"
+TODO_FILE = DATA_DIR / "todos.json"
+TODO_DB = DATA_DIR / "todos.db"
+JOURNAL_FILE = DATA_DIR / "todos.journal"
+TIMER_FILE = DATA_DIR / "timers.json"
+TIMER_DIR = DATA_DIR / "timers"
+INTERVAL_DIR = DATA_DIR / "intervals"
+ROLLUP_DIR = DATA_DIR / "rollups"
+LOGS_DIR = DATA_DIR / "logs"
+PROFILES_DIR = DATA_DIR / "profiles"
+ARCHIVE_DIR = DATA_DIR / "archive"
+SEARCH_DB = DATA_DIR / "search.db"
+
+CURRENT_SESSION_PATH = SESSIONS_DIR / "current_session.json"
+
+STORE_ENV = "FLECK_STORE"
+
+def ensure_data_dirs():
+    """Create the data, sessions and logs directories if they are missing."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(SESSIONS_DIR, exist_ok=True)
+    os.makedirs(LOGS_DIR, exist_ok=True)
 
 def get_current_workspace():
     if CURRENT_SESSION_PATH.exists():
-        with open(CURRENT_SESSION_PATH, "r") as f:
-            data = json.load(f)
-            return data.get("current", "")
+        return json_codec.read(CURRENT_SESSION_PATH).get("current", "")
     return ""
+
+def get_store_name():
+    """Return the todo store in use: FLECK_STORE, else sqlite once todos.db exists, else json."""
+    return os.environ.get(STORE_ENV) or ("sqlite" if TODO_DB.exists() else "json")
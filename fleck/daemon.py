@@ -0,0 +1,211 @@
+import io
+import os
+import sys
+import time
+import signal
+import socket
+import logging
+import subprocess
+from contextlib import redirect_stdout, redirect_stderr
+
+import click
+
+from fleck import state_cache
+from fleck import json_codec
+from fleck.client import SOCKET_PATH, DAEMON_COMMANDS, daemon_supported, request, should_forward
+from fleck.config import DATA_DIR, LOGS_DIR
+
+logger = logging.getLogger("fleckd")
+
+DAEMON_LOG = LOGS_DIR / "fleckd.log"
+
+
+class FleckDaemon:
+    """Long-lived owner of the todo, timer and tracker stores.
+
+    Requests are handled one at a time on a Unix socket, so the daemon is the
+    single writer for every client that talks to it (CLI, timer GUI, session
+    tracker). Stores stay parsed in memory through state_cache and are only
+    re-read when another process changes the file underneath.
+    """
+
+    def __init__(self, socket_path=SOCKET_PATH):
+        self.socket_path = socket_path
+        self.started_at = time.time()
+        self.requests = 0
+        self.stopping = False
+
+    def serve_forever(self):
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        state_cache.enable()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        sock.listen(16)
+        sock.settimeout(0.5)
+        signal.signal(signal.SIGTERM, self._on_signal)
+        logger.info(f"fleckd listening on {self.socket_path} (pid {os.getpid()})")
+
+        try:
+            while not self.stopping:
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    continue
+                except InterruptedError:
+                    continue
+                with conn:
+                    self._handle(conn)
+        finally:
+            sock.close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+            state_cache.disable()
+            logger.info("fleckd stopped")
+
+    def _on_signal(self, signum, frame):
+        self.stopping = True
+
+    def _handle(self, conn):
+        conn.settimeout(30)
+        chunks = []
+        try:
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            payload = json_codec.loads(b"".join(chunks) or b"{}")
+            response = self.dispatch(payload)
+        except Exception as e:
+            logger.error(f"Error handling request: {e}")
+            response = {"error": str(e)}
+
+        try:
+            conn.sendall(json_codec.dumpb(response, pretty=False))
+        except OSError as e:
+            logger.warning(f"Client went away before the response was sent: {e}")
+
+    def dispatch(self, payload):
+        self.requests += 1
+        handler = getattr(self, f"op_{payload.get('op')}", None)
+        if handler is None:
+            return {"error": f"Unknown op: {payload.get('op')}"}
+        try:
+            return handler(payload)
+        finally:
+            state_cache.flush()
+
+    def op_ping(self, payload):
+        return {
+            "ok": True,
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started_at,
+            "requests": self.requests,
+        }
+
+    def op_run(self, payload):
+        from fleck.cli_new_1 import console_output
+        from fleck.shell import invoke
+
+        argv = payload.get("argv") or []
+        if not should_forward(argv):
+            return {"error": f"Command can't be run by fleckd: {' '.join(argv)}"}
+
+        color = bool(payload.get("color"))
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(output), \
+                console_output(output, width=payload.get("width"), color=color):
+            exit_code = invoke(argv, color=color)
+        return {"exit_code": exit_code, "output": output.getvalue()}
+
+    def op_timer_put(self, payload):
+        from fleck.timer_utils import put_timer
+
+        task_name, _, todo_id = payload["key"].rpartition(":")
+        put_timer(task_name, todo_id, payload["entry"])
+        return {"ok": True}
+
+    def op_track(self, payload):
+        from fleck.session_tracker import write_tracker_state
+
+        write_tracker_state(payload["workspace"], payload["state"])
+        return {"ok": True}
+
+    def op_shutdown(self, payload):
+        self.stopping = True
+        return {"ok": True}
+
+
+def is_running():
+    return request({"op": "ping"}, timeout=2) is not None
+
+
+@click.group()
+def daemon():
+    """Manage fleckd, the optional background state server."""
+    pass
+
+
+@daemon.command()
+def start():
+    """Start fleckd in the background."""
+    if not daemon_supported():
+        click.secho("fleckd needs Unix domain sockets, which are not available here.", fg="yellow")
+        return
+    if is_running():
+        click.secho("fleckd is already running.", fg="yellow")
+        return
+
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(DAEMON_LOG, "a") as log:
+        subprocess.Popen([sys.executable, "-m", "fleck.daemon"], stdin=subprocess.DEVNULL,
+                         stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+
+    for _ in range(50):
+        if is_running():
+            click.secho(f"fleckd started, listening on {SOCKET_PATH}", fg="green")
+            return
+        time.sleep(0.1)
+    click.secho(f"fleckd did not come up, see {DAEMON_LOG}", fg="red")
+
+
+@daemon.command()
+def stop():
+    """Stop the running fleckd."""
+    if request({"op": "shutdown"}, timeout=5) is None:
+        click.secho("fleckd is not running.", fg="yellow")
+    else:
+        click.secho("fleckd stopped.", fg="green")
+
+
+@daemon.command()
+def status():
+    """Show whether fleckd is running."""
+    info = request({"op": "ping"}, timeout=2)
+    if info is None:
+        click.secho("fleckd is not running (commands use direct file access).", fg="yellow")
+        return
+    click.secho(f"fleckd is running (pid {info['pid']}, up {int(info['uptime'])}s, "
+                f"{info['requests']} requests served)", fg="green")
+    click.echo(f"Commands served by the daemon: {', '.join(sorted(DAEMON_COMMANDS))}")
+
+
+def main():
+    """Entry point for `fleckd`: run the state server in the foreground."""
+    if not daemon_supported():
+        print("fleckd needs Unix domain sockets, which are not available here.")
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    try:
+        FleckDaemon().serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
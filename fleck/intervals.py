@@ -0,0 +1,257 @@
+import os
+from datetime import date, datetime, time, timedelta
+
+import click
+
+from fleck import json_codec, state_cache
+from fleck.config import INTERVAL_DIR
+from fleck.versioned_file import VersionedFile
+
+# Time history: every stretch a timer ran, from start or resume to pause or
+# stop, as one compact line
+#
+#   ["workspace", "todo_id", start, end]
+#
+# with start/end in Unix seconds. Stretches are split at local midnight, so
+# each line belongs to one day, and lines go to the segment of that day's ISO
+# week, intervals/2026-W42.jsonl. Segments are only ever appended to. Next to
+# each one, 2026-W42.idx has a "YYYY-MM-DD offset length" line for every run
+# of lines appended for a day, so a day query reads just those byte ranges
+# and a week query reads one segment.
+#
+# The timer transitions in timer_utils queue the stretches they close and
+# append them once their timer shards are written. Appends are serialized by
+# one lock, whose version counter changes with every append, and each one
+# also adds its stretches to the week's totals in rollups.py.
+
+LOG = VersionedFile(INTERVAL_DIR / "log")
+
+
+def segment_name(day):
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def midnight(day):
+    """The Unix time of local midnight at the start of ``day``."""
+    return datetime.combine(day, time()).timestamp()
+
+
+def split_days(start, end):
+    """Yield (day, start, end) pieces of a stretch, cut at local midnight."""
+    while end > start:
+        day = datetime.fromtimestamp(start).date()
+        next_midnight = midnight(day + timedelta(days=1))
+        yield day, start, min(end, next_midnight)
+        start = next_midnight
+
+
+def append(intervals):
+    """Append (workspace, todo_id, start, end) stretches to the log."""
+    from fleck import rollups
+
+    by_segment = {}
+    for workspace, todo_id, start, end in intervals:
+        for day, piece_start, piece_end in split_days(start, end):
+            piece = [workspace, todo_id, round(piece_start, 3), round(piece_end, 3)]
+            by_segment.setdefault(segment_name(day), {}).setdefault(day.isoformat(), []).append(piece)
+    if not by_segment:
+        return
+
+    with LOG.locked():
+        for segment, days in by_segment.items():
+            indexed = index_size(segment)
+            index_lines = []
+            # Data first: a crash before the index line is written leaves
+            # bytes no query reads, never an index entry without its data
+            with open(INTERVAL_DIR / f"{segment}.jsonl", 'ab') as f:
+                for day, pieces in days.items():
+                    offset = f.seek(0, os.SEEK_END)
+                    data = b"".join(json_codec.dumpb(piece, pretty=False) + b"\n" for piece in pieces)
+                    f.write(data)
+                    index_lines.append(f"{day} {offset} {len(data)}\n".encode())
+            with open(INTERVAL_DIR / f"{segment}.idx", 'ab') as f:
+                f.write(b"".join(index_lines))
+            rollups.update(segment, days, indexed)
+        LOG.bump()
+
+
+def index_size(segment):
+    """The size of a segment's index, which grows with every append to the segment."""
+    try:
+        return os.stat(INTERVAL_DIR / f"{segment}.idx").st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _read_index(segment):
+    """Return {day: [(offset, length), ...]} for a segment."""
+    ranges = {}
+    try:
+        with open(INTERVAL_DIR / f"{segment}.idx", 'rb') as f:
+            for line in f:
+                try:
+                    day, offset, length = line.decode().split()
+                    ranges.setdefault(day, []).append((int(offset), int(length)))
+                except ValueError:
+                    # Torn last line from an interrupted append
+                    continue
+    except FileNotFoundError:
+        pass
+    return ranges
+
+
+def _decode(data):
+    """Decode a run of log lines at once, falling back to line by line to skip a damaged one."""
+    try:
+        return json_codec.loads(b"[" + data.rstrip(b"\n").replace(b"\n", b",") + b"]")
+    except json_codec.JSONDecodeError:
+        records = []
+        for line in data.splitlines():
+            try:
+                records.append(json_codec.loads(line))
+            except json_codec.JSONDecodeError:
+                continue
+        return records
+
+
+def segments(first, last):
+    """Return {segment name: [ISO days]} for the days ``first``..``last`` (inclusive)."""
+    names = {}
+    day = first
+    while day <= last:
+        names.setdefault(segment_name(day), []).append(day.isoformat())
+        day += timedelta(days=1)
+    return names
+
+
+def segment_monday(segment):
+    year, week = segment.split("-W")
+    return date.fromisocalendar(int(year), int(week), 1)
+
+
+def iter_days(first, last=None):
+    """Yield (day, [[workspace, todo_id, start, end], ...]) for each day ``first``..``last`` (inclusive) with stretches logged.
+
+    Only the segments of the weeks involved are opened, and of a partly
+    covered week only the byte ranges its index gives for the wanted days.
+    """
+    for segment, days in segments(first, last or first).items():
+        path = INTERVAL_DIR / f"{segment}.jsonl"
+        index = _read_index(segment)
+        if not any(day in index for day in days) or not path.exists():
+            continue
+        with open(path, 'rb') as f:
+            if len(days) == 7:
+                data = memoryview(f.read())
+                read = lambda offset, length: data[offset:offset + length]
+            else:
+                def read(offset, length):
+                    f.seek(offset)
+                    return f.read(length)
+            for day in days:
+                ranges = index.get(day)
+                if ranges:
+                    yield date.fromisoformat(day), _decode(b"".join(read(offset, length) for offset, length in ranges))
+
+
+def iter_intervals(first, last=None, workspace=None):
+    """Yield (workspace, todo_id, start, end) for the stretches on days ``first``..``last`` (inclusive)."""
+    for _, records in iter_days(first, last):
+        for record in records:
+            if workspace is None or record[0] == workspace:
+                yield tuple(record)
+
+
+def iter_running(first, last=None, workspace=None, now=None):
+    """Yield (day, workspace, todo_id, start, end) for the part of each running timer's stretch on days ``first``..``last``.
+
+    Those stretches reach the log only when the timer is paused or stopped.
+    """
+    from fleck.models import TimerState, read_clock
+    from fleck.timer_utils import timer_tasks, load_task_timers
+
+    last = last or first
+    now = now or read_clock()
+    for task in timer_tasks() if workspace is None else [workspace]:
+        for todo_id, timer_info in load_task_timers(task).items():
+            timer = TimerState.from_dict(timer_info)
+            if timer.is_running:
+                for day, start, end in split_days(*timer.running_span(now)):
+                    if first <= day <= last:
+                        yield day, task, todo_id, start, end
+
+
+def first_day():
+    """The earliest day with a segment in the log, or None when it is empty."""
+    try:
+        names = [name[:-4] for name in os.listdir(INTERVAL_DIR) if name.endswith(".idx")]
+    except FileNotFoundError:
+        return None
+    if not names:
+        return None
+    return segment_monday(min(names))
+
+
+def parse_day(value):
+    """Parse "today", "yesterday", a weekday name (the most recent one) or YYYY-MM-DD into a date."""
+    today = date.today()
+    text = (value or "today").strip().lower()
+    if text == "today":
+        return today
+    if text == "yesterday":
+        return today - timedelta(days=1)
+    weekdays = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+    for number, name in enumerate(weekdays):
+        if len(text) >= 3 and name.startswith(text):
+            return today - timedelta(days=(today.weekday() - number) % 7)
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        raise click.BadParameter(f"'{value}' is not a day like 2024-05-14, tuesday or yesterday")
+
+
+@click.command()
+@click.option('--day', default="today", show_default=True, help="Day to show: YYYY-MM-DD, a weekday name or yesterday")
+@click.option('--week', is_flag=True, help="Show the whole week (Monday to Sunday) containing the day")
+@click.option('-w', '--workspace', help="Only this workspace")
+@click.option('--json', 'as_json', is_flag=True, help="Print intervals as JSON lines")
+def history(day, week, workspace, as_json):
+    """Show when each todo's timer ran, from the interval log."""
+    from fleck.todo_store import get_store
+    from fleck.cli_new_1 import format_seconds
+
+    first = last = parse_day(day)
+    if week:
+        first = first - timedelta(days=first.weekday())
+        last = first + timedelta(days=6)
+
+    intervals = sorted(iter_intervals(first, last, workspace), key=lambda interval: interval[2])
+    if as_json:
+        for workspace_name, todo_id, start, end in intervals:
+            click.echo(json_codec.dumps({"workspace": workspace_name, "todo_id": todo_id, "start": start, "end": end}, pretty=False))
+        return
+    span = first.isoformat() if first == last else f"{first.isoformat()} to {last.isoformat()}"
+    if not intervals:
+        click.secho(f"No timed work recorded for {span}", fg="yellow")
+        return
+
+    store = get_store()
+    descriptions = {}
+    shown_day = None
+    total = 0
+    # get_todo() would otherwise re-read todos.json for every new todo
+    with state_cache.cached():
+        for workspace_name, todo_id, start, end in intervals:
+            started, ended = datetime.fromtimestamp(start), datetime.fromtimestamp(end)
+            if started.date() != shown_day:
+                shown_day = started.date()
+                click.secho(shown_day.strftime("%A %Y-%m-%d"), bold=True)
+            key = (workspace_name, todo_id)
+            if key not in descriptions:
+                todo = store.get_todo(workspace_name, todo_id)
+                descriptions[key] = todo.get("description") if todo else ""
+            total += end - start
+            click.echo(f"  {started:%H:%M}-{ended:%H:%M}  {format_seconds(end - start):>8}  "
+                       f"{click.style(workspace_name, fg='cyan')} #{todo_id} {descriptions[key]}")
+    click.secho(f"{format_seconds(total)} tracked for {span}", fg="green")
@@ -0,0 +1,304 @@
+import os
+import uuid
+import bisect
+import logging
+from datetime import datetime
+
+import click
+
+from fleck import json_codec
+
+logger = logging.getLogger("fleck.journal")
+
+# Every change to the todo store is described by a small, reversible record:
+#
+#   {"op": "put", "task": t, "id": "3", "todo": {...}, "before": {...} | null}
+#   {"op": "delete", "task": t, "id": "3", "before": {...}}
+#   {"op": "create_task", "task": t, "data": {"id", "created_at", "updated_at"}}
+#   {"op": "delete_task", "task": t, "before": {... including "todos"}}
+#   {"op": "restore_task", "task": t, "data": {... including "todos"}}
+#
+# plus "seq" (position in the journal), "txn" (the store transaction, i.e. the
+# command, it belongs to), "command", "at" and, for records written by
+# `fleck undo`, "undo" (the txn they revert). The JSON store appends them to
+# todos.journal and replays the tail on top of the todos.json snapshot; the
+# SQLite store keeps them in a journal table. `fleck log` and `fleck undo`
+# read them back the same way for both.
+
+
+def new_txn_id():
+    return uuid.uuid4().hex[:8]
+
+
+def current_command():
+    """The command line being run, as far as click knows it (e.g. "done 3 5")."""
+    ctx = click.get_current_context(silent=True)
+    if ctx is None:
+        return None
+    args = []
+    for param in ctx.command.params:
+        value = ctx.params.get(param.name)
+        if isinstance(param, click.Argument):
+            args.extend(str(v) for v in value) if isinstance(value, (tuple, list)) else args.append(str(value))
+        elif isinstance(value, str) and value != param.default:
+            args.append(f"{param.opts[-1]} {value}")
+        elif value is True and not param.default:
+            args.append(param.opts[-1])
+    return " ".join([ctx.info_name or ""] + args).strip()
+
+
+# Each task in the todos.json document also carries
+#   "next_id":     the next todo ID to hand out; IDs are never reused
+#   "by_status":   {status: [todo IDs]}
+#   "by_priority": {priority or "none": [todo IDs]}
+# with the ID lists kept as sorted integers, so filtered listings only look
+# at matching todos and come out in numeric order.
+
+def priority_key(priority):
+    return priority or "none"
+
+
+def _unindex(index, key, todo_id):
+    ids = index.get(key)
+    if ids:
+        position = bisect.bisect_left(ids, todo_id)
+        if position < len(ids) and ids[position] == todo_id:
+            del ids[position]
+        if not ids:
+            del index[key]
+
+
+def index_todo(task_data, todo_id, todo, before=None):
+    """Move a todo's entries in the status and priority indexes from ``before`` to ``todo``."""
+    number = int(todo_id)
+    for name, key in (("by_status", lambda t: t.get("status")), ("by_priority", lambda t: priority_key(t.get("priority")))):
+        index = task_data[name]
+        if before is not None:
+            if todo is not None and key(before) == key(todo):
+                continue
+            _unindex(index, key(before), number)
+        if todo is not None:
+            bisect.insort(index.setdefault(key(todo), []), number)
+
+
+def build_indexes(task_data):
+    """Add next_id and the status/priority indexes to a task that lacks them."""
+    task_data["by_status"] = {}
+    task_data["by_priority"] = {}
+    numbers = sorted(int(todo_id) for todo_id in task_data.get("todos", {}) if todo_id.isdigit())
+    for number in numbers:
+        index_todo(task_data, str(number), task_data["todos"][str(number)])
+    task_data["next_id"] = max(task_data.get("next_id", 1), numbers[-1] + 1 if numbers else 1)
+
+
+def apply_to_document(data, record):
+    """Apply a record to the todos.json document in place."""
+    op = record["op"]
+    task = record["task"]
+    tasks = data["tasks"]
+    if op == "create_task":
+        tasks[task] = dict(record["data"], todos={}, next_id=1, by_status={}, by_priority={})
+    elif op == "restore_task":
+        tasks[task] = json_codec.loads(json_codec.dumpb(record["data"]))
+        build_indexes(tasks[task])
+    elif op == "delete_task":
+        tasks.pop(task, None)
+    elif op == "put":
+        task_data = tasks[task]
+        todo_id = record["id"]
+        index_todo(task_data, todo_id, record["todo"], task_data["todos"].get(todo_id))
+        task_data["todos"][todo_id] = dict(record["todo"])
+        task_data["next_id"] = max(task_data["next_id"], int(todo_id) + 1)
+        task_data["updated_at"] = record["at"]
+    elif op == "delete":
+        task_data = tasks[task]
+        before = task_data["todos"].pop(record["id"], None)
+        if before is not None:
+            index_todo(task_data, record["id"], None, before)
+        task_data["updated_at"] = record["at"]
+    else:
+        raise ValueError(f"Unknown journal op: {op}")
+
+
+def invert(record):
+    """Return the record that undoes ``record``."""
+    op = record["op"]
+    task = record["task"]
+    if op == "create_task":
+        return {"op": "delete_task", "task": task, "before": dict(record["data"], todos={})}
+    if op == "restore_task":
+        return {"op": "delete_task", "task": task, "before": record["data"]}
+    if op == "delete_task":
+        return {"op": "restore_task", "task": task, "data": record["before"]}
+    if op == "put":
+        if record["before"] is None:
+            return {"op": "delete", "task": task, "id": record["id"], "before": record["todo"]}
+        return {"op": "put", "task": task, "id": record["id"], "todo": record["before"], "before": record["todo"]}
+    if op == "delete":
+        return {"op": "put", "task": task, "id": record["id"], "todo": record["before"], "before": None}
+    raise ValueError(f"Unknown journal op: {op}")
+
+
+def describe(record):
+    """One line summary of a record for `fleck log`."""
+    op = record["op"]
+    task = record["task"]
+    if op == "create_task":
+        return f"created workspace '{task}'"
+    if op == "restore_task":
+        return f"restored workspace '{task}' ({len(record['data'].get('todos', {}))} todos)"
+    if op == "delete_task":
+        return f"deleted workspace '{task}' ({len(record['before'].get('todos', {}))} todos)"
+    if op == "delete":
+        return f"deleted #{record['id']} '{record['before'].get('description', '')}'"
+
+    todo, before = record["todo"], record["before"]
+    if before is None:
+        return f"added #{record['id']} '{todo.get('description', '')}'"
+    changes = [
+        f"{key}: {before.get(key)} -> {todo.get(key)}"
+        for key in sorted(set(todo) | set(before))
+        if key not in ("updated_at", "time_spent") and todo.get(key) != before.get(key)
+    ]
+    return f"#{record['id']} " + (", ".join(changes) or "touched")
+
+
+def group_by_txn(records):
+    """Split records (oldest first) into [(txn, [records])], keeping journal order."""
+    groups = []
+    for record in records:
+        if groups and groups[-1][0] == record.get("txn"):
+            groups[-1][1].append(record)
+        else:
+            groups.append((record.get("txn"), [record]))
+    return groups
+
+
+def undoable(records):
+    """Return the records of the newest transaction that is not an undo and was not undone."""
+    undone = {record["undo"] for record in records if record.get("undo")}
+    for txn, group in reversed(group_by_txn(records)):
+        if group[0].get("undo") or txn in undone:
+            continue
+        return group
+    return None
+
+
+# -- todos.journal (JSON store) -----------------------------------------------
+
+def read_journal(path):
+    """Return the records in a journal file, oldest first.
+
+    A line that doesn't decode (a record torn by a crash mid-append) is
+    skipped with a warning; the records around it are still returned.
+    """
+    records = []
+    try:
+        with open(path, 'rb') as f:
+            for number, line in enumerate(f, start=1):
+                try:
+                    record = json_codec.loads(line)
+                except json_codec.JSONDecodeError:
+                    logger.warning(f"{path}:{number}: skipping a damaged journal record")
+                    continue
+                if isinstance(record, dict) and "seq" in record:
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _truncate_torn_tail(f, path):
+    """Cut ``f`` back to just after its last newline, dropping a record torn by an interrupted append."""
+    end = f.seek(0, os.SEEK_END)
+    position = end
+    while position > 0:
+        start = max(0, position - 64 * 1024)
+        f.seek(start)
+        newline = f.read(position - start).rfind(b"\n")
+        if newline != -1:
+            position = start + newline + 1
+            break
+        position = start
+    if position != end:
+        logger.warning(f"{path}: dropping {end - position} bytes of a torn journal record")
+        f.truncate(position)
+    f.seek(position)
+
+
+def append_journal(path, records):
+    """Append records to a journal file. Call with the store's lock held."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b') as f:
+        # Appending after a torn line would glue the first new record onto it
+        _truncate_torn_tail(f, path)
+        f.write(b"".join(json_codec.dumpb(record, pretty=False) + b"\n" for record in records))
+
+
+def trim_journal(path, keep):
+    """Drop all but roughly the last ``keep`` records, cutting only between transactions."""
+    records = read_journal(path)
+    if len(records) <= keep:
+        return
+    tail = records[-keep:]
+    if tail and tail[0].get("txn") == records[-keep - 1].get("txn"):
+        tail = [record for record in tail if record.get("txn") != tail[0].get("txn")]
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(b"".join(json_codec.dumpb(record, pretty=False) + b"\n" for record in tail))
+    os.replace(tmp_path, path)
+
+
+# -- commands -------------------------------------------------------------------
+
+@click.command()
+@click.option('-n', '--limit', type=click.IntRange(min=1), default=20, help="Number of commands to show")
+def log(limit):
+    """Show recent changes to todos and workspaces."""
+    from fleck.todo_store import get_store
+
+    groups = group_by_txn(get_store().journal_records())
+    if not groups:
+        click.secho("No changes recorded yet", fg="yellow")
+        return
+
+    undone = {group[0]["undo"] for _, group in groups if group[0].get("undo")}
+    for txn, group in reversed(groups[-limit:]):
+        first = group[0]
+        at = datetime.fromisoformat(first["at"]).strftime("%Y-%m-%d %H:%M:%S")
+        label = f"undo {first['undo']}" if first.get("undo") else (first.get("command") or "?")
+        marker = click.style("  (undone)", fg="yellow") if txn in undone else ""
+        click.echo(f"{click.style(txn or '-', fg='cyan')}  {at}  {label}{marker}")
+        for record in group:
+            click.echo(f"    {record['task']}: {describe(record)}")
+
+
+@click.command()
+@click.option('--dry-run', is_flag=True, help="Only show what would be undone")
+def undo(dry_run):
+    """Revert the most recent change to todos or workspaces.
+
+    Repeat to step further back. Only todo data is reverted: timers that were
+    stopped and session files that were deleted are not brought back.
+    """
+    from fleck.todo_store import get_store
+    from fleck.cli_new_1 import refresh_completion
+
+    store = get_store()
+    group = undoable(store.journal_records())
+    if group is None:
+        click.secho("Nothing to undo", fg="yellow")
+        return
+
+    click.echo(f"Undoing {group[0]['txn']} ({group[0].get('command') or '?'}):")
+    for record in group:
+        click.echo(f"    {record['task']}: {describe(record)}")
+    if dry_run:
+        return
+
+    with store.transaction(undo_of=group[0]["txn"]):
+        for record in reversed(group):
+            store.apply(invert(record))
+        for task in {record["task"] for record in group}:
+            refresh_completion(store, task)
+    click.secho("Done", fg="green")
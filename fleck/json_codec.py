@@ -0,0 +1,103 @@
+import os
+import json
+
+# One JSON encoder/decoder for every file fleck reads or writes (todos.json,
+# todos.journal, timers.json, session files, the tracker state, ...).
+#
+# orjson is used when it is installed, then msgspec, then the stdlib json
+# module; FLECK_JSON=orjson|msgspec|stdlib picks one explicitly. All three
+# produce the same documents: UTF-8, compact unless pretty output is asked
+# for (pretty=True, or FLECK_JSON_PRETTY=1 for every file). Files are always
+# read and written in binary, so the encoding never depends on the locale.
+
+BACKEND_ENV = "FLECK_JSON"
+PRETTY_ENV = "FLECK_JSON_PRETTY"
+
+# orjson raises a subclass of this; msgspec errors are converted to it
+JSONDecodeError = json.JSONDecodeError
+
+
+def _stdlib():
+    def dumpb(obj, pretty):
+        if pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return json.loads, dumpb
+
+
+def _orjson():
+    import orjson
+
+    def dumpb(obj, pretty):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return orjson.loads, dumpb
+
+
+def _msgspec():
+    import msgspec
+
+    def loads(data):
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise JSONDecodeError(str(e), data if isinstance(data, str) else "", 0) from None
+
+    def dumpb(obj, pretty):
+        data = msgspec.json.encode(obj)
+        return msgspec.json.format(data, indent=2) if pretty else data
+    return loads, dumpb
+
+
+BACKENDS = {"orjson": _orjson, "msgspec": _msgspec, "stdlib": _stdlib}
+
+
+def _select(name=None):
+    """Return (name, loads, dumpb) for the requested backend, or the fastest installed one."""
+    name = name or os.environ.get(BACKEND_ENV)
+    if name:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown {BACKEND_ENV} backend '{name}' (choose from {', '.join(BACKENDS)})")
+        return (name, *BACKENDS[name]())
+    for name, factory in BACKENDS.items():
+        try:
+            return (name, *factory())
+        except ImportError:
+            continue
+
+
+BACKEND, _loads, _dumpb = _select()
+PRETTY = os.environ.get(PRETTY_ENV, "") not in ("", "0")
+
+
+def use(name):
+    """Switch the backend for this process (used by the codec benchmark)."""
+    global BACKEND, _loads, _dumpb
+    BACKEND, _loads, _dumpb = _select(name)
+
+
+def loads(data):
+    """Decode JSON from str or UTF-8 bytes."""
+    return _loads(data)
+
+
+def dumpb(obj, pretty=None):
+    """Encode to UTF-8 bytes; compact unless pretty (default: FLECK_JSON_PRETTY)."""
+    return _dumpb(obj, PRETTY if pretty is None else pretty)
+
+
+def dumps(obj, pretty=None):
+    """Encode to a str."""
+    return dumpb(obj, pretty).decode("utf-8")
+
+
+def read(path):
+    """Read and decode a JSON file."""
+    with open(path, 'rb') as f:
+        return _loads(f.read())
+
+
+def write(path, obj, pretty=None):
+    """Encode ``obj`` into ``path``. Callers that need atomicity write a temp file and os.replace it."""
+    data = dumpb(obj, pretty)
+    with open(path, 'wb') as f:
+        f.write(data)
@@ -0,0 +1,51 @@
+import importlib
+import click
+
+
+class LazyGroup(click.Group):
+    """A click group that imports subcommands from other modules on first use.
+
+    ``lazy_subcommands`` maps a command name to ``"module:attribute"``. The module
+    is only imported when that command is invoked (or when help is rendered),
+    so trivial commands never pay for the platform, git or HTTP stacks.
+    """
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        base = super().list_commands(ctx)
+        lazy = sorted(self.lazy_subcommands.keys())
+        return sorted(set(base + lazy))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return self._lazy_load(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def shell_complete(self, ctx, incomplete):
+        """Complete subcommand names without importing the lazy modules."""
+        from click.shell_completion import CompletionItem
+
+        results = []
+        for name in self.list_commands(ctx):
+            if not name.startswith(incomplete):
+                continue
+            if name in self.lazy_subcommands:
+                results.append(CompletionItem(name))
+                continue
+            command = self.commands[name]
+            if not command.hidden:
+                results.append(CompletionItem(name, help=command.get_short_help_str()))
+        results.extend(click.Command.shell_complete(self, ctx, incomplete))
+        return results
+
+    def _lazy_load(self, cmd_name):
+        import_path = self.lazy_subcommands[cmd_name]
+        modname, attr = import_path.split(":", 1)
+        mod = importlib.import_module(modname)
+        cmd_object = getattr(mod, attr)
+        if not isinstance(cmd_object, click.Command):
+            raise ValueError(f"Lazy loading of {import_path} failed by returning a non-command object")
+        return cmd_object
@@ -0,0 +1,193 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+import click
+
+from fleck import json_codec
+from fleck.config import DATA_DIR
+
+# Lightweight span timing for save/restore/switch. Each top-level run() appends
+# one JSON line to METRICS_FILE:
+#   {"name": "save", "ts": <epoch>, "pid": ..., "dur_ms": ..., "ok": true,
+#    "spans": [{"name": "capture.applications", "start_ms": ..., "dur_ms": ..., "tid": ...}]}
+# A run() started while another is active (e.g. the save inside a switch) is
+# recorded as a span of the outer run. Spans outside any run cost next to nothing.
+
+METRICS_FILE = DATA_DIR / "metrics.jsonl"
+# When the file grows past MAX_BYTES it is trimmed to the last KEEP_RUNS runs
+MAX_BYTES = 2 * 1024 * 1024
+KEEP_RUNS = 1000
+
+_run = None
+_lock = threading.Lock()
+
+
+@contextmanager
+def span(name):
+    """Time the body of the ``with`` block as a phase of the active run."""
+    run_data = _run
+    if run_data is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        with _lock:
+            run_data["spans"].append({
+                "name": name,
+                "start_ms": round((start - run_data["_t0"]) * 1000, 3),
+                "dur_ms": round((end - start) * 1000, 3),
+                "tid": threading.get_ident(),
+            })
+
+
+@contextmanager
+def run(name):
+    """Record a run of ``name`` (save, restore, switch, ...) and append it to METRICS_FILE."""
+    global _run
+    if _run is not None:
+        with span(name):
+            yield
+        return
+
+    _run = {"name": name, "ts": time.time(), "pid": os.getpid(), "spans": [], "_t0": time.perf_counter()}
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        run_data, _run = _run, None
+        run_data["dur_ms"] = round((time.perf_counter() - run_data.pop("_t0")) * 1000, 3)
+        run_data["ok"] = ok
+        _append(run_data)
+
+
+def _append(run_data):
+    # Metrics must never make a command fail
+    try:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        with open(METRICS_FILE, 'a') as f:
+            f.write(json_codec.dumps(run_data, pretty=False) + "\n")
+        if METRICS_FILE.stat().st_size > MAX_BYTES:
+            _trim()
+    except OSError:
+        pass
+
+
+def _trim():
+    with open(METRICS_FILE, 'r') as f:
+        lines = f.readlines()[-KEEP_RUNS:]
+    tmp_file = METRICS_FILE.with_suffix(".tmp")
+    with open(tmp_file, 'w') as f:
+        f.writelines(lines)
+    os.replace(tmp_file, METRICS_FILE)
+
+
+def load_runs(name=None, last=None):
+    """Return recorded runs, oldest first, optionally only ``name`` runs and only the ``last`` N."""
+    if not METRICS_FILE.exists():
+        return []
+
+    runs = []
+    with open(METRICS_FILE, 'r') as f:
+        for line in f:
+            try:
+                run_data = json_codec.loads(line)
+            except json_codec.JSONDecodeError:
+                continue
+            if name is None or run_data.get("name") == name:
+                runs.append(run_data)
+    return runs[-last:] if last else runs
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+def phase_stats(runs):
+    """Return {phase: sorted durations in ms}; each run's own duration is listed under its name."""
+    phases = {}
+    for run_data in runs:
+        phases.setdefault(run_data["name"], []).append(run_data["dur_ms"])
+        for s in run_data.get("spans", []):
+            phases.setdefault(s["name"], []).append(s["dur_ms"])
+    for durations in phases.values():
+        durations.sort()
+    return phases
+
+
+def chrome_trace(run_data):
+    """Convert one run into Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+    base_us = run_data["ts"] * 1_000_000
+    pid = run_data.get("pid", 0)
+    tids = {}
+    events = [{
+        "name": run_data["name"], "cat": "fleck", "ph": "X",
+        "ts": base_us, "dur": run_data["dur_ms"] * 1000, "pid": pid, "tid": 0,
+    }]
+    for s in run_data.get("spans", []):
+        # Renumber thread idents so the timeline shows small, stable lane ids
+        tid = tids.setdefault(s.get("tid"), len(tids))
+        events.append({
+            "name": s["name"], "cat": "fleck", "ph": "X",
+            "ts": base_us + s["start_ms"] * 1000, "dur": s["dur_ms"] * 1000, "pid": pid, "tid": tid,
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+@click.command()
+@click.option('--last', type=click.IntRange(min=1), default=20, show_default=True, help="Number of recent runs to include")
+@click.option('--name', 'run_name', type=click.Choice(["save", "restore", "switch"]), help="Only include runs of this kind")
+@click.option('--trace', 'trace_file', type=click.Path(dir_okay=False, writable=True),
+              help="Write a Chrome trace-event JSON of a single run to this file")
+@click.option('--run', 'run_index', type=int, default=-1, help="Run to export with --trace (-1 = most recent)")
+def perf(last, run_name, trace_file, run_index):
+    """Show p50/p95 timings per save/restore/switch phase."""
+    from fleck.cli_new_1 import console
+
+    runs = load_runs(run_name, last)
+    if not runs:
+        console.print(f"[yellow]No runs recorded yet. Timings are written to {METRICS_FILE}[/yellow]")
+        return
+
+    if trace_file:
+        try:
+            run_data = runs[run_index]
+        except IndexError:
+            raise click.BadParameter(f"only {len(runs)} runs recorded", param_hint="--run")
+        json_codec.write(trace_file, chrome_trace(run_data))
+        console.print(f"[green]Wrote trace of '{run_data['name']}' ({run_data['dur_ms']:.0f} ms) to {trace_file}[/green]")
+        return
+
+    from rich.table import Table
+    from rich import box
+
+    table = Table(title=f"Phase timings over the last {len(runs)} runs", box=box.ROUNDED)
+    table.add_column("Phase", style="cyan")
+    table.add_column("Count", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    table.add_column("Max ms", justify="right")
+
+    for phase, durations in sorted(phase_stats(runs).items()):
+        table.add_row(
+            phase,
+            str(len(durations)),
+            f"{percentile(durations, 50):.1f}",
+            f"{percentile(durations, 95):.1f}",
+            f"{durations[-1]:.1f}",
+        )
+
+    console.print(table)
+    failed = sum(1 for run_data in runs if not run_data.get("ok", True))
+    if failed:
+        console.print(f"[yellow]{failed} of {len(runs)} runs raised an error[/yellow]")
@@ -0,0 +1,214 @@
+import time
+import ntpath
+from dataclasses import dataclass, field
+
+# Typed records for what fleck keeps in its JSON files. They are slotted
+# (no per-instance __dict__), which matters for sessions with thousands of
+# tabs, and convert to and from the stored dicts with one explicit
+# constructor call or dict literal each, without dataclasses.asdict.
+# Files keep their existing layout; from_dict accepts anything older
+# versions wrote, missing keys included.
+
+BROWSER_TAB_FIELDS = {"chrome": "chrome_tabs", "brave": "brave_tabs", "msedge": "edge_tabs"}
+
+
+@dataclass(slots=True)
+class AppInfo:
+    name: str = None
+    title: str = None
+    path: str = None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("name"), data.get("title"), data.get("path"))
+
+    def to_dict(self):
+        return {"name": self.name, "title": self.title, "path": self.path}
+
+
+@dataclass(slots=True)
+class BrowserTab:
+    title: str = None
+    url: str = None
+    browser: str = None
+    timestamp: int = None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("title"), data.get("url"), data.get("browser"), data.get("timestamp"))
+
+    def to_dict(self):
+        return {"title": self.title, "url": self.url, "browser": self.browser, "timestamp": self.timestamp}
+
+
+@dataclass(slots=True)
+class ExplorerPath:
+    title: str = None
+    path: str = None
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, str):
+            # Very old sessions stored bare paths
+            return cls(ntpath.basename(data.rstrip("\\/")) or data, data)
+        return cls(data.get("title"), data.get("path"))
+
+    def to_dict(self):
+        return {"title": self.title, "path": self.path}
+
+
+@dataclass(slots=True)
+class SessionSnapshot:
+    timestamp: str = None
+    applications: list = field(default_factory=list)
+    explorer: list = field(default_factory=list)
+    chrome_tabs: list = field(default_factory=list)
+    brave_tabs: list = field(default_factory=list)
+    edge_tabs: list = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data):
+        tab = BrowserTab.from_dict
+        return cls(
+            data.get("timestamp"),
+            [AppInfo.from_dict(app) for app in data.get("applications") or []],
+            [ExplorerPath.from_dict(path) for path in data.get("explorer") or []],
+            [tab(t) for t in data.get("chrome_tabs") or []],
+            [tab(t) for t in data.get("brave_tabs") or []],
+            [tab(t) for t in data.get("edge_tabs") or []],
+        )
+
+    def to_dict(self):
+        return {
+            "timestamp": self.timestamp,
+            "applications": [app.to_dict() for app in self.applications],
+            "explorer": [path.to_dict() for path in self.explorer],
+            "chrome_tabs": [t.to_dict() for t in self.chrome_tabs],
+            "brave_tabs": [t.to_dict() for t in self.brave_tabs],
+            "edge_tabs": [t.to_dict() for t in self.edge_tabs],
+        }
+
+    def tabs(self, browser):
+        """The saved tabs of ``browser`` ("chrome", "brave" or "msedge")."""
+        return getattr(self, BROWSER_TAB_FIELDS[browser])
+
+
+TODO_FIELDS = frozenset(("description", "status", "priority", "created_at", "updated_at", "time_spent"))
+
+
+@dataclass(slots=True)
+class Todo:
+    description: str = ""
+    status: str = None
+    priority: str = None
+    created_at: str = None
+    updated_at: str = None
+    time_spent: float = None
+    extra: dict = None  # keys this version doesn't know about, kept for the round trip
+
+    @classmethod
+    def from_dict(cls, data):
+        unknown = data.keys() - TODO_FIELDS
+        extra = {key: data[key] for key in unknown} if unknown else None
+        return cls(data.get("description", ""), data.get("status"), data.get("priority"), data.get("created_at"),
+                   data.get("updated_at"), data.get("time_spent"), extra)
+
+    def to_dict(self):
+        data = {
+            "description": self.description,
+            "status": self.status,
+            "priority": self.priority,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+        if self.time_spent is not None:
+            data["time_spent"] = self.time_spent
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+_BOOT_ID = None
+
+
+def boot_id():
+    """An id for the current boot; monotonic readings only compare within one boot."""
+    global _BOOT_ID
+    if _BOOT_ID is None:
+        try:
+            with open("/proc/sys/kernel/random/boot_id") as f:
+                _BOOT_ID = f.read().strip()
+        except OSError:
+            # Wall time at boot, to the minute: stable for the whole boot
+            # unless the clock is stepped by more than that
+            _BOOT_ID = str(round((time.time() - time.monotonic()) / 60))
+    return _BOOT_ID
+
+
+def read_clock():
+    """Return a (wall, monotonic, boot id) reading for TimerState transitions."""
+    return (time.time(), time.monotonic(), boot_id())
+
+
+@dataclass(slots=True)
+class TimerState:
+    start_time: float = None
+    elapsed: float = 0
+    is_running: bool = False
+    paused_at: float = None
+    start_mono: float = None  # time.monotonic() at start_time, valid while boot matches
+    boot: str = None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("start_time"), data.get("elapsed", 0), data.get("is_running", False), data.get("paused_at"),
+                   data.get("start_mono"), data.get("boot"))
+
+    def to_dict(self):
+        data = {"start_time": self.start_time, "elapsed": self.elapsed, "is_running": self.is_running, "paused_at": self.paused_at}
+        if self.start_mono is not None:
+            data["start_mono"] = self.start_mono
+            data["boot"] = self.boot
+        return data
+
+    # A timer is either running (start_* anchor the current stretch) or
+    # paused (elapsed holds the total). start() and pause() move between the
+    # two and are no-ops in the state they lead to, so repeating one never
+    # counts time twice. The running stretch is measured on the monotonic
+    # clock when it was started in this boot, which NTP steps and manual
+    # clock changes don't move; entries from older versions or an earlier
+    # boot fall back to wall-clock time.
+
+    def elapsed_at(self, now=None):
+        """Seconds recorded so far, including the running stretch. ``now`` is a read_clock() tuple."""
+        if not self.is_running:
+            return self.elapsed
+        wall, mono, boot = now or read_clock()
+        if self.start_mono is not None and self.boot == boot:
+            stretch = mono - self.start_mono
+        else:
+            stretch = wall - (self.start_time or wall)
+        return self.elapsed + max(stretch, 0)
+
+    def running_span(self, now=None):
+        """The (start, end) wall-clock times of the running stretch, its length measured like elapsed_at()."""
+        now = now or read_clock()
+        start = self.start_time if self.start_time is not None else now[0]
+        return start, start + (self.elapsed_at(now) - self.elapsed)
+
+    def start(self, now=None):
+        """Start (or resume) the timer, keeping the time already recorded."""
+        if not self.is_running:
+            self.start_time, self.start_mono, self.boot = now or read_clock()
+            self.is_running = True
+            self.paused_at = None
+        return self
+
+    def pause(self, now=None):
+        """Stop the clock, folding the running stretch into elapsed."""
+        if self.is_running:
+            now = now or read_clock()
+            self.elapsed = self.elapsed_at(now)
+            self.is_running = False
+            self.paused_at = now[0]
+        return self
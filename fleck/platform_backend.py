@@ -0,0 +1,258 @@
+import os
+import json
+import platform
+import subprocess
+import logging
+
+logger = logging.getLogger("platform_backend")
+
+# Everything session capture, restore, focus mode and the session tracker need
+# from the OS goes through a backend, so the Win32/COM/PowerShell calls live in
+# one place and a simulated backend can stand in for them on any platform.
+#
+#   FLECK_BACKEND=native      real OS calls (default)
+#   FLECK_BACKEND=simulated   fake windows, processes, folders and browser
+#                             profiles; see fleck/simulated_backend.py
+#
+# The Windows modules (win32gui, win32process, win32com, psutil) are imported
+# only when a native backend method needs them.
+
+BACKEND_ENV = "FLECK_BACKEND"
+
+
+class Window:
+    """A top-level window as seen by EnumWindows."""
+    __slots__ = ("hwnd", "pid", "title", "visible")
+
+    def __init__(self, hwnd, pid, title, visible=True):
+        self.hwnd = hwnd
+        self.pid = pid
+        self.title = title
+        self.visible = visible
+
+
+class PlatformBackend:
+    """Interface for the OS operations fleck relies on."""
+
+    name = "base"
+
+    def window_processes(self):
+        """Return processes that own a titled window, as Get-Process reports them:
+        [{"ProcessName": ..., "MainWindowTitle": ..., "Path": ...}]."""
+        raise NotImplementedError
+
+    def explorer_folders(self):
+        """Return the folder paths open in File Explorer windows."""
+        raise NotImplementedError
+
+    def browser_profile_dir(self, browser):
+        """Return the profile directory of ``browser`` (holding its History DB), or None."""
+        raise NotImplementedError
+
+    def windows(self):
+        """Return every top-level window as a list of Window."""
+        raise NotImplementedError
+
+    def foreground_window_title(self):
+        raise NotImplementedError
+
+    def processes(self):
+        """Return running processes as [{"pid": ..., "name": ...}]."""
+        raise NotImplementedError
+
+    def kill_process(self, pid, force=True):
+        """Kill (or with force=False, terminate) a process. Returns False if it is gone or protected."""
+        raise NotImplementedError
+
+    def folder_exists(self, path):
+        raise NotImplementedError
+
+    def open_folder(self, path):
+        raise NotImplementedError
+
+    def open_app(self, app_info):
+        raise NotImplementedError
+
+    def open_urls(self, browser, urls):
+        """Open ``urls`` in ``browser``. Returns False if the browser is unsupported here."""
+        raise NotImplementedError
+
+    def browser_debug_tabs(self, port):
+        """Return the URLs of the pages open in a browser's remote-debugging endpoint."""
+        raise NotImplementedError
+
+    def gui_pids(self):
+        """PIDs that own a visible, titled top-level window."""
+        return {w.pid for w in self.windows() if w.visible and w.title}
+
+
+class NativeBackend(PlatformBackend):
+    """The real OS: Win32/COM/PowerShell on Windows, subprocess launches elsewhere."""
+
+    name = "native"
+
+    BROWSER_COMMANDS = {
+        "chrome": {
+            "Windows": "start chrome",
+            "Darwin": "open -a \"Google Chrome\"",
+            "Linux": "google-chrome"
+        },
+        "brave": {
+            "Windows": "start brave",
+            "Darwin": "open -a \"Brave Browser\"",
+            "Linux": "brave-browser"
+        },
+        "msedge": {
+            "Windows": "start msedge",
+            "Darwin": "open -a \"Microsoft Edge\"",
+            "Linux": "microsoft-edge"
+        }
+    }
+
+    def __init__(self):
+        self.os_name = platform.system()
+
+    def window_processes(self):
+        if self.os_name != "Windows":
+            return []
+        # Use powershell to get running applications
+        cmd = "powershell \"Get-Process | Where-Object {$_.MainWindowTitle -ne ''} | Select-Object ProcessName, MainWindowTitle, Path | ConvertTo-Json\""
+        output = subprocess.check_output(cmd, shell=True).decode('utf-8', errors='ignore')
+        data = json.loads(output)
+        # Handle single process case where JSON doesn't return a list
+        if isinstance(data, dict):
+            data = [data]
+        return data
+
+    def explorer_folders(self):
+        import win32com.client
+
+        paths = []
+        shell = win32com.client.Dispatch("Shell.Application")
+        for window in shell.Windows():
+            if window and window.FullName and "explorer.exe" in window.FullName.lower():
+                folder = window.Document.Folder
+                if folder and folder.Self and folder.Self.Path:
+                    paths.append(folder.Self.Path)
+        return paths
+
+    def browser_profile_dir(self, browser):
+        local_appdata = os.getenv("LOCALAPPDATA")
+        if not local_appdata:
+            return None
+        browser_map = {
+            "chrome": os.path.join(local_appdata, "Google", "Chrome", "User Data", "Default"),
+            "brave": os.path.join(local_appdata, "BraveSoftware", "Brave-Browser", "User Data", "Default"),
+            "msedge": os.path.join(local_appdata, "Microsoft", "Edge", "User Data", "Default")
+        }
+        return browser_map.get(browser.lower())
+
+    def windows(self):
+        import win32gui
+        import win32process
+
+        windows = []
+
+        def callback(hwnd, _):
+            try:
+                _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            except Exception:
+                pid = None
+            windows.append(Window(hwnd, pid, win32gui.GetWindowText(hwnd), bool(win32gui.IsWindowVisible(hwnd))))
+            return True
+
+        win32gui.EnumWindows(callback, None)
+        return windows
+
+    def foreground_window_title(self):
+        import win32gui
+
+        window = win32gui.GetForegroundWindow()
+        return win32gui.GetWindowText(window)
+
+    def processes(self):
+        import psutil
+
+        procs = []
+        for proc in psutil.process_iter(['pid', 'name']):
+            if proc.info['name']:
+                procs.append({"pid": proc.info['pid'], "name": proc.info['name']})
+        return procs
+
+    def kill_process(self, pid, force=True):
+        import psutil
+
+        try:
+            proc = psutil.Process(pid)
+            if force:
+                proc.kill()
+            else:
+                proc.terminate()
+            return True
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+
+    def folder_exists(self, path):
+        return os.path.exists(path)
+
+    def open_folder(self, path):
+        subprocess.Popen(f'explorer "{path}"')
+
+    def open_app(self, app_info):
+        if self.os_name == "Windows":
+            subprocess.Popen([app_info["path"]], shell=True)
+        elif self.os_name == "Darwin":  # macOS
+            subprocess.Popen(["open", "-a", app_info["name"]])
+        elif self.os_name == "Linux":
+            subprocess.Popen([app_info["path"]])
+
+    def open_urls(self, browser, urls):
+        base_command = self.BROWSER_COMMANDS.get(browser, {}).get(self.os_name)
+        if not base_command:
+            logger.warning(f"Unsupported browser {browser} on {self.os_name}")
+            return False
+
+        # Open all URLs at once
+        if self.os_name == "Windows":
+            url_args = " ".join([f'"{url}"' for url in urls])
+            full_command = f"{base_command} {url_args}"
+            subprocess.Popen(full_command, shell=True)
+        elif self.os_name == "Darwin":
+            # On macOS, we first open the browser then the URLs
+            subprocess.Popen(base_command.split())
+            for url in urls:
+                subprocess.Popen([base_command, url], shell=True)
+        elif self.os_name == "Linux":
+            subprocess.Popen([base_command] + urls)
+        return True
+
+    def browser_debug_tabs(self, port):
+        import requests
+
+        response = requests.get(f"http://localhost:{port}/json")
+        tabs = response.json()
+        return [tab['url'] for tab in tabs if tab['type'] == 'page']
+
+
+_backend = None
+
+
+def get_backend():
+    """Return the process-wide backend, chosen by FLECK_BACKEND on first use."""
+    global _backend
+    if _backend is None:
+        name = os.environ.get(BACKEND_ENV, "native")
+        if name == "simulated":
+            from fleck.simulated_backend import SimulatedBackend
+            _backend = SimulatedBackend.from_env()
+        elif name == "native":
+            _backend = NativeBackend()
+        else:
+            raise ValueError(f"Unknown {BACKEND_ENV} '{name}' (expected 'native' or 'simulated')")
+    return _backend
+
+
+def set_backend(backend):
+    """Install ``backend`` for this process (benchmarks use this with a SimulatedBackend)."""
+    global _backend
+    _backend = backend
@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+from fleck.config import PROFILES_DIR
+
+# `fleck --profile[=cpu|mem|all] <command>` support. cProfile covers the main
+# thread; tracemalloc sees allocations from every thread. Results are written
+# to PROFILES_DIR (`.prof` files open in pstats/snakeviz, `.tracemalloc` files
+# load with tracemalloc.Snapshot.load) and the top hotspots go to stderr so
+# --json output stays clean.
+
+PROFILE_MODES = ("cpu", "mem", "all")
+DEFAULT_TOP = 20
+
+# Exported while profiling so GUI windows launched by the command profile themselves too
+PROFILE_ENV = "FLECK_PROFILE"
+PROFILE_TOP_ENV = "FLECK_PROFILE_TOP"
+
+
+class Profiler:
+    """Profile a stretch of code with cProfile and/or tracemalloc."""
+
+    def __init__(self, name, mode="cpu", top=DEFAULT_TOP):
+        self.name = name
+        self.mode = mode
+        self.top = top
+        self._cpu = None
+        self._started = None
+        self._previous_env = None
+
+    @property
+    def cpu(self):
+        return self.mode in ("cpu", "all")
+
+    @property
+    def mem(self):
+        return self.mode in ("mem", "all")
+
+    def start(self):
+        self._previous_env = (os.environ.get(PROFILE_ENV), os.environ.get(PROFILE_TOP_ENV))
+        os.environ[PROFILE_ENV] = self.mode
+        os.environ[PROFILE_TOP_ENV] = str(self.top)
+
+        if self.mem:
+            import tracemalloc
+            tracemalloc.start(10)
+        if self.cpu:
+            import cProfile
+            self._cpu = cProfile.Profile()
+            self._cpu.enable()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        """Stop profiling, write the results and print the top hotspots."""
+        if self._started is None:
+            return
+        wall = time.perf_counter() - self._started
+        self._started = None
+        if self._cpu is not None:
+            self._cpu.disable()
+        snapshot = peak = None
+        if self.mem:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        for name, value in zip((PROFILE_ENV, PROFILE_TOP_ENV), self._previous_env):
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        base = PROFILES_DIR / f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        out = sys.stderr
+        print(f"\n--- profile: {self.name} ({wall * 1000:.1f} ms wall) ---", file=out)
+        if self._cpu is not None:
+            self._report_cpu(base.with_suffix(".prof"), out)
+        if snapshot is not None:
+            self._report_mem(snapshot, peak, base.with_suffix(".tracemalloc"), out)
+
+    def _report_cpu(self, path, out):
+        import pstats
+
+        self._cpu.dump_stats(path)
+        print(f"CPU profile written to {path}", file=out)
+        pstats.Stats(self._cpu, stream=out).sort_stats("cumulative").print_stats(self.top)
+
+    def _report_mem(self, snapshot, peak, path, out):
+        import tracemalloc
+
+        snapshot.dump(str(path))
+        print(f"Memory snapshot written to {path} (peak traced: {peak / 1024:.1f} KiB)", file=out)
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        for index, stat in enumerate(snapshot.statistics("lineno")[:self.top], start=1):
+            frame = stat.traceback[0]
+            print(f"{index:>3}. {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KiB in {stat.count} blocks", file=out)
+
+
+@contextmanager
+def profiled(name, mode="cpu", top=DEFAULT_TOP):
+    """Profile the body of the ``with`` block."""
+    profiler = Profiler(name, mode, top)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+
+
+def from_env(name):
+    """Profile a child process (e.g. a GUI window) when its parent ran under --profile."""
+    mode = os.environ.get(PROFILE_ENV)
+    if mode not in PROFILE_MODES:
+        return nullcontext()
+    try:
+        top = int(os.environ.get(PROFILE_TOP_ENV, DEFAULT_TOP))
+    except ValueError:
+        top = DEFAULT_TOP
+    return profiled(name, mode, top)
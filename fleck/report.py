@@ -0,0 +1,508 @@
+import gc
+import io
+import os
+import math
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import click
+
+from fleck import json_codec
+from fleck import state_cache
+from fleck import intervals
+from fleck.config import INTERVAL_DIR
+from fleck.versioned_file import atomic_write
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# `fleck report time`: where tracked time went and how quickly todos get done,
+# across every workspace.
+#
+# Tracked time comes from the interval log plus the running stretch of every
+# running timer; done todos (with their created_at, finish time and
+# time_spent) from the todo store and the archives. Both are loaded once into
+# flat columns, with todos and group keys turned into integer codes, and all
+# aggregation (grouped sums and counts, grouped percentiles, the hour-of-day
+# histogram) runs on those columns as NumPy array operations. Decoding the
+# log is the expensive part, so with NumPy each week's segment is decoded
+# once into a column cache next to it (<segment>.npz), reused for as long as
+# the segment and its index keep their sizes. Without NumPy
+# (`pip install fleck[report]`) the same kernels run as plain Python loops
+# over freshly decoded segments and give the same numbers, only slower.
+
+BY_CHOICES = ("workspace", "todo", "priority", "day")
+PERCENTILES = (50, 90)
+HOUR = 3600
+KEY_SEPARATOR = "\x1f"
+
+
+def use_numpy(enabled):
+    """Switch between the NumPy and pure-Python kernels (used by the report benchmark)."""
+    global np
+    if not enabled:
+        np = None
+        return
+    import numpy
+    np = numpy
+
+
+def engine():
+    return "numpy" if np is not None else "python"
+
+
+# -- kernels ---------------------------------------------------------------------
+
+def _array(values, dtype=float):
+    return np.asarray(values, dtype=dtype) if np is not None else list(values)
+
+
+def _take(mapping, codes):
+    """mapping[code] for every code."""
+    if np is not None:
+        return np.asarray(mapping, dtype=np.int64)[codes]
+    return [mapping[code] for code in codes]
+
+
+def _group_sums(codes, values, size):
+    if np is not None:
+        return np.bincount(codes, weights=values, minlength=size).tolist()
+    sums = [0.0] * size
+    for code, value in zip(codes, values):
+        sums[code] += value
+    return sums
+
+
+def _group_counts(codes, size):
+    if np is not None:
+        return np.bincount(codes, minlength=size).tolist()
+    counts = [0] * size
+    for code in codes:
+        counts[code] += 1
+    return counts
+
+
+def _group_percentiles(codes, values, size, qs=PERCENTILES):
+    """Return {q: [per-group percentile or None]}, linearly interpolated like numpy.percentile."""
+    if np is not None:
+        order = np.lexsort((values, codes))
+        ordered = values[order]
+        counts = np.bincount(codes, minlength=size)
+        starts = np.cumsum(counts) - counts
+        last = np.maximum(counts - 1, 0)
+        result = {}
+        for q in qs:
+            position = last * (q / 100)
+            low = np.floor(position).astype(np.int64)
+            high = np.minimum(low + 1, last)
+            fraction = position - low
+            if len(ordered):
+                picked = ordered[np.minimum(starts + low, len(ordered) - 1)] * (1 - fraction) \
+                    + ordered[np.minimum(starts + high, len(ordered) - 1)] * fraction
+            else:
+                picked = np.zeros(size)
+            result[q] = [value if count else None for value, count in zip(picked.tolist(), counts.tolist())]
+        return result
+
+    groups = [[] for _ in range(size)]
+    for code, value in zip(codes, values):
+        groups[code].append(value)
+    result = {q: [] for q in qs}
+    for group in groups:
+        group.sort()
+        for q in qs:
+            if not group:
+                result[q].append(None)
+                continue
+            position = (len(group) - 1) * (q / 100)
+            low = math.floor(position)
+            high = min(low + 1, len(group) - 1)
+            fraction = position - low
+            result[q].append(group[low] * (1 - fraction) + group[high] * fraction)
+    return result
+
+
+def _hour_histogram(starts, ends):
+    """Seconds tracked in each hour of the day, from stretches given as seconds since their local midnight."""
+    if np is not None:
+        return [float((np.clip(ends, hour * HOUR, (hour + 1) * HOUR) - np.clip(starts, hour * HOUR, (hour + 1) * HOUR)).sum())
+                for hour in range(24)]
+    hours = [0.0] * 24
+    for start, end in zip(starts, ends):
+        hour = int(start // HOUR)
+        while start < end and hour < 24:
+            boundary = min(end, (hour + 1) * HOUR)
+            hours[hour] += boundary - start
+            start, hour = boundary, hour + 1
+    return hours
+
+
+def _compact(codes, size):
+    """Renumber codes in range(size) to 0..k-1 over the k values in use; returns (used values, new codes)."""
+    used = np.flatnonzero(np.bincount(codes, minlength=size))
+    renumber = np.zeros(size, dtype=np.int64)
+    renumber[used] = np.arange(len(used))
+    return used, renumber[codes]
+
+
+def _factorize(values):
+    """Return (codes, labels): the position of each value in labels, which are in first-seen order."""
+    labels = list(dict.fromkeys(values))
+    positions = {label: n for n, label in enumerate(labels)}
+    return list(map(positions.__getitem__, values)), labels
+
+
+# -- loading ---------------------------------------------------------------------
+
+@contextmanager
+def _gc_paused():
+    # Loading builds millions of small tuples and floats but no cycles; without
+    # this the collector rescans them over and over, doubling the load time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _read_segment(segment):
+    """Columns of one log segment as lists: (todo labels, codes, day ordinals, starts, ends)."""
+    monday = intervals.segment_monday(segment)
+    todos, days, starts, ends = [], [], [], []
+    for day, records in intervals.iter_days(monday, monday + timedelta(days=6)):
+        if records:
+            tasks, todo_ids, record_starts, record_ends = zip(*records)
+            todos.extend(zip(tasks, todo_ids))
+            days.extend([day.toordinal()] * len(records))
+            starts.extend(record_starts)
+            ends.extend(record_ends)
+    codes, labels = _factorize(todos)
+    return labels, codes, days, starts, ends
+
+
+def _segment_arrays(segment):
+    """Columns of one log segment as arrays, from its column cache (<segment>.npz) while that is current.
+
+    Todos are coded into an array of "workspace<KEY_SEPARATOR>todo_id" keys.
+    """
+    try:
+        stamp = np.array([os.stat(INTERVAL_DIR / f"{segment}.{ext}").st_size for ext in ("jsonl", "idx")])
+    except FileNotFoundError:
+        return None
+    cache = INTERVAL_DIR / f"{segment}.npz"
+    try:
+        with np.load(cache) as cached:
+            if np.array_equal(cached["stamp"], stamp):
+                return cached["key"], cached["code"], cached["day"], cached["start"], cached["end"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    labels, codes, days, starts, ends = _read_segment(segment)
+    columns = {
+        "stamp": stamp,
+        "key": np.array([f"{task}{KEY_SEPARATOR}{todo_id}" for task, todo_id in labels], dtype=str),
+        "code": np.array(codes, dtype=np.int32),
+        "day": np.array(days, dtype=np.int32),
+        "start": np.array(starts, dtype=float),
+        "end": np.array(ends, dtype=float),
+    }
+    buffer = io.BytesIO()
+    np.savez(buffer, **columns)
+    atomic_write(cache, buffer.getvalue())
+    return columns["key"], columns["code"], columns["day"], columns["start"], columns["end"]
+
+
+def load_tracked(first, last, workspace=None, now=None):
+    """Return the stretches tracked on days ``first``..``last`` as columns.
+
+    {"todo": per-row codes into "todo_labels" ((workspace, todo_id) pairs),
+    "day": date ordinals, "start"/"end": Unix times, "midnight": Unix time of
+    each row's local midnight}. Running timers contribute their stretch so far.
+    """
+    running = [((task, todo_id), day.toordinal(), start, end)
+               for day, task, todo_id, start, end in intervals.iter_running(first, last, workspace, now)]
+
+    low, high = first.toordinal(), last.toordinal()
+    with _gc_paused():
+        if np is None:
+            todos, days, starts, ends = [], [], [], []
+            for segment in intervals.segments(first, last):
+                labels, codes, segment_days, segment_starts, segment_ends = _read_segment(segment)
+                for row in zip(codes, segment_days, segment_starts, segment_ends):
+                    todo = labels[row[0]]
+                    if low <= row[1] <= high and (workspace is None or todo[0] == workspace):
+                        todos.append(todo)
+                        days.append(row[1])
+                        starts.append(row[2])
+                        ends.append(row[3])
+            for todo, day, start, end in running:
+                todos.append(todo)
+                days.append(day)
+                starts.append(start)
+                ends.append(end)
+            codes, labels = _factorize(todos)
+            midnights = {day: intervals.midnight(date.fromordinal(day)) for day in set(days)}
+            return {"todo": codes, "todo_labels": labels, "day": days, "start": starts, "end": ends,
+                    "midnight": [midnights[day] for day in days]}
+
+        parts = []
+        for segment in intervals.segments(first, last):
+            arrays = _segment_arrays(segment)
+            if arrays is None:
+                continue
+            keys, codes, days, starts, ends = arrays
+            keep = (days >= low) & (days <= high)
+            if workspace is not None:
+                keep &= np.char.startswith(keys, workspace + KEY_SEPARATOR)[codes]
+            parts.append((keys, codes[keep], days[keep], starts[keep], ends[keep]))
+        if running:
+            todos, days, starts, ends = zip(*running)
+            keys = np.array([f"{task}{KEY_SEPARATOR}{todo_id}" for task, todo_id in todos], dtype=str)
+            parts.append((keys, np.arange(len(keys)), np.array(days, dtype=np.int32), np.array(starts), np.array(ends)))
+        if not parts:
+            parts.append((np.zeros(0, dtype=str), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0), np.zeros(0)))
+
+        # Number the todos across segments: each segment's codes index its own
+        # keys, so offset them into the concatenated keys, map those onto the
+        # distinct keys, and keep only the todos some row still refers to
+        key_columns = [part[0] for part in parts]
+        offsets = np.cumsum([0] + [len(keys) for keys in key_columns[:-1]])
+        distinct, key_codes = np.unique(np.concatenate(key_columns), return_inverse=True)
+        codes = key_codes[np.concatenate([part[1] + offset for part, offset in zip(parts, offsets)])]
+        days, starts, ends = (np.concatenate([part[n] for part in parts]) for n in (2, 3, 4))
+        used, codes = _compact(codes, len(distinct))
+        labels = [tuple(key.split(KEY_SEPARATOR, 1)) for key in distinct[used].tolist()]
+        base = int(days.min()) if len(days) else 0
+        unique_days, day_index = _compact(days - base, (int(days.max()) - base + 1) if len(days) else 0)
+        midnights = np.array([intervals.midnight(date.fromordinal(int(day) + base)) for day in unique_days])[day_index]
+        return {"todo": codes, "todo_labels": labels, "day": days, "start": starts, "end": ends, "midnight": midnights}
+
+
+def load_todos(since=None, workspace=None):
+    """Return ({(workspace, todo_id): priority} for every todo, and the done todos finished since ``since`` as columns).
+
+    The done columns are {"todo": [(workspace, todo_id)], "created": [...],
+    "done": [...] (ISO strings), "time_spent": [seconds]}; archived todos are included.
+    """
+    from fleck.archive import iter_archived
+    from fleck.todo_store import get_store
+
+    store = get_store()
+    since = since.isoformat() if since else ""
+    priorities = {}
+    done = {"todo": [], "created": [], "done": [], "time_spent": []}
+
+    def add(task, todo_id, todo):
+        priorities[(task, todo_id)] = todo.get("priority") or "none"
+        if todo.get("status") == "Done" and (todo.get("updated_at") or "") >= since:
+            done["todo"].append((task, todo_id))
+            done["created"].append(todo.get("created_at"))
+            done["done"].append(todo.get("updated_at"))
+            done["time_spent"].append(todo.get("time_spent") or 0)
+
+    # One read of todos.json for all workspaces
+    with state_cache.cached():
+        for task in store.task_names() if workspace is None else [workspace]:
+            todos = store.todos(task)
+            for todo_id, todo in todos.items():
+                add(task, todo_id, todo)
+            for todo_id, todo in iter_archived(task, skip_ids=todos):
+                add(task, todo_id, dict(todo, status="Done"))
+    return priorities, done
+
+
+def _datetimes(values):
+    try:
+        return np.array(values, dtype="datetime64[us]")
+    except ValueError:
+        # Some value isn't ISO 8601; convert one by one and leave that one out
+        parsed = []
+        for value in values:
+            try:
+                parsed.append(np.datetime64(value, "us"))
+            except (TypeError, ValueError):
+                parsed.append(np.datetime64("NaT"))
+        return np.array(parsed, dtype="datetime64[us]")
+
+
+def _seconds_between(starts, ends):
+    """Seconds from each ISO start to its ISO end, leaving out pairs that don't parse."""
+    if np is not None:
+        begin, finish = _datetimes(starts), _datetimes(ends)
+        valid = ~(np.isnat(begin) | np.isnat(finish))
+        return (finish - begin)[valid] / np.timedelta64(1, "s"), valid
+    seconds, valid = [], []
+    for start, end in zip(starts, ends):
+        try:
+            seconds.append((datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds())
+            valid.append(True)
+        except (TypeError, ValueError):
+            valid.append(False)
+    return seconds, valid
+
+
+def _compress(values, valid):
+    if np is not None:
+        return np.asarray(values)[valid]
+    return [value for value, keep in zip(values, valid) if keep]
+
+
+# -- the report ------------------------------------------------------------------
+
+def _key_codes(by, todo_codes, todo_labels, priorities, days=None):
+    """Group codes and labels for ``by``, from per-row todo codes (or day ordinals for "day")."""
+    if by == "todo":
+        return todo_codes, [f"{task}:{todo_id}" for task, todo_id in todo_labels]
+    if by == "day":
+        if np is not None:
+            days = np.asarray(days, dtype=np.int64)
+            base = int(days.min()) if len(days) else 0
+            labels, codes = _compact(days - base, (int(days.max()) - base + 1) if len(days) else 0)
+            labels = (labels + base).tolist()
+        else:
+            codes, labels = _factorize(days)
+        return codes, [date.fromordinal(ordinal).isoformat() for ordinal in labels]
+    if by == "workspace":
+        keys = [task for task, _ in todo_labels]
+    else:
+        keys = [priorities.get(label, "none") for label in todo_labels]
+    key_of_todo, labels = _factorize(keys)
+    return _take(key_of_todo, todo_codes), labels
+
+
+def time_report(by="workspace", since=None, workspace=None, until=None):
+    """Build the report as a JSON-ready dict. ``since``/``until`` are dates (None: all history, today)."""
+    until = until or date.today()
+    priorities, done = load_todos(since, workspace)
+    first = since
+    if first is None:
+        starts = [intervals.first_day()]
+        if done["done"]:
+            starts.append(date.fromisoformat(min(filter(None, done["done"]), default=until.isoformat())[:10]))
+        first = min(filter(None, starts), default=until)
+
+    tracked = load_tracked(first, until, workspace)
+    todo_codes, todo_labels = tracked["todo"], tracked["todo_labels"]
+    starts, ends, midnights = tracked["start"], tracked["end"], tracked["midnight"]
+    if np is not None:
+        durations, day_starts, day_ends = ends - starts, starts - midnights, ends - midnights
+    else:
+        durations = [end - start for start, end in zip(starts, ends)]
+        day_starts = [start - base for start, base in zip(starts, midnights)]
+        day_ends = [end - base for end, base in zip(ends, midnights)]
+
+    codes, labels = _key_codes(by, todo_codes, todo_labels, priorities, tracked["day"])
+    sums = _group_sums(codes, durations, len(labels))
+    rows = [{"key": label, "seconds": seconds} for label, seconds in zip(labels, sums)]
+    rows.sort(key=(lambda row: row["key"]) if by == "day" else (lambda row: (-row["seconds"], row["key"])))
+
+    # Done todos: grouped like the tracked time, except per-todo groups of one
+    # would say nothing, so --by todo groups them per workspace
+    done_by = "workspace" if by == "todo" else by
+    to_done, valid = _seconds_between(done["created"], done["done"])
+    done_todos = [label for label, keep in zip(done["todo"], valid) if keep]
+    finished = [value[:10] for value, keep in zip(done["done"], valid) if keep]
+    done_codes, done_labels = _factorize(done_todos)
+    done_codes = _array(done_codes, int)
+    days = [date.fromisoformat(day).toordinal() for day in finished] if done_by == "day" else None
+    group_codes, group_labels = _key_codes(done_by, done_codes, done_labels, priorities, days)
+    size = len(group_labels)
+    counts = _group_counts(group_codes, size)
+    spent = _group_sums(group_codes, _array(_compress(done["time_spent"], valid)), size)
+    percentiles = _group_percentiles(group_codes, _array(to_done), size)
+    done_rows = [
+        {"key": label, "count": count, "time_spent": spent[n], **{f"p{q}_to_done": percentiles[q][n] for q in PERCENTILES}}
+        for n, (label, count) in enumerate(zip(group_labels, counts))
+    ]
+    done_rows.sort(key=(lambda row: row["key"]) if done_by == "day" else (lambda row: (-row["count"], row["key"])))
+
+    weeks = max((until - first).days + 1, 1) / 7
+    priority_codes, priority_labels = _key_codes("priority", done_codes, done_labels, priorities)
+    throughput = [
+        {"priority": label, "done": count, "per_week": count / weeks}
+        for label, count in zip(priority_labels, _group_counts(priority_codes, len(priority_labels)))
+    ]
+    throughput.sort(key=lambda row: (-row["done"], row["priority"]))
+
+    return {
+        "by": by,
+        "since": first.isoformat(),
+        "until": until.isoformat(),
+        "engine": engine(),
+        "intervals": len(durations),
+        "tracked": rows,
+        "hours": _hour_histogram(day_starts, day_ends),
+        "done_by": done_by,
+        "done": done_rows,
+        "throughput": throughput,
+    }
+
+
+def parse_since(value):
+    """Parse "all", an age like 30d/2w/1y or a day (see intervals.parse_day) into a start date, None for all."""
+    from fleck.archive import parse_age
+
+    text = (value or "").strip().lower()
+    if text in ("", "all"):
+        return None
+    if text[:-1].isdigit() and text.endswith("y"):
+        return date.today() - timedelta(days=365 * int(text[:-1]))
+    try:
+        return intervals.parse_day(text)
+    except click.BadParameter:
+        pass
+    try:
+        return (datetime.now() - parse_age(text)).date()
+    except click.BadParameter:
+        raise click.BadParameter(f"'{value}' is not 'all', an age like 30d or 1y, or a day like 2024-05-14")
+
+
+@click.group()
+def report():
+    """Reports over tracked time and finished todos."""
+
+
+@report.command(name="time")
+@click.option('--by', type=click.Choice(BY_CHOICES), default="workspace", show_default=True, help="How to group tracked time")
+@click.option('--since', default="30d", show_default=True, help="Start of the report: all, an age like 30d or 1y, or YYYY-MM-DD")
+@click.option('-w', '--workspace', help="Only this workspace")
+@click.option('--json', 'as_json', is_flag=True, help="Print the report as JSON")
+def time_command(by, since, workspace, as_json):
+    """Where tracked time went, when in the day, and how fast todos get done."""
+    from fleck.cli_new_1 import format_seconds
+
+    result = time_report(by, parse_since(since), workspace)
+    if as_json:
+        click.echo(json_codec.dumps(result, pretty=True))
+        return
+
+    span = f"{result['since']} to {result['until']}"
+    total = sum(row["seconds"] for row in result["tracked"])
+    click.secho(f"Tracked time by {by}, {span}: {format_seconds(total)} in {result['intervals']} intervals", bold=True)
+    if not result["tracked"]:
+        click.secho("  Nothing tracked", fg="yellow")
+    for row in result["tracked"]:
+        share = row["seconds"] / total * 100 if total else 0
+        click.echo(f"  {row['key']:<28} {format_seconds(row['seconds']):>12} {share:5.1f}%")
+
+    peak = max(result["hours"]) or 1
+    click.secho("\nTime of day", bold=True)
+    for hour, seconds in enumerate(result["hours"]):
+        if seconds:
+            click.echo(f"  {hour:02}:00 {'█' * max(1, round(seconds / peak * 30)):<30} {format_seconds(seconds):>10}")
+
+    click.secho(f"\nDone todos by {result['done_by']}, {span}", bold=True)
+    if not result["done"]:
+        click.secho("  None finished", fg="yellow")
+    for row in result["done"]:
+        p50, p90 = (row[f"p{q}_to_done"] for q in PERCENTILES)
+        click.echo(f"  {row['key']:<28} {row['count']:>6} done  {format_seconds(row['time_spent']):>10} spent  "
+                   f"to done p50 {format_seconds(p50 or 0)}  p90 {format_seconds(p90 or 0)}")
+
+    click.secho("\nThroughput by priority", bold=True)
+    for row in result["throughput"]:
+        click.echo(f"  {row['priority']:<28} {row['done']:>6} done  {row['per_week']:7.1f} per week")
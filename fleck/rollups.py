@@ -0,0 +1,205 @@
+import os
+from datetime import date, timedelta
+
+import click
+
+from fleck import intervals, json_codec, state_cache
+from fleck.config import ROLLUP_DIR
+from fleck.versioned_file import atomic_write
+
+# Time tracked per day, workspace and todo, kept up to date as timers pause
+# and stop so "how much today" or "how much this week" never means reading
+# the whole history. rollups/2026-W42.json holds one ISO week:
+#
+#   {"indexed": 1234, "days": {"2026-10-14": {"workspace": {"todo_id": seconds}}}}
+#
+# intervals.append() adds every batch of stretches to its week's file while it
+# still holds the log lock. "indexed" is the size the week's .idx had once that
+# batch was in, so a rollup that missed an append (a crash between the two
+# writes, a log copied in from elsewhere) no longer matches and is rebuilt
+# from that one segment the next time it is read.
+
+
+def _path(segment):
+    return ROLLUP_DIR / f"{segment}.json"
+
+
+def _load(segment):
+    try:
+        with open(_path(segment), 'rb') as f:
+            return json_codec.loads(f.read())
+    except (FileNotFoundError, json_codec.JSONDecodeError):
+        return None
+
+
+def _save(segment, rollup):
+    os.makedirs(ROLLUP_DIR, exist_ok=True)
+    atomic_write(_path(segment), json_codec.dumpb(rollup, pretty=False))
+
+
+def _add(rollup, day, records):
+    workspaces = rollup["days"].setdefault(day, {})
+    for workspace, todo_id, start, end in records:
+        todos = workspaces.setdefault(workspace, {})
+        todos[todo_id] = round(todos.get(todo_id, 0) + end - start, 3)
+
+
+def build(segment):
+    """Recompute a week's rollup from its log segment. Hold intervals.LOG's lock."""
+    rollup = {"indexed": intervals.index_size(segment), "days": {}}
+    monday = intervals.segment_monday(segment)
+    for day, records in intervals.iter_days(monday, monday + timedelta(days=6)):
+        _add(rollup, day.isoformat(), records)
+    return rollup
+
+
+def update(segment, days, indexed):
+    """Add {ISO day: [[workspace, todo_id, start, end], ...]} just appended to ``segment`` to its rollup.
+
+    ``indexed`` is the index size before the append; called by
+    intervals.append() under the log lock.
+    """
+    rollup = _load(segment)
+    if rollup is None or rollup.get("indexed") != indexed:
+        rollup = build(segment)
+    else:
+        for day, records in days.items():
+            _add(rollup, day, records)
+        rollup["indexed"] = intervals.index_size(segment)
+    _save(segment, rollup)
+
+
+def week_rollup(segment):
+    """Return a week's rollup, rebuilding it first if the log has moved past it."""
+    rollup = _load(segment)
+    if rollup is not None and rollup.get("indexed") == intervals.index_size(segment):
+        return rollup
+    with intervals.LOG.locked():
+        # An append may have brought it up to date while we waited
+        rollup = _load(segment)
+        if rollup is None or rollup.get("indexed") != intervals.index_size(segment):
+            rollup = build(segment)
+            if rollup["indexed"]:
+                _save(segment, rollup)
+    return rollup
+
+
+def daily_totals(first, last=None, workspace=None, now=None):
+    """Return {day: {(workspace, todo_id): seconds}} for days ``first``..``last`` (inclusive), running timers included.
+
+    Reads one rollup file per week involved, however long the history is.
+    """
+    totals = {}
+    for segment, days in intervals.segments(first, last or first).items():
+        rollup = week_rollup(segment)
+        for day in days:
+            for workspace_name, todos in rollup["days"].get(day, {}).items():
+                if workspace is None or workspace_name == workspace:
+                    day_totals = totals.setdefault(date.fromisoformat(day), {})
+                    for todo_id, seconds in todos.items():
+                        day_totals[(workspace_name, todo_id)] = seconds
+    for day, workspace_name, todo_id, start, end in intervals.iter_running(first, last, workspace, now):
+        day_totals = totals.setdefault(day, {})
+        day_totals[(workspace_name, todo_id)] = day_totals.get((workspace_name, todo_id), 0) + end - start
+    return totals
+
+
+def rebuild():
+    """Rebuild every week's rollup from the interval log and drop those without a segment. Returns the weeks rebuilt."""
+    with intervals.LOG.locked():
+        try:
+            segments = sorted(name[:-4] for name in os.listdir(intervals.INTERVAL_DIR) if name.endswith(".idx"))
+        except FileNotFoundError:
+            segments = []
+        for segment in segments:
+            _save(segment, build(segment))
+        try:
+            stale = [name for name in os.listdir(ROLLUP_DIR) if name.endswith(".json") and name[:-5] not in segments]
+        except FileNotFoundError:
+            stale = []
+        for name in stale:
+            os.unlink(ROLLUP_DIR / name)
+    return len(segments)
+
+
+def _describe(key, descriptions, store):
+    if key not in descriptions:
+        todo = store.get_todo(*key)
+        descriptions[key] = todo.get("description") if todo else "(deleted)"
+    return descriptions[key]
+
+
+@click.command()
+@click.option('-w', '--workspace', help="Only this workspace")
+@click.option('--json', 'as_json', is_flag=True, help="Print the totals as JSON")
+def today(workspace, as_json):
+    """Show time tracked today, per workspace and todo."""
+    from fleck.todo_store import get_store
+    from fleck.cli_new_1 import format_seconds
+
+    day = date.today()
+    totals = daily_totals(day, day, workspace).get(day, {})
+    if as_json:
+        click.echo(json_codec.dumps({"day": day.isoformat(), "total": round(sum(totals.values()), 3),
+                                     "todos": [{"workspace": workspace_name, "todo_id": todo_id, "seconds": round(seconds, 3)}
+                                               for (workspace_name, todo_id), seconds in sorted(totals.items())]}))
+        return
+    if not totals:
+        click.secho("No time tracked today", fg="yellow")
+        return
+
+    by_workspace = {}
+    for (workspace_name, todo_id), seconds in totals.items():
+        by_workspace.setdefault(workspace_name, []).append((seconds, todo_id))
+    store = get_store()
+    descriptions = {}
+    # One read of the JSON store for all the descriptions, not one per todo
+    with state_cache.cached():
+        for workspace_name, todos in sorted(by_workspace.items(), key=lambda item: -sum(seconds for seconds, _ in item[1])):
+            click.secho(f"{workspace_name}  {format_seconds(sum(seconds for seconds, _ in todos))}", fg="cyan", bold=True)
+            for seconds, todo_id in sorted(todos, reverse=True):
+                click.echo(f"  {format_seconds(seconds):>8}  #{todo_id} {_describe((workspace_name, todo_id), descriptions, store)}")
+    click.secho(f"{format_seconds(sum(totals.values()))} tracked today", fg="green")
+
+
+@click.command()
+@click.option('--day', default="today", show_default=True, help="Any day of the week to show: YYYY-MM-DD, a weekday name or yesterday")
+@click.option('-w', '--workspace', help="Only this workspace")
+@click.option('--json', 'as_json', is_flag=True, help="Print the totals as JSON")
+def week(day, workspace, as_json):
+    """Show time tracked per workspace on each day of a week (Monday to Sunday)."""
+    from fleck.cli_new_1 import format_seconds
+
+    monday = intervals.parse_day(day)
+    monday -= timedelta(days=monday.weekday())
+    days = [monday + timedelta(days=n) for n in range(7)]
+    totals = daily_totals(days[0], days[-1], workspace)
+
+    grid = {}
+    for n, current in enumerate(days):
+        for (workspace_name, _), seconds in totals.get(current, {}).items():
+            grid.setdefault(workspace_name, [0] * 7)[n] += seconds
+    if as_json:
+        click.echo(json_codec.dumps({"week": intervals.segment_name(monday),
+                                     "days": [current.isoformat() for current in days],
+                                     "workspaces": {name: [round(seconds, 3) for seconds in row] for name, row in sorted(grid.items())}}))
+        return
+    if not grid:
+        click.secho(f"No time tracked in the week of {monday.isoformat()}", fg="yellow")
+        return
+
+    width = max(len(name) for name in grid) + 2
+    click.secho(f"{'':{width}}" + "".join(f"{current:%a %d}".rjust(10) for current in days) + "Total".rjust(10), bold=True)
+    for workspace_name, row in sorted(grid.items(), key=lambda item: -sum(item[1])):
+        cells = "".join((format_seconds(seconds) if seconds else "-").rjust(10) for seconds in row)
+        click.echo(click.style(f"{workspace_name:{width}}", fg="cyan") + cells + format_seconds(sum(row)).rjust(10))
+    day_totals = [sum(row[n] for row in grid.values()) for n in range(7)]
+    click.secho(f"{'Total':{width}}" + "".join((format_seconds(seconds) if seconds else "-").rjust(10) for seconds in day_totals)
+                + format_seconds(sum(day_totals)).rjust(10), fg="green")
+
+
+@click.command('rebuild-rollups')
+def rebuild_rollups():
+    """Recompute the daily totals behind `today` and `week` from the interval log."""
+    weeks = rebuild()
+    click.secho(f"Rebuilt rollups for {weeks} week{'s' if weeks != 1 else ''}", fg="green")
@@ -0,0 +1,197 @@
+import os
+import sqlite3
+
+import click
+
+from fleck import json_codec
+from fleck.config import SESSIONS_DIR, SEARCH_DB
+
+# Full-text search over todo descriptions and the tabs (titles and URLs) and
+# Explorer folders of every saved session, in an SQLite FTS5 table:
+#
+#   docs(workspace, kind, ref, title, body)
+#     kind "todo":   ref = todo ID, title = description
+#     kind "tab":    ref = URL, title = page title, body = URL and browser
+#     kind "folder": ref = path, title = folder name, body = path
+#
+# search.db is a cache. It is built by the first `fleck search` (or
+# `--rebuild`) and kept up to date from then on: the todo store passes every
+# committed journal record to apply_records(), and save_session/delete_session
+# call index_session/remove_session. Until it exists, those hooks do nothing.
+
+SESSION_TABS = {"chrome_tabs": "chrome", "brave_tabs": "brave", "edge_tabs": "msedge"}
+KINDS = ("todo", "tab", "folder")
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(
+    workspace UNINDEXED, kind UNINDEXED, ref UNINDEXED, title, body
+);
+"""
+
+
+def _connect(path=SEARCH_DB):
+    conn = sqlite3.connect(str(path), isolation_level=None, timeout=10)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _todo_doc(task, todo_id, todo):
+    return (task, "todo", str(todo_id), todo.get("description") or "", "")
+
+
+def _session_docs(task, session):
+    for key, browser in SESSION_TABS.items():
+        for tab in session.get(key) or []:
+            url = tab.get("url") or ""
+            yield (task, "tab", url, tab.get("title") or "", f"{url} {tab.get('browser') or browser}")
+    for folder in session.get("explorer") or []:
+        if isinstance(folder, str):
+            folder = {"title": os.path.basename(folder), "path": folder}
+        path = folder.get("path") or ""
+        yield (task, "folder", path, folder.get("title") or "", path)
+
+
+def _insert(conn, docs):
+    conn.executemany("INSERT INTO docs (workspace, kind, ref, title, body) VALUES (?, ?, ?, ?, ?)", docs)
+
+
+def _update(fn):
+    """Run an incremental update if the index exists. A broken index is dropped and rebuilt on the next search."""
+    if not SEARCH_DB.exists():
+        return
+    try:
+        conn = _connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            fn(conn)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        SEARCH_DB.unlink(missing_ok=True)
+
+
+def apply_records(records):
+    """Mirror committed todo store records into the index."""
+    def update(conn):
+        for record in records:
+            op, task = record["op"], record["task"]
+            if op == "put":
+                before = record["before"]
+                if before is not None and before.get("description") == record["todo"].get("description"):
+                    continue
+                conn.execute("DELETE FROM docs WHERE workspace = ? AND kind = 'todo' AND ref = ?", (task, record["id"]))
+                _insert(conn, [_todo_doc(task, record["id"], record["todo"])])
+            elif op == "delete":
+                conn.execute("DELETE FROM docs WHERE workspace = ? AND kind = 'todo' AND ref = ?", (task, record["id"]))
+            elif op == "delete_task":
+                conn.execute("DELETE FROM docs WHERE workspace = ? AND kind = 'todo'", (task,))
+            elif op == "restore_task":
+                _insert(conn, (_todo_doc(task, todo_id, todo) for todo_id, todo in record["data"].get("todos", {}).items()))
+
+    if any(record["op"] != "create_task" for record in records):
+        _update(update)
+
+
+def index_session(task, session):
+    """Replace a workspace's tabs and folders in the index with those of ``session``."""
+    def update(conn):
+        conn.execute("DELETE FROM docs WHERE workspace = ? AND kind != 'todo'", (task,))
+        _insert(conn, _session_docs(task, session))
+    _update(update)
+
+
+def remove_session(task):
+    _update(lambda conn: conn.execute("DELETE FROM docs WHERE workspace = ? AND kind != 'todo'", (task,)))
+
+
+def rebuild():
+    """Build search.db from scratch from the todo store and the session files. Returns the document count."""
+    from fleck.todo_store import get_store
+
+    store = get_store()
+    tmp_path = SEARCH_DB.with_suffix(".tmp")
+    tmp_path.unlink(missing_ok=True)
+    os.makedirs(SEARCH_DB.parent, exist_ok=True)
+    conn = _connect(tmp_path)
+    try:
+        conn.execute("BEGIN")
+        for task in store.task_names():
+            _insert(conn, (_todo_doc(task, todo_id, todo) for todo_id, todo in store.todos(task).items()))
+        if SESSIONS_DIR.exists():
+            for session_file in SESSIONS_DIR.glob("*.json"):
+                if session_file.stem == "current_session":
+                    continue
+                try:
+                    session = json_codec.read(session_file)
+                except (OSError, json_codec.JSONDecodeError):
+                    continue
+                _insert(conn, _session_docs(session_file.stem, session))
+        conn.execute("COMMIT")
+        (count,) = conn.execute("SELECT COUNT(*) FROM docs").fetchone()
+    finally:
+        conn.close()
+    os.replace(tmp_path, SEARCH_DB)
+    return count
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix, in any order."""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search(text, workspace=None, kind=None, limit=20):
+    """Return [(workspace, kind, ref, title, snippet)] best match first."""
+    where, params = "docs MATCH ?", [fts_query(text)]
+    if workspace:
+        where += " AND workspace = ?"
+        params.append(workspace)
+    if kind:
+        where += " AND kind = ?"
+        params.append(kind)
+    conn = _connect()
+    try:
+        return conn.execute(
+            f"SELECT workspace, kind, ref, title, snippet(docs, 3, '[', ']', '…', 8) FROM docs "
+            f"WHERE {where} ORDER BY bm25(docs, 0, 0, 0, 4.0, 1.0) LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+@click.command(name="search")
+@click.argument('query', nargs=-1)
+@click.option('-w', '--workspace', help="Only search this workspace")
+@click.option('--kind', type=click.Choice(KINDS), help="Only todos, browser tabs or folders")
+@click.option('-n', '--limit', type=click.IntRange(min=1), default=20, help="Maximum number of results")
+@click.option('--json', 'as_json', is_flag=True, help="Print results as JSON lines")
+@click.option('--rebuild', 'force_rebuild', is_flag=True, help="Rebuild the search index first")
+def search_command(query, workspace, kind, limit, as_json, force_rebuild):
+    """Find todos, browser tabs and folders across all workspaces (e.g. `fleck search jira migration`)."""
+    if force_rebuild or not SEARCH_DB.exists():
+        count = rebuild()
+        if not as_json:
+            click.secho(f"Indexed {count} todos, tabs and folders", fg="cyan", err=True)
+    text = " ".join(query).strip()
+    if not text:
+        if not force_rebuild:
+            raise click.UsageError("Give something to search for.")
+        return
+
+    results = search(text, workspace, kind, limit)
+    if as_json:
+        for workspace_name, doc_kind, ref, title, snippet in results:
+            click.echo(json_codec.dumps({"workspace": workspace_name, "kind": doc_kind, "ref": ref, "title": title}, pretty=False))
+        return
+    if not results:
+        click.secho(f"Nothing matches '{text}'", fg="yellow")
+        return
+
+    for workspace_name, doc_kind, ref, title, snippet in results:
+        location = f"#{ref}" if doc_kind == "todo" else doc_kind
+        line = f"{click.style(workspace_name, fg='cyan')}  {location:<7} {snippet}"
+        if doc_kind != "todo":
+            line += click.style(f"  {ref}", dim=True)
+        click.echo(line)
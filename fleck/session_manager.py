@@ -1,13 +1,13 @@
 import os
-import json
-import subprocess
 import platform
-import psutil
-from pathlib import Path
 from datetime import datetime
 import logging
-import getpass
-from appdirs import user_data_dir
+from fleck.config import SESSIONS_DIR
+from fleck import metrics
+from fleck import json_codec
+from fleck import search
+from fleck.models import BROWSER_TAB_FIELDS, AppInfo, BrowserTab, ExplorerPath, SessionSnapshot
+from fleck.platform_backend import get_backend
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("session_manager")
@@ -17,12 +17,6 @@ logger = logging.getLogger("session_manager")
 
 os_name = platform.system()
 
-APP_NAME = "FleckCLI"
-APP_AUTHOR = getpass.getuser() # Replace as needed
-
-DATA_DIR = Path(user_data_dir(APP_NAME)+"/Data")
-SESSIONS_DIR = DATA_DIR / "sessions"
-
 def ensure_sessions_directory():
     """Ensure the sessions directory exists."""
     SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
@@ -32,32 +26,25 @@ def get_session_file(task_name):
     ensure_sessions_directory()
     return SESSIONS_DIR / f"{task_name}.json"
 
-import win32com.client
 def get_open_explorer_paths():
-    """Return a list of dictionaries with title and path of open File Explorer folders."""
+    """Return an ExplorerPath (title and path) per open File Explorer folder."""
+    backend = get_backend()
     paths = []
     try:
-        shell = win32com.client.Dispatch("Shell.Application")
-        for window in shell.Windows():
-            if window and window.FullName and "explorer.exe" in window.FullName.lower():
-                folder = window.Document.Folder
-                if folder and folder.Self:
-                    folder_path = folder.Self.Path
-                    if folder_path and os.path.exists(folder_path):
-                        title = os.path.basename(folder_path) or folder_path
-                        paths.append({
-                            "title": title,
-                            "path": folder_path
-                        })
+        for folder_path in backend.explorer_folders():
+            if folder_path and backend.folder_exists(folder_path):
+                title = os.path.basename(folder_path) or folder_path
+                paths.append(ExplorerPath(title, folder_path))
     except Exception as e:
         logger.warning(f"Failed to get Explorer folder paths: {e}")
     return paths
 
 def restore_explorer_windows(paths):
     """Reopen Explorer windows to the given folder paths."""
+    backend = get_backend()
     for path in paths:
-        if os.path.exists(path["path"]):
-            subprocess.Popen(f'explorer "{path["path"]}"')
+        if backend.folder_exists(path.path):
+            backend.open_folder(path.path)
             print("hello")
 
 
@@ -184,74 +171,50 @@ def get_running_applications():
     apps = []
 
     try:
-        if os_name == "Windows":
-            # Use powershell to get running applications
-            cmd = "powershell \"Get-Process | Where-Object {$_.MainWindowTitle -ne ''} | Select-Object ProcessName, MainWindowTitle, Path | ConvertTo-Json\""
-            output = subprocess.check_output(cmd, shell=True).decode('utf-8', errors='ignore')
-            data = json.loads(output)
+        # Get-Process on Windows (PowerShell), or the simulated process table
+        data = get_backend().window_processes()
             
-            # Handle single process case where JSON doesn't return a list
-            if isinstance(data, dict):
-                data = [data]
-                
-            for process in data:
-                if process.get("MainWindowTitle"):  # Only include processes with window titles
-                    if(process.get("MainWindowTitle").lower() in system_apps):
-                        apps.append({
-                            "name": process.get("ProcessName"),
-                            "title": process.get("MainWindowTitle"),
-                            "path": system_apps[process.get("MainWindowTitle").lower()],
-                        })    
-                    else:
-                        apps.append({
-                            "name": process.get("ProcessName"),
-                            "title": process.get("MainWindowTitle"),
-                            "path": process.get("Path"),
-                        })          
-                # apps.append({
-                #     "name":process.get("ProcessName"),
-                #     "title": process.get("MainWindowTitle"),
-                #     "path": process.get("Path")
-                # })  
-        
+        for process in data:
+            if process.get("MainWindowTitle"):  # Only include processes with window titles
+                if(process.get("MainWindowTitle").lower() in system_apps):
+                    apps.append(AppInfo(
+                        process.get("ProcessName"),
+                        process.get("MainWindowTitle"),
+                        system_apps[process.get("MainWindowTitle").lower()],
+                    ))
+                else:
+                    apps.append(AppInfo(
+                        process.get("ProcessName"),
+                        process.get("MainWindowTitle"),
+                        process.get("Path"),
+                    ))
+            # apps.append({
+            #     "name":process.get("ProcessName"),
+            #     "title": process.get("MainWindowTitle"),
+            #     "path": process.get("Path")
+            # })  
+    
     except Exception as e:
         logger.error(f"Error getting running applications: {e}")
     
     return apps
 
 import os
-import json
 import base64
 import sqlite3
-from pathlib import Path
 
 def get_chrome_tabs_windows(task_name,browser="chrome"):
     """Retrieve open tabs from Chrome or Brave on Windows."""
     tabs = []
-    session_file = get_session_file(task_name)
-    if not os.path.exists(session_file):
+    target_session = load_session(task_name)
+    if target_session is None:
         return []
 
-    with open(session_file, "r") as f:
-        try:
-            target_session = json.load(f)
-        except json.JSONDecodeError:
-            return []
-    
     print(browser)
-    apps = target_session.get("applications", [])
-    if not isinstance(apps, list) or not any(app.get("name") == browser for app in apps):
+    if not any(app.name == browser for app in target_session.applications):
         return []
 
-    local_appdata = os.getenv("LOCALAPPDATA")
-    
-    browser_map = {
-        "chrome": os.path.join(local_appdata, "Google", "Chrome", "User Data", "Default"),
-        "brave": os.path.join(local_appdata, "BraveSoftware", "Brave-Browser", "User Data", "Default"),
-        "msedge": os.path.join(local_appdata, "Microsoft", "Edge", "User Data", "Default")
-    }
-    
-    profile_path = browser_map.get(browser.lower())
+    profile_path = get_backend().browser_profile_dir(browser)
     if not profile_path or not os.path.exists(profile_path):
         return tabs
 
@@ -279,27 +242,22 @@ def get_chrome_tabs_windows(task_name,browser="chrome"):
         """)
 
         for url, title, timestamp in cursor.fetchall():
-            tabs.append({
-                "title": title,
-                "url": url,
-                "browser": browser,
-                "timestamp":timestamp
-            })
+            tabs.append(BrowserTab(title, url, browser, timestamp))
 
         conn.close()
         os.remove(tmp_copy)
     except Exception as e:
         logger.error(f"Error reading {browser} tabs from history DB: {e}")
     
-    tabs.sort(key=lambda x: x.get("timestamp", 0), reverse=True)
+    tabs.sort(key=lambda tab: tab.timestamp or 0, reverse=True)
     
     # Remove duplicates (keep first occurrence which is the most recent)
     unique_urls = set()
     unique_tabs = []
     
     for tab in tabs:
-        if tab["title"] not in unique_urls:
-            unique_urls.add(tab["title"])
+        if tab.title not in unique_urls:
+            unique_urls.add(tab.title)
             unique_tabs.append(tab)
     
     print(unique_tabs)
@@ -308,58 +266,57 @@ def get_chrome_tabs_windows(task_name,browser="chrome"):
 
 def save_session(task_name):
     """Save the current session state for a task."""
-    try:
-        session_data = {
-            "timestamp": datetime.now().isoformat(),
-            "applications": get_running_applications(),
-            "explorer":get_open_explorer_paths(),
-            "chrome_tabs": get_chrome_tabs_windows(task_name,"chrome"),
-            "brave_tabs": get_chrome_tabs_windows(task_name,"brave"),
-            "edge_tabs": get_chrome_tabs_windows(task_name,"msedge"),
-            # "brave_tabs":[]
-        }
-
-        print(get_open_explorer_paths())
-        
-        session_file = get_session_file(task_name)
-        with open(session_file, 'w') as f:
-            json.dump(session_data, f, indent=2)
-        
-        return True, f"Session saved for task: {task_name}"
-    except Exception as e:
-        logger.error(f"Error saving session: {e}")
-        return False, f"Failed to save session: {e}"
+    with metrics.run("save"):
+        try:
+            snapshot = SessionSnapshot(datetime.now().isoformat())
+            with metrics.span("capture.applications"):
+                snapshot.applications = get_running_applications()
+            with metrics.span("capture.explorer"):
+                snapshot.explorer = get_open_explorer_paths()
+            with metrics.span("capture.tabs.chrome"):
+                snapshot.chrome_tabs = get_chrome_tabs_windows(task_name,"chrome")
+            with metrics.span("capture.tabs.brave"):
+                snapshot.brave_tabs = get_chrome_tabs_windows(task_name,"brave")
+            with metrics.span("capture.tabs.msedge"):
+                snapshot.edge_tabs = get_chrome_tabs_windows(task_name,"msedge")
+
+            # Reuse the capture instead of walking the Explorer windows a second time
+            print(snapshot.explorer)
+            
+            with metrics.span("save.write"):
+                session_data = snapshot.to_dict()
+                session_file = get_session_file(task_name)
+                json_codec.write(session_file, session_data)
+            search.index_session(task_name, session_data)
+            
+            return True, f"Session saved for task: {task_name}"
+        except Exception as e:
+            logger.error(f"Error saving session: {e}")
+            return False, f"Failed to save session: {e}"
 
 def load_session(task_name):
-    """Load and return the session data for a task."""
+    """Load the saved session of a task as a SessionSnapshot (None if there is none)."""
     session_file = get_session_file(task_name)
     if not session_file.exists():
         return None
     
     try:
-        with open(session_file, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
+        return SessionSnapshot.from_dict(json_codec.read(session_file))
+    except (json_codec.JSONDecodeError, IOError) as e:
         logger.error(f"Error loading session: {e}")
         return None
 
 def open_application(app_info):
-    """Open an application based on path or name."""
+    """Open an application (an AppInfo) based on path or name."""
     try:
-        if not app_info.get("path"):
-            logger.warning(f"No path for application: {app_info.get('name')}")
+        if not app_info.path:
+            logger.warning(f"No path for application: {app_info.name}")
             return False
         
-        if os_name == "Windows":
-            subprocess.Popen([app_info["path"]], shell=True)
-        elif os_name == "Darwin":  # macOS
-            subprocess.Popen(["open", "-a", app_info["name"]])
-        elif os_name == "Linux":
-            subprocess.Popen([app_info["path"]])
-        
+        get_backend().open_app(app_info.to_dict())
         return True
     except Exception as e:
-        logger.error(f"Error opening application {app_info.get('name')}: {e}")
+        logger.error(f"Error opening application {app_info.name}: {e}")
         return False
 
 def open_browser_tabs(tabs, browser="chrome"):
@@ -368,80 +325,48 @@ def open_browser_tabs(tabs, browser="chrome"):
         return True
     
     try:
-        # Map browser names to commands
-        browser_commands = {
-            "chrome": {
-                "Windows": "start chrome",
-                "Darwin": "open -a \"Google Chrome\"",
-                "Linux": "google-chrome"
-            },
-            "brave": {
-                "Windows": "start brave",
-                "Darwin": "open -a \"Brave Browser\"",
-                "Linux": "brave-browser"
-            },
-            "msedge": {
-                "Windows": "start msedge",
-                "Darwin": "open -a \"Microsoft Edge\"",
-                "Linux": "microsoft-edge"
-            }
-        }
-        
-        base_command = browser_commands.get(browser, {}).get(os_name)
-        if not base_command:
-            logger.warning(f"Unsupported browser {browser} on {os_name}")
-            return False
-        
         # Group URLs to open
-        urls = [tab.get("url") for tab in tabs if tab.get("url")]
+        urls = [tab.url for tab in tabs if tab.url]
         if not urls:
             return True
         
         # Open all URLs at once
-        if os_name == "Windows":
-            url_args = " ".join([f'"{url}"' for url in urls])
-            full_command = f"{base_command} {url_args}"
-            subprocess.Popen(full_command, shell=True)
-        elif os_name == "Darwin":
-            # On macOS, we first open the browser then the URLs
-            subprocess.Popen(base_command.split())
-            for url in urls:
-                subprocess.Popen([base_command, url], shell=True)
-        elif os_name == "Linux":
-            subprocess.Popen([base_command] + urls)
-        
-        return True
+        return get_backend().open_urls(browser, urls)
     except Exception as e:
         logger.error(f"Error opening browser tabs: {e}")
         return False
 
 def restore_session(task_name):
     """Restore a saved session for a task."""
-    session_data = load_session(task_name)
+    with metrics.run("restore"):
+        return _restore_session(task_name)
+
+def _restore_session(task_name):
+    with metrics.span("restore.load"):
+        session_data = load_session(task_name)
     if not session_data:
         return False, f"No saved session found for task: {task_name}"
 
     try:
         # Get currently running applications (by full path)
-        running_apps = get_running_applications()
-        running_paths = {app["path"].lower() for app in running_apps if "path" in app}
+        with metrics.span("restore.running_apps"):
+            running_apps = get_running_applications()
+            running_paths = {app.path.lower() for app in running_apps if app.path}
 
         # Open applications only if not already running
-        for app in session_data.get("applications", []):
-            app_path = app.get("path")
+        for app in session_data.applications:
+            app_path = app.path
             if not app_path:
                 continue
             if app_path.lower() in running_paths:
                 logger.info(f"Skipping already running app: {app_path}")
                 continue
             print("browser",app)
-            open_application(app)
-            if(app["name"]=="chrome"):
-                open_browser_tabs(session_data.get("chrome_tabs", []), "chrome")
-            elif(app["name"]=="brave"):
-                open_browser_tabs(session_data.get("brave_tabs", []), "brave")
-            elif app["name"]=="msedge":
-                open_browser_tabs(session_data.get("edge_tabs",[]),"msedge")
+            with metrics.span("restore.app"):
+                open_application(app)
+            if app.name in BROWSER_TAB_FIELDS:
+                with metrics.span(f"restore.tabs.{app.name}"):
+                    open_browser_tabs(session_data.tabs(app.name), app.name)
 
 
 
@@ -452,42 +377,35 @@ def restore_session(task_name):
 
         
 
-        import win32gui
+        # One window walk for all saved folders instead of one per folder
+        open_titles = [w.title.lower() for w in get_backend().windows() if w.visible and w.title]
 
         def is_folder_open(target_path):
             # Normalize and extract folder name
             target_folder = os.path.basename(os.path.normpath(target_path)).lower()
-
-            def enum_window_callback(hwnd, open_folders):
-                if win32gui.IsWindowVisible(hwnd):
-                    title = win32gui.GetWindowText(hwnd)
-                    if title and target_folder in title.lower():
-                        open_folders.append(title)
-
-            open_folders = []
-            win32gui.EnumWindows(enum_window_callback, open_folders)
-            return len(open_folders) > 0
+            return any(target_folder in title for title in open_titles)
 
 
         to_open_paths=[]
 
-        for path in session_data.get("explorer",[]):
-            target_path = path["path"]
-            print("helloabc",path["path"])
-            print(is_folder_open(target_path))
-            if not target_path:
-                continue
-            if is_folder_open(target_path):
-                logger.info(f"Skipping already running explorer path: {target_path}")
-                continue
-            to_open_paths.append(path)
+        with metrics.span("restore.explorer_check"):
+            for path in session_data.explorer:
+                target_path = path.path
+                print("helloabc",path.path)
+                if not target_path:
+                    continue
+                if is_folder_open(target_path):
+                    logger.info(f"Skipping already running explorer path: {target_path}")
+                    continue
+                to_open_paths.append(path)
 
 
 
 
         # restore_explorer_windows(session_data.get("explorer",[]))
         print("hello",to_open_paths)
-        restore_explorer_windows(to_open_paths)
+        with metrics.span("restore.explorer"):
+            restore_explorer_windows(to_open_paths)
 
         return True, f"Session restored for task: {task_name}"
     except Exception as e:
@@ -497,35 +415,23 @@ def restore_session(task_name):
 
 
 
-import psutil
-import win32gui
-import win32process
-
 def is_gui_process(pid):
     """Check if a process has a visible window."""
-    def callback(hwnd, gui_pids):
-        if win32gui.IsWindowVisible(hwnd):
-            try:
-                _, found_pid = win32process.GetWindowThreadProcessId(hwnd)
-                gui_pids.add(found_pid)
-            except:
-                pass
-    gui_pids = set()
-    win32gui.EnumWindows(callback, gui_pids)
-    return pid in gui_pids
+    return pid in get_backend().gui_pids()
 
 def kill_all_gui_apps(exclude_names=None):
     if exclude_names is None:
         exclude_names = ["explorer.exe", "python.exe", "code.exe"]  # Adjust this list
 
-    for proc in psutil.process_iter(['pid', 'name']):
-        try:
-            pname = proc.info['name'].lower()
-            if pname not in [e.lower() for e in exclude_names] and is_gui_process(proc.pid):
-                print(f"Killing: {pname} (PID: {proc.pid})")
-                proc.terminate()
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
+    backend = get_backend()
+    exclude = {e.lower() for e in exclude_names}
+    # Collect the GUI pids once rather than walking every window per process
+    gui_pids = backend.gui_pids()
+    for proc in backend.processes():
+        pname = proc['name'].lower()
+        if pname not in exclude and proc['pid'] in gui_pids:
+            print(f"Killing: {pname} (PID: {proc['pid']})")
+            backend.kill_process(proc['pid'], force=False)
 
 # Example usage
 # kill_all_gui_apps()
@@ -534,6 +440,19 @@ def kill_all_gui_apps(exclude_names=None):
 
 
 
+def _read_session_summary(session_file, session_id):
+    data = json_codec.read(session_file)
+    return {
+        "name": session_file.stem,
+        "timestamp": data.get("timestamp"),
+        "app_count": len(data.get("applications", [])),
+        "chrome_tabs": len(data.get("chrome_tabs", [])),
+        "brave_tabs": len(data.get("brave_tabs", [])),
+        "edge_tabs": len(data.get("edge_tabs",[])),
+        "explorer": len(data.get("explorer",[])),
+        "id": session_id
+    }
+
 def list_sessions():
     """List all saved sessions."""
     ensure_sessions_directory()
@@ -541,24 +460,37 @@ def list_sessions():
     cnt=0
     for session_file in SESSIONS_DIR.glob("*.json"):
         try:
-            with open(session_file, 'r') as f:
-                cnt+=1
-                data = json.load(f)
-                sessions.append({
-                    "name": session_file.stem,
-                    "timestamp": data.get("timestamp"),
-                    "app_count": len(data.get("applications", [])),
-                    "chrome_tabs": len(data.get("chrome_tabs", [])),
-                    "brave_tabs": len(data.get("brave_tabs", [])),
-                    "edge_tabs": len(data.get("edge_tabs",[])),
-                    "explorer": len(data.get("explorer",[])),
-                    "id":cnt
-                })
+            cnt+=1
+            sessions.append(_read_session_summary(session_file, cnt))
         except Exception as e:
             logger.error(f"Error reading session file {session_file}: {e}")
     
     return sessions
 
+def session_files(sort="name", todo_counts=None):
+    """Return the saved session files (without current_session.json) in display order.
+
+    Sorting only looks at file names, mtimes and ``todo_counts``, so no
+    session file has to be parsed to decide what goes on a page.
+    """
+    ensure_sessions_directory()
+    files = [p for p in SESSIONS_DIR.glob("*.json") if p.stem != "current_session"]
+    files.sort(key=lambda p: p.stem)
+    if sort == "saved":
+        files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    elif sort == "todos":
+        todo_counts = todo_counts or {}
+        files.sort(key=lambda p: todo_counts.get(p.stem, 0), reverse=True)
+    return files
+
+def iter_sessions(files, start_id=1):
+    """Yield a summary per session file, reading each file only when it is reached."""
+    for session_id, session_file in enumerate(files, start=start_id):
+        try:
+            yield _read_session_summary(session_file, session_id)
+        except Exception as e:
+            logger.error(f"Error reading session file {session_file}: {e}")
+
 def delete_session(task_name):
     """Delete a saved session."""
     session_file = get_session_file(task_name)
@@ -567,38 +499,12 @@ def delete_session(task_name):
     
     try:
         session_file.unlink()
+        search.remove_session(task_name)
         return True, f"Session deleted for task: {task_name}"
     except Exception as e:
         logger.error(f"Error deleting session: {e}")
         return False, f"Failed to delete session: {e}"
 
 def get_session_summary(task_name):
-    """Get a summary of a saved session."""
-    session_data = load_session(task_name)
-    if not session_data:
-        return None
-    
-    return {
-        "task": task_name,
-        "timestamp": session_data.get("timestamp"),
-        "applications": [{
-            "name": app.get("name"),
-            "title": app.get("title")
-        } for app in session_data.get("applications", [])],
-        "chrome_tabs": [{
-            "title": tab.get("title"),
-            "url": tab.get("url")
-        } for tab in session_data.get("chrome_tabs", [])],
-        "brave_tabs": [{
-            "title": tab.get("title"),
-            "url": tab.get("url")
-        } for tab in session_data.get("brave_tabs", [])],
-        "edge_tabs": [{
-            "title": tab.get("title"),
-            "url": tab.get("url")
-        } for tab in session_data.get("edge_tabs", [])],
-        "explorer": [{
-            "title": tab.get("title"),
-            "path": tab.get("path")
-        } for tab in session_data.get("explorer", [])]
-    }
\ No newline at end of file
+    """Get a summary of a saved session: its SessionSnapshot, or None."""
+    return load_session(task_name)
@@ -66,51 +66,54 @@
 
 
 
-import win32gui
 import time
 from datetime import datetime
 import threading
-import requests
 import os
-import json
-from pathlib import Path
-from appdirs import user_data_dir
+from fleck.config import LOGS_DIR
+from fleck import client
+from fleck import json_codec
+from fleck.versioned_file import atomic_write
+from fleck.platform_backend import get_backend
 
 DEBUGGING_PORT = 9222
-APP_NAME = "FleckCLI"
-DATA_DIR = Path(user_data_dir(APP_NAME)+"/Data")
-SESSIONS_DIR = DATA_DIR / "sessions"
-LOGS_DIR = DATA_DIR / "logs"
 
 def get_active_window_title():
-    window = win32gui.GetForegroundWindow()
-    return win32gui.GetWindowText(window)
+    return get_backend().foreground_window_title()
 
 def get_browser_tabs():
     try:
-        response = requests.get(f"http://localhost:{DEBUGGING_PORT}/json")
-        tabs = response.json()
-        return [tab['url'] for tab in tabs if tab['type'] == 'page']
+        return get_backend().browser_debug_tabs(DEBUGGING_PORT)
     except:
         return []
 
-def start_session_tracking(workspace_name, interval=10):
+def write_tracker_state(workspace_name, state):
+    """Append a tracker sample to the workspace log and replace its state file."""
     log_file = f"{LOGS_DIR}/{workspace_name}_session_log.txt"
     state_file = f"{LOGS_DIR}/{workspace_name}_state.json"
+    os.makedirs(LOGS_DIR, exist_ok=True)
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write(json_codec.dumps(state, pretty=False) + '\n')
+    atomic_write(state_file, json_codec.dumpb(state))
+
+def track_once(workspace_name):
+    """Take one tracker sample and record it."""
+    state = {
+        'timestamp': datetime.now().isoformat(),
+        'active_window': get_active_window_title(),
+        'browser_tabs': get_browser_tabs()
+    }
+    # Let fleckd serialize the write when it is running
+    if client.request({"op": "track", "workspace": workspace_name, "state": state}) is None:
+        write_tracker_state(workspace_name, state)
+    return state
+
+def start_session_tracking(workspace_name, interval=10):
+    log_file = f"{LOGS_DIR}/{workspace_name}_session_log.txt"
     print(log_file)
     def tracker():
         while True:
-            win_title = get_active_window_title()
-            browser_tabs = get_browser_tabs()
-            state = {
-                'timestamp': datetime.now().isoformat(),
-                'active_window': win_title,
-                'browser_tabs': browser_tabs
-            }
-            with open(log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(state) + '\n')
-            with open(state_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f)
+            track_once(workspace_name)
             time.sleep(interval)
 
     tracking_thread = threading.Thread(target=tracker, daemon=True)
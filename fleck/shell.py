@@ -0,0 +1,172 @@
+import shlex
+import signal
+import time
+
+import click
+
+from fleck import state_cache
+from fleck.config import DATA_DIR
+
+HISTORY_FILE = DATA_DIR / "shell_history"
+EXIT_WORDS = {"exit", "quit", "q"}
+
+
+def _setup_readline():
+    """Enable line editing and persistent history when readline is available."""
+    try:
+        import readline
+    except ImportError:
+        return None
+
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+    readline.set_history_length(1000)
+    return readline
+
+
+def _save_history(readline):
+    if readline is None:
+        return
+    try:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        readline.write_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+
+
+def invoke(argv, color=None, flush=True, default_map=None):
+    """Run a fleck command line in this process and return its exit code.
+
+    Dirty stores are written back afterwards (unless ``flush`` is False); if
+    the command failed, clean cache entries are dropped so the next command
+    re-reads them from disk.
+    """
+    from fleck.cli_new_1 import cli
+
+    # Commands like `timer` install their own SIGINT handler; keep it scoped to the command
+    sigint_handler = signal.getsignal(signal.SIGINT)
+    exit_code = 0
+    try:
+        rv = cli.main(args=argv, prog_name="fleck", standalone_mode=False, color=color, default_map=default_map)
+        if isinstance(rv, int):
+            exit_code = rv
+    except click.exceptions.Abort:
+        click.echo("Aborted!", err=True)
+        exit_code = 1
+    except click.ClickException as e:
+        e.show()
+        exit_code = e.exit_code
+    except KeyboardInterrupt:
+        click.echo()
+        exit_code = 130
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else 0
+    except Exception as e:
+        click.secho(f"Error: {e}", fg="red", err=True)
+        exit_code = 1
+    finally:
+        signal.signal(signal.SIGINT, sigint_handler)
+        if flush:
+            state_cache.flush()
+            if exit_code:
+                state_cache.invalidate()
+    return exit_code
+
+
+def run_line(line, timing=False):
+    """Run one shell line through the regular click commands. Returns False to leave the shell."""
+    try:
+        argv = shlex.split(line)
+    except ValueError as e:
+        click.secho(f"Parse error: {e}", fg="red")
+        return True
+
+    if not argv:
+        return True
+    if argv[0] in EXIT_WORDS:
+        return False
+    if argv[0] == "help":
+        argv = argv[1:] + ["--help"]
+    if argv[0] in ("shell", "batch"):
+        click.secho(f"'{argv[0]}' can't be run from the fleck shell.", fg="yellow")
+        return True
+
+    started = time.perf_counter()
+    invoke(argv)
+    if timing:
+        click.secho(f"({(time.perf_counter() - started) * 1000:.1f} ms)", dim=True)
+    return True
+
+
+@click.command()
+@click.option('--timing', is_flag=True, help="Print how long each command took")
+def shell(timing):
+    """Start an interactive shell that keeps todos and timers loaded between commands."""
+    readline = _setup_readline()
+    click.echo("fleck shell - type any fleck command, 'exit' to quit.")
+
+    with state_cache.cached():
+        while True:
+            try:
+                line = input("fleck> ")
+            except EOFError:
+                click.echo()
+                break
+            except KeyboardInterrupt:
+                click.echo()
+                continue
+
+            if not run_line(line, timing):
+                break
+
+    _save_history(readline)
+
+
+# Inside a batch nothing may wait for the user
+BATCH_DEFAULTS = {"done": {"push": False}}
+
+
+@click.command()
+@click.option('--keep-going', is_flag=True, help="Skip failing commands instead of aborting the batch")
+def batch(keep_going):
+    """Run newline-delimited fleck commands from stdin with a single write of each store.
+
+    \b
+    Example:
+        printf 'add "Write docs"\\nflag 1 high\\ndone 2-4\\n' | fleck batch
+
+    Blank lines and lines starting with '#' are ignored. By default the first
+    failing command aborts the batch and nothing is written.
+    """
+    lines = []
+    for number, line in enumerate(click.get_text_stream("stdin"), start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            raise click.ClickException(f"line {number}: {e}")
+        if argv[0] in ("shell", "batch"):
+            raise click.ClickException(f"line {number}: '{argv[0]}' can't be run inside a batch")
+        lines.append((number, argv))
+
+    from fleck.todo_store import get_store
+    from fleck.timer_utils import timer_batch
+
+    failed = 0
+    # The todo store transaction makes the batch all-or-nothing for SQLite
+    # too, and timer_batch() holds back timer writes until the batch succeeds
+    with state_cache.cached(), get_store().transaction(), timer_batch():
+        for number, argv in lines:
+            if invoke(argv, flush=False, default_map=BATCH_DEFAULTS) == 0:
+                continue
+            if not keep_going:
+                state_cache.discard()
+                raise click.ClickException(f"line {number} failed; nothing was written")
+            failed += 1
+
+    if failed:
+        raise click.ClickException(f"{failed} of {len(lines)} commands failed")
@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+from pathlib import Path
+
+from fleck.config import DATA_DIR
+from fleck.platform_backend import PlatformBackend, Window
+
+# A deterministic stand-in for the OS, so capture, restore, focus mode and the
+# session tracker can run (and be load-tested) headlessly on any platform.
+# It fakes processes, windows, open Explorer folders and browser profiles with
+# real History SQLite files, and can add a fixed latency to every operation.
+# Select it with FLECK_BACKEND=simulated; FLECK_SIM_CONFIG may point to a JSON
+# file with constructor arguments, e.g.
+#   {"apps": 300, "tabs": {"chrome": 5000}, "latency": {"window_processes": 0.4}}
+
+SIM_CONFIG_ENV = "FLECK_SIM_CONFIG"
+BROWSERS = ("chrome", "brave", "msedge")
+# Chromium stores visit times as microseconds since 1601-01-01
+CHROMIUM_EPOCH_OFFSET = 11644473600 * 1_000_000
+
+
+class SimulatedBackend(PlatformBackend):
+    """Fake windows, processes, Explorer folders and browser profiles."""
+
+    name = "simulated"
+
+    def __init__(self, apps=20, explorer_folders=5, tabs=None, background_processes=50,
+                 latency=None, seed=0, root=None, protected=("explorer.exe",)):
+        self.rng = random.Random(seed)
+        self.tabs = dict.fromkeys(BROWSERS, 50) if tabs is None else dict(tabs)
+        self.latency = dict(latency or {})
+        self.root = Path(root) if root else DATA_DIR / "simulated"
+        self.protected = {name.lower() for name in protected}
+        self.launched = []
+        self._lock = threading.Lock()
+        self._next_pid = 1000
+        self._next_hwnd = 1
+        self._procs = {}
+        self._windows = []
+        self._folders = set()
+        self._foreground = 0
+
+        # Browsers first so a session with any apps has tabs to capture
+        for i in range(apps):
+            if i < len(BROWSERS):
+                name = BROWSERS[i]
+                path = f"/sim/apps/{name}/{name}.exe"
+            else:
+                name = f"app{i:04d}"
+                path = f"/sim/apps/{name}/{name}.exe"
+            self._spawn(name, path, f"{name} - window {i}")
+
+        explorer_pid = self._spawn("explorer", "/sim/windows/explorer.exe", None)
+        for i in range(explorer_folders):
+            folder = f"/sim/projects/project{i:04d}"
+            self._folders.add(folder)
+            self._add_window(explorer_pid, os.path.basename(folder))
+
+        for i in range(background_processes):
+            self._spawn(f"svc{i:04d}", f"/sim/services/svc{i:04d}.exe", None)
+
+    @classmethod
+    def from_env(cls):
+        """Build a backend from the JSON file named by FLECK_SIM_CONFIG, or with defaults."""
+        path = os.environ.get(SIM_CONFIG_ENV)
+        if not path:
+            return cls()
+        with open(path, 'r') as f:
+            return cls(**json.load(f))
+
+    # -- bookkeeping ---------------------------------------------------------
+
+    def _wait(self, op):
+        delay = self.latency.get(op, 0)
+        if delay:
+            time.sleep(delay)
+
+    def _spawn(self, name, path, title):
+        pid = self._next_pid
+        self._next_pid += 1
+        self._procs[pid] = {"pid": pid, "name": f"{name}.exe", "process_name": name, "path": path}
+        if title:
+            self._add_window(pid, title)
+        return pid
+
+    def _add_window(self, pid, title):
+        self._windows.append(Window(self._next_hwnd, pid, title, True))
+        self._next_hwnd += 1
+
+    def _explorer_pid(self):
+        for pid, proc in self._procs.items():
+            if proc["process_name"] == "explorer":
+                return pid
+        return self._spawn("explorer", "/sim/windows/explorer.exe", None)
+
+    def _write_history(self, history_db, browser):
+        history_db.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(history_db)
+        conn.execute("CREATE TABLE urls (id INTEGER PRIMARY KEY, url TEXT, title TEXT, last_visit_time INTEGER)")
+        base = int(time.time() * 1_000_000) + CHROMIUM_EPOCH_OFFSET
+        conn.executemany(
+            "INSERT INTO urls (url, title, last_visit_time) VALUES (?, ?, ?)",
+            ((f"https://example.com/{browser}/{i}", f"{browser} page {i}", base - self.rng.randint(0, 10 ** 10))
+             for i in range(self.tabs.get(browser, 0))),
+        )
+        conn.commit()
+        conn.close()
+
+    # -- PlatformBackend -----------------------------------------------------
+
+    def window_processes(self):
+        self._wait("window_processes")
+        with self._lock:
+            titles = {}
+            for window in self._windows:
+                if window.visible and window.title and window.pid not in titles:
+                    titles[window.pid] = window.title
+            return [
+                {"ProcessName": self._procs[pid]["process_name"], "MainWindowTitle": title, "Path": self._procs[pid]["path"]}
+                for pid, title in titles.items() if pid in self._procs
+            ]
+
+    def explorer_folders(self):
+        self._wait("explorer_folders")
+        with self._lock:
+            return sorted(self._folders)
+
+    def browser_profile_dir(self, browser):
+        self._wait("browser_profile_dir")
+        if browser not in self.tabs:
+            return None
+        profile = self.root / "profiles" / browser / "Default"
+        with self._lock:
+            if not (profile / "History").exists():
+                self._write_history(profile / "History", browser)
+        return str(profile)
+
+    def windows(self):
+        self._wait("windows")
+        with self._lock:
+            return list(self._windows)
+
+    def foreground_window_title(self):
+        self._wait("foreground_window_title")
+        with self._lock:
+            if not self._windows:
+                return ""
+            # Cycle through the windows so the tracker sees focus changes
+            window = self._windows[self._foreground % len(self._windows)]
+            self._foreground += 1
+            return window.title
+
+    def processes(self):
+        self._wait("processes")
+        with self._lock:
+            return [{"pid": proc["pid"], "name": proc["name"]} for proc in self._procs.values()]
+
+    def kill_process(self, pid, force=True):
+        self._wait("kill_process")
+        with self._lock:
+            proc = self._procs.get(pid)
+            if proc is None or proc["name"].lower() in self.protected:
+                return False
+            del self._procs[pid]
+            self._windows = [w for w in self._windows if w.pid != pid]
+            return True
+
+    def folder_exists(self, path):
+        return path in self._folders or os.path.exists(path)
+
+    def open_folder(self, path):
+        self._wait("open_folder")
+        with self._lock:
+            self._folders.add(path)
+            self._add_window(self._explorer_pid(), os.path.basename(os.path.normpath(path)))
+            self.launched.append(("folder", path))
+
+    def open_app(self, app_info):
+        self._wait("open_app")
+        with self._lock:
+            self._spawn(app_info.get("name") or "app", app_info["path"], app_info.get("title") or app_info.get("name"))
+            self.launched.append(("app", app_info["path"]))
+
+    def open_urls(self, browser, urls):
+        self._wait("open_urls")
+        with self._lock:
+            self.launched.append(("urls", browser, len(urls)))
+        return True
+
+    def browser_debug_tabs(self, port):
+        self._wait("browser_debug_tabs")
+        return [f"https://example.com/chrome/{i}" for i in range(min(self.tabs.get("chrome", 0), 20))]
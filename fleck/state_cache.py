@@ -0,0 +1,137 @@
+import os
+from contextlib import contextmanager
+
+# In-memory cache for the JSON stores (todos.json, the completion index) used by
+# long-lived processes such as `fleck shell`. While the cache is enabled,
+# loads are served from memory until the file changes on disk, and saves only
+# mark the store dirty; flush() writes back the stores that actually changed.
+# With the cache disabled (the default) load() and save() go straight to disk.
+
+_enabled = False
+_entries = {}
+
+
+class _Entry:
+    def __init__(self, data, stamp, also=()):
+        self.data = data
+        self.stamp = stamp
+        self.also = also
+        self.dirty = False
+        self.writer = None
+
+
+def _stamp(path, also=()):
+    """Return a cheap fingerprint of the file (and the files it depends on) on disk."""
+    stamps = []
+    for p in (path, *also):
+        try:
+            st = os.stat(p)
+        except OSError:
+            stamps.append(None)
+        else:
+            stamps.append((st.st_mtime_ns, st.st_size, st.st_ino))
+    return tuple(stamps)
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    """Start serving loads from memory."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Write back dirty stores and go back to direct file access."""
+    global _enabled
+    flush()
+    _entries.clear()
+    _enabled = False
+
+
+@contextmanager
+def cached():
+    """Enable the cache for the duration of the block, flushing on exit.
+
+    Nested blocks are no-ops, so a command that batches its own writes can
+    run inside `fleck shell` or `fleck batch` without flushing early.
+    """
+    if _enabled:
+        yield
+        return
+
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+
+
+def load(path, reader, also=()):
+    """Return the data stored at ``path``, calling ``reader()`` only on a cache miss.
+
+    ``also`` lists further files the data is read from (e.g. a journal);
+    a change to any of them invalidates the entry too.
+    """
+    if not _enabled:
+        return reader()
+
+    key = str(path)
+    entry = _entries.get(key)
+    stamp = _stamp(path, also)
+    if entry is not None and (entry.dirty or entry.stamp == stamp):
+        return entry.data
+
+    data = reader()
+    _entries[key] = _Entry(data, stamp, also)
+    return data
+
+
+def save(path, data, writer):
+    """Persist ``data`` with ``writer(data)``, deferring the write while the cache is enabled."""
+    if not _enabled:
+        writer(data)
+        return
+
+    key = str(path)
+    entry = _entries.get(key)
+    if entry is None:
+        entry = _entries[key] = _Entry(data, None)
+    entry.data = data
+    entry.dirty = True
+    entry.writer = writer
+
+
+def flush():
+    """Write every dirty store back to disk."""
+    for key, entry in _entries.items():
+        if entry.dirty:
+            entry.writer(entry.data)
+            entry.stamp = _stamp(key, entry.also)
+            entry.dirty = False
+
+
+def refresh(path):
+    """Accept the files on disk as matching the cached data, after writing them directly."""
+    entry = _entries.get(str(path))
+    if entry is not None:
+        entry.stamp = _stamp(path, entry.also)
+        entry.dirty = False
+
+
+def forget(path):
+    """Drop the cached data for ``path``, including unsaved changes."""
+    _entries.pop(str(path), None)
+
+
+def invalidate():
+    """Forget clean entries so the next load re-reads them from disk."""
+    for key in [key for key, entry in _entries.items() if not entry.dirty]:
+        del _entries[key]
+
+
+def discard():
+    """Drop every entry, including unsaved changes."""
+    _entries.clear()
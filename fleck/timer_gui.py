@@ -1,17 +1,12 @@
 import tkinter as tk
-import time
 import threading
-import json
-import os
-from pathlib import Path
 import subprocess
 import sys
 
-from fleck.timer_utils import stop_timer_and_get_elapsed
-
-# Constants
-TIMER_FILE = Path(__file__).parent / "data" / "timers.json"
-TODO_FILE = Path(__file__).parent / "data" / "todos.json"
+from fleck.timer_utils import stop_timer_and_get_elapsed, load_task_timers, put_timer
+from fleck.models import TimerState
+from fleck import client
+from fleck.todo_store import get_store
 
 class TimerApp:
     def __init__(self, root, task_name, todo_id, description):
@@ -22,6 +17,7 @@ class TimerApp:
         self.timer_key = f"{task_name}:{todo_id}"
         self.is_running = False
         self.elapsed_time = 0
+        self.timer = TimerState()
         self.update_thread = None
         self.should_stop = False
 
@@ -64,25 +60,17 @@ class TimerApp:
     def load_timer_data(self):
         """Load timer data from file"""
         try:
-            if TIMER_FILE.exists():
-                with open(TIMER_FILE, 'r') as f:
-                    timer_data = json.load(f)
-                    
-                if self.timer_key in timer_data:
-                    timer_info = timer_data[self.timer_key]
-                    self.is_running = timer_info.get("is_running", False)
-                    
-                    if self.is_running:
-                        # Calculate current elapsed time
-                        self.elapsed_time = timer_info.get("elapsed", 0) + (time.time() - timer_info.get("start_time", time.time()))
-                    else:
-                        self.elapsed_time = timer_info.get("elapsed", 0)
-                        
-                    # Update button text based on state
-                    if self.is_running:
-                        self.pause_button.config(text="Pause", bg="#ff9800")
-                    else:
-                        self.pause_button.config(text="Resume", bg="#4CAF50")
+            timer_info = load_task_timers(self.task_name).get(self.todo_id)
+            if timer_info is not None:
+                self.timer = TimerState.from_dict(timer_info)
+                self.is_running = self.timer.is_running
+                self.elapsed_time = self.timer.elapsed_at()
+
+                # Update button text based on state
+                if self.is_running:
+                    self.pause_button.config(text="Pause", bg="#ff9800")
+                else:
+                    self.pause_button.config(text="Resume", bg="#4CAF50")
         except Exception as e:
             print(f"Error loading timer data: {e}")
             self.elapsed_time = 0
@@ -92,7 +80,7 @@ class TimerApp:
         """Update the timer display"""
         if not self.should_stop:
             if self.is_running:
-                self.elapsed_time += 0.1
+                self.elapsed_time = self.timer.elapsed_at()
             
             # Format time as HH:MM:SS
             hours, remainder = divmod(int(self.elapsed_time), 3600)
@@ -147,37 +135,19 @@ class TimerApp:
     def save_timer_state(self):
         """Save timer state to file"""
         try:
-            # Ensure directory exists
-            os.makedirs(TIMER_FILE.parent, exist_ok=True)
-            
-            # Load existing data
-            timer_data = {}
-            if TIMER_FILE.exists():
-                with open(TIMER_FILE, 'r') as f:
-                    try:
-                        timer_data = json.load(f)
-                    except json.JSONDecodeError:
-                        timer_data = {}
-            
             # Update or create entry for this timer
             if self.is_running:
-                timer_data[self.timer_key] = {
-                    "start_time": time.time(),
-                    "elapsed": self.elapsed_time,
-                    "is_running": True,
-                    "paused_at": None
-                }
+                self.timer.start()
             else:
-                timer_data[self.timer_key] = {
-                    "start_time": time.time(),
-                    "elapsed": self.elapsed_time,
-                    "is_running": False,
-                    "paused_at": time.time()
-                }
-            
-            # Save to file
-            with open(TIMER_FILE, 'w') as f:
-                json.dump(timer_data, f, indent=2)
+                self.timer.pause()
+            entry = self.timer.to_dict()
+
+            # fleckd owns the timer store while it runs, so let it apply the update
+            if client.request({"op": "timer_put", "key": self.timer_key, "entry": entry}) is not None:
+                return
+
+            # Locked read-modify-write, so changes the CLI makes meanwhile survive
+            put_timer(self.task_name, self.todo_id, entry)
                 
         except Exception as e:
             print(f"Error saving timer data: {e}")
@@ -191,12 +161,9 @@ class TimerApp:
 def get_todo_description(task_name, todo_id):
     """Get the description of a todo item"""
     try:
-        if TODO_FILE.exists():
-            with open(TODO_FILE, 'r') as f:
-                data = json.load(f)
-                
-            if task_name in data["tasks"] and todo_id in data["tasks"][task_name]["todos"]:
-                return data["tasks"][task_name]["todos"][todo_id].get("description", "No description")
+        todo = get_store().get_todo(task_name, todo_id)
+        if todo is not None:
+            return todo.get("description") or "No description"
     except Exception as e:
         print(f"Error getting todo description: {e}")
     
@@ -219,4 +186,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    from fleck import profiling
+    with profiling.from_env("timer-gui"):
+        main()
\ No newline at end of file
@@ -1,136 +1,256 @@
-import json
-import time
 import os
 from pathlib import Path
 from datetime import datetime, timedelta
 import threading
 import signal
 import sys
+from contextlib import contextmanager, ExitStack
+from urllib.parse import quote, unquote
 
-# Constants
-TIMER_FILE = Path(__file__).parent / "data" / "timers.json"
+from fleck import json_codec
+from fleck import intervals
+from fleck.models import TimerState, read_clock
+from fleck.config import TIMER_FILE, TIMER_DIR
+from fleck.versioned_file import VersionedFile, atomic_write
 
-def ensure_timer_file():
-    """Ensure the timer file exists."""
-    os.makedirs(TIMER_FILE.parent, exist_ok=True)
-    if not TIMER_FILE.exists():
-        with open(TIMER_FILE, 'w') as f:
-            json.dump({}, f)
+# Timers used to live inside the package; picked up once by ensure_timer_dir()
+LEGACY_TIMER_FILE = Path(__file__).parent / "data" / "timers.json"
 
-def load_timer_data():
-    """Load timer data from file."""
-    ensure_timer_file()
+# Timers are sharded by workspace: timers/<workspace>.json maps todo IDs to
+# TimerState dicts. A transition locks and rewrites only its workspace's
+# shard, so its cost doesn't grow with the timers kept elsewhere and the
+# CLI, the timer GUI and fleckd only wait on each other within a workspace.
+# Listing all timers is a scan of the directory. The single timers.json
+# that older versions wrote is split into shards the first time it's needed
+# and left in place as a backup.
+
+_shards = {}
+
+def _shard(task_name):
+    shard = _shards.get(task_name)
+    if shard is None:
+        shard = _shards[task_name] = VersionedFile(TIMER_DIR / f"{quote(task_name, safe='')}.json")
+    return shard
+
+def ensure_timer_dir():
+    """Create the timers directory, migrating a timers.json from older versions."""
+    if TIMER_DIR.is_dir():
+        return
+    with VersionedFile(TIMER_FILE).locked():
+        if TIMER_DIR.is_dir():
+            return
+        legacy = TIMER_FILE if TIMER_FILE.exists() else LEGACY_TIMER_FILE
+        try:
+            timer_data = json_codec.read(legacy) if legacy.exists() else {}
+        except (json_codec.JSONDecodeError, OSError):
+            timer_data = {}
+        shards = {}
+        for timer_key, timer_info in timer_data.items():
+            task, _, todo_id = timer_key.rpartition(":")
+            shards.setdefault(task, {})[todo_id] = timer_info
+
+        # Build the shards aside and rename the directory into place, so
+        # other processes see either no timers dir or a complete one
+        tmp_dir = TIMER_DIR.with_name(f"{TIMER_DIR.name}.{os.getpid()}.tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        for task, shard_data in shards.items():
+            atomic_write(tmp_dir / f"{quote(task, safe='')}.json", json_codec.dumpb(shard_data))
+        os.replace(tmp_dir, TIMER_DIR)
+
+def _read_shard(shard):
     try:
-        with open(TIMER_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
+        return shard.read(json_codec.loads)
+    except (json_codec.JSONDecodeError, IOError):
         return {}
 
-def save_timer_data(data):
-    """Save timer data to file."""
-    ensure_timer_file()
-    with open(TIMER_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+def _write_shard(shard, data):
+    if data:
+        shard.write(json_codec.dumpb(data), data)
+    else:
+        shard.remove()
+
+def load_task_timers(task_name):
+    """Return {todo_id: timer dict} for one workspace."""
+    ensure_timer_dir()
+    return _read_shard(_shard(task_name))
+
+def timer_shard_path(task_name):
+    """The file a workspace's timers are kept in, for watching it for changes."""
+    ensure_timer_dir()
+    return _shard(task_name).path
+
+def timer_tasks():
+    """Names of the workspaces that have timers, from a scan of the timers directory."""
+    ensure_timer_dir()
+    with os.scandir(TIMER_DIR) as entries:
+        return [unquote(entry.name[:-5]) for entry in entries if entry.name.endswith(".json")]
+
+def load_timer_data():
+    """Return every timer as {"task:todo_id": timer dict}."""
+    return {f"{task}:{todo_id}": timer_info
+            for task in timer_tasks()
+            for todo_id, timer_info in load_task_timers(task).items()}
+
+# Shards changed inside the running timer_batch(), waiting to be written, the
+# locks held on them until then, and the stretches the batch's transitions
+# closed, for the interval log
+_batch_locks = None
+_batch_dirty = {}
+_batch_intervals = []
+
+@contextmanager
+def timer_batch():
+    """Group timer transitions so each touched shard is written once, when the outermost block ends.
+
+    The shards stay locked until then, and the stretches paused or stopped
+    timers ran for are appended to the interval log after them. If the block
+    raises, nothing is written.
+    """
+    global _batch_locks
+    if _batch_locks is not None:
+        yield
+        return
+    with ExitStack() as locks:
+        _batch_locks = locks
+        try:
+            yield
+        except BaseException:
+            # The in-memory copies hold unsaved changes; read from disk next time
+            for shard in _batch_dirty:
+                shard.forget()
+            raise
+        else:
+            for shard, data in _batch_dirty.items():
+                _write_shard(shard, data)
+            intervals.append(_batch_intervals)
+        finally:
+            _batch_locks = None
+            _batch_dirty.clear()
+            _batch_intervals.clear()
+
+@contextmanager
+def updating_timers(task_name):
+    """Yield a workspace's {todo_id: timer dict} for a read-modify-write and save it when the block ends.
+
+    The shard stays locked in between, so concurrent updates from other
+    processes are never lost. Inside timer_batch() the write waits for the
+    end of the batch.
+    """
+    with timer_batch():
+        ensure_timer_dir()
+        shard = _shard(task_name)
+        _batch_locks.enter_context(shard.locked())
+        timer_data = _batch_dirty.get(shard)
+        if timer_data is None:
+            timer_data = _read_shard(shard)
+        yield timer_data
+        _batch_dirty[shard] = timer_data
+
+def _pause(task_name, todo_id, timer):
+    """Pause ``timer``, queueing the stretch it ran for the interval log. Call inside updating_timers()."""
+    if timer.is_running:
+        now = read_clock()
+        start, end = timer.running_span(now)
+        _batch_intervals.append((task_name, todo_id, start, end))
+        timer.pause(now)
+    return timer
 
 def start_timer(task_name, todo_id):
-    """Start a timer for a specific todo item."""
-    timer_data = load_timer_data()
-    
-    # Create timer key
-    timer_key = f"{task_name}:{todo_id}"
-    
-    # Initialize or update timer data
-    if timer_key not in timer_data:
-        timer_data[timer_key] = {
-            "start_time": time.time(),
-            "elapsed": 0,
-            "is_running": True,
-            "paused_at": None
-        }
-    else:
-        # Resume timer if it was paused
-        if not timer_data[timer_key]["is_running"]:
-            paused_elapsed = timer_data[timer_key]["elapsed"]
-            timer_data[timer_key] = {
-                "start_time": time.time(),
-                "elapsed": paused_elapsed,
-                "is_running": True,
-                "paused_at": None
-            }
-    
-    save_timer_data(timer_data)
+    """Start a todo's timer, or resume it with the time already recorded."""
+    with updating_timers(task_name) as timer_data:
+        timer = TimerState.from_dict(timer_data.get(todo_id, {}))
+        timer_data[todo_id] = timer.start().to_dict()
 
 def pause_timer(task_name, todo_id):
-    """Pause a timer for a specific todo item."""
-    timer_data = load_timer_data()
-    timer_key = f"{task_name}:{todo_id}"
-    timer_data[timer_key]["is_running"] = False
-    # print(timer_data[timer_key]["is_running"])
-    if (timer_key in timer_data) and (not timer_data[timer_key]["is_running"]):
-        # Calculate elapsed time so far
-        current_time = time.time()
-        start_time = timer_data[timer_key]["start_time"]
-        previous_elapsed = timer_data[timer_key]["elapsed"]
-        
-        # Update timer data
-        timer_data[timer_key]["elapsed"] = previous_elapsed + (current_time - start_time)
-        timer_data[timer_key]["paused_at"] = current_time
-        
-        save_timer_data(timer_data)
-        # print()
-        return timer_data[timer_key]["elapsed"]
-    
-    return 0
+    """Pause a todo's timer and return its elapsed seconds (0 if it has no timer)."""
+    with updating_timers(task_name) as timer_data:
+        if todo_id not in timer_data:
+            return 0
+        timer = _pause(task_name, todo_id, TimerState.from_dict(timer_data[todo_id]))
+        timer_data[todo_id] = timer.to_dict()
+        return timer.elapsed
 
 def stop_timer_and_get_elapsed(task_name, todo_id):
-    """Stop a timer and return the total elapsed time."""
-    elapsed = pause_timer(task_name, todo_id)
+    """Stop a todo's timer, remove it, and return the total elapsed seconds."""
+    with updating_timers(task_name) as timer_data:
+        timer_info = timer_data.pop(todo_id, None)
+        if timer_info is None:
+            return 0
+        return _pause(task_name, todo_id, TimerState.from_dict(timer_info)).elapsed
 
+def put_timer(task_name, todo_id, entry):
+    """Replace a todo's timer entry (the timer GUI's saves), logging the stretch it ends if it pauses the timer."""
+    with updating_timers(task_name) as timer_data:
+        if todo_id in timer_data and not entry.get("is_running"):
+            timer = TimerState.from_dict(timer_data[todo_id])
+            if timer.is_running:
+                start, _ = timer.running_span()
+                _batch_intervals.append((task_name, todo_id, start, start + entry.get("elapsed", 0) - timer.elapsed))
+        timer_data[todo_id] = entry
+
+def remove_task_timers(task_name):
+    """Drop all of a deleted workspace's timers."""
+    # The shard's lock file stays: another process may be waiting on it
+    ensure_timer_dir()
+    shard = _shard(task_name)
+    with shard.locked():
+        shard.remove()
+
+def timer_elapsed(timer_info, now=None):
+    """Return the seconds recorded by a timer entry, including the running stretch.
+
+    ``now`` is a models.read_clock() reading, taken once when timing many entries.
+    """
+    return TimerState.from_dict(timer_info).elapsed_at(now)
+
+def _timer_status(timer_info, now=None):
+    timer = TimerState.from_dict(timer_info)
+    current_elapsed = timer.elapsed_at(now)
     
-    # Remove the timer data for this todo
-    timer_data = load_timer_data()
-    timer_key = f"{task_name}:{todo_id}"
-    
-    if timer_key in timer_data:
-        abc = timer_data[timer_key]["elapsed"]
-        print(abc)
-        del timer_data[timer_key]
-        save_timer_data(timer_data)
-        return abc
+    # Format time as HH:MM:SS
+    formatted_time = str(timedelta(seconds=int(current_elapsed)))
     
-    return elapsed
+    return {
+        "is_running": timer.is_running,
+        "elapsed": current_elapsed,
+        "formatted_time": formatted_time
+    }
 
 def get_timer_status(task_name, todo_id):
     """Get the current status of a timer."""
-    timer_data = load_timer_data()
-    timer_key = f"{task_name}:{todo_id}"
+    timer_info = load_task_timers(task_name).get(todo_id)
     
-    if timer_key not in timer_data:
+    if timer_info is None:
         return {
             "is_running": False,
             "elapsed": 0,
             "formatted_time": "00:00:00"
         }
     
-    timer_info = timer_data[timer_key]
-    
-    if timer_info["is_running"]:
-        # Calculate current elapsed time
-        current_elapsed = timer_info["elapsed"] + (time.time() - timer_info["start_time"])
-    else:
-        current_elapsed = timer_info["elapsed"]
-    
-    # Format time as HH:MM:SS
-    formatted_time = str(timedelta(seconds=int(current_elapsed)))
-    
-    return {
-        "is_running": timer_info["is_running"],
-        "elapsed": current_elapsed,
-        "formatted_time": formatted_time
-    }
+    return _timer_status(timer_info)
+
+def get_timer_statuses(task_name=None, now=None):
+    """Get the status of every timer, or only of ``task_name``'s, reading each shard once.
+
+    Returns {task_name: {todo_id: status}}, each status shaped like
+    get_timer_status()'s. Todos without a timer are left out.
+    """
+    now = now or read_clock()
+    statuses = {}
+    for task in timer_tasks() if task_name is None else [task_name]:
+        timers = load_task_timers(task)
+        if timers:
+            statuses[task] = {todo_id: _timer_status(timer_info, now) for todo_id, timer_info in timers.items()}
+    return statuses
 
 def display_live_timer(task_name, todo_id):
-    """Display a live timer for a todo item."""
+    """Display a live timer for a todo item.
+
+    The timer is re-read only when its workspace's shard changes; the
+    seconds in between are counted from the state already loaded.
+    """
+    from fleck.watch import ChangeWatcher, next_tick
+
     # Setup to handle Ctrl+C gracefully
     def signal_handler(sig, frame):
         print("\nTimer stopped.")
@@ -142,16 +262,14 @@ def display_live_timer(task_name, todo_id):
     print("Press Ctrl+C to exit the timer view")
     
     try:
-        while True:
-            status = get_timer_status(task_name, todo_id)
-            
-            if not status["is_running"]:
-                print(f"\rTimer paused: {status['formatted_time']}", end="")
-                time.sleep(1)
-                continue
-                
-            print(f"\rElapsed time: {status['formatted_time']}", end="")
-            sys.stdout.flush()
-            time.sleep(1)
+        with ChangeWatcher([timer_shard_path(task_name)]) as watcher:
+            timer_info = load_task_timers(task_name).get(todo_id)
+            while True:
+                status = _timer_status(timer_info or {}, read_clock())
+                label = "Elapsed time" if status["is_running"] else "Timer paused"
+                print(f"\r{label}: {status['formatted_time']}", end="")
+                sys.stdout.flush()
+                if watcher.wait(next_tick()):
+                    timer_info = load_task_timers(task_name).get(todo_id)
     except KeyboardInterrupt:
         print("\nExiting timer view.")
\ No newline at end of file
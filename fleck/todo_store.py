@@ -0,0 +1,584 @@
+import os
+import sqlite3
+from datetime import datetime
+from contextlib import contextmanager, ExitStack
+
+import click
+
+from fleck import state_cache
+from fleck import json_codec
+from fleck import search
+from fleck.versioned_file import VersionedFile, atomic_write
+from fleck.config import DATA_DIR, TODO_FILE, TODO_DB, JOURNAL_FILE, STORE_ENV, get_store_name
+from fleck.journal import (
+    apply_to_document, build_indexes, priority_key, read_journal, append_journal, trim_journal,
+    new_txn_id, current_command
+)
+
+# Todo storage. Commands talk to a store through a small set of operations
+# (get/add/update/delete one todo, create/delete a task, ...) so a backend
+# only has to touch what an operation needs:
+#
+#   json    todos.json snapshot plus todos.journal; a change appends a few
+#           journal records and the journal is folded into a new snapshot
+#           every COMPACT_EVERY records
+#   sqlite  todos.db in WAL mode; every operation reads or writes its own rows
+#
+# Both stores describe every change as a reversible journal record (see
+# fleck/journal.py), which is what `fleck log` and `fleck undo` work from.
+#
+# FLECK_STORE picks the backend explicitly. Otherwise todos.db is used once it
+# exists (`fleck store migrate` creates it), and todos.json before that.
+
+# Columns of the todos table; any other todo field is kept in `extra` as JSON
+TODO_COLUMNS = ("description", "status", "priority", "created_at", "updated_at", "time_spent")
+# Journal records replayed on top of the snapshot before it is rewritten
+COMPACT_EVERY = 500
+# Records kept after a compaction (or in the SQLite journal table) for log/undo
+KEEP_HISTORY = 200
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+def _read_snapshot():
+    if not TODO_FILE.exists():
+        return {"current_task": None, "tasks": {}}
+
+    try:
+        return json_codec.read(TODO_FILE)
+    except (json_codec.JSONDecodeError, IOError):
+        return {"current_task": None, "tasks": {}}
+
+def _read_todo_file():
+    """Read the snapshot and replay the journal records written after it."""
+    data = _read_snapshot()
+    for task_data in data["tasks"].values():
+        if "by_status" not in task_data:
+            # Written before the indexes existed; the next commit writes them out
+            build_indexes(task_data)
+            data["needs_snapshot"] = True
+    seq = data["snapshot_seq"] = data.get("journal_seq", 0)
+    for record in read_journal(JOURNAL_FILE):
+        if record["seq"] > seq:
+            apply_to_document(data, record)
+            seq = data["journal_seq"] = record["seq"]
+    return data
+
+def _write_todo_file(data):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    data["snapshot_seq"] = data.get("journal_seq", 0)
+    data.pop("needs_snapshot", None)
+    atomic_write(TODO_FILE, json_codec.dumpb(data))
+
+def load_data():
+    """Load todo data from file."""
+    return state_cache.load(TODO_FILE, _read_todo_file, also=(JOURNAL_FILE,))
+
+def save_data(data):
+    """Save todo data to file."""
+    state_cache.save(TODO_FILE, data, _write_todo_file)
+
+
+def open_todo_descriptions(todos):
+    """Map the IDs of todos that are not done to their descriptions."""
+    return {todo_id: todo.get("description", "") for todo_id, todo in todos.items() if todo.get("status") != "Done"}
+
+
+class TodoStore:
+    """The write operations, built on journal records.
+
+    Subclasses provide the reads, ``_apply(record)`` to carry out a record,
+    ``_journal(record)`` to log it, and ``_begin``/``_commit``/``_rollback``.
+    """
+
+    name = None
+
+    def __init__(self):
+        self._depth = 0
+        self._txn = None
+        self._records = []
+
+    @contextmanager
+    def transaction(self, undo_of=None):
+        """Group operations into one commit; nothing is written on error. Nested blocks join the outer one."""
+        if self._depth:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+
+        self._txn = {"txn": new_txn_id(), "command": current_command()}
+        if undo_of:
+            self._txn["undo"] = undo_of
+        self._records = []
+        self._depth = 1
+        self._begin()
+        try:
+            yield
+        except BaseException:
+            self._rollback()
+            raise
+        else:
+            self._commit()
+        finally:
+            self._depth = 0
+
+        if self._records:
+            search.apply_records(self._records)
+
+    def apply(self, record):
+        """Carry out a journal record and log it."""
+        with self.transaction():
+            record = dict(record, at=record.get("at") or _now(), **self._txn)
+            self._apply(record)
+            self._journal(record)
+            self._records.append(record)
+
+    def create_task(self, task, now=None):
+        """Add an empty task. Returns False if it already exists."""
+        now = now or _now()
+        with self.transaction():
+            if self.has_task(task):
+                return False
+            self.apply({"op": "create_task", "task": task, "at": now,
+                        "data": {"id": len(self.task_names()) + 1, "created_at": now, "updated_at": now}})
+        return True
+
+    def delete_task(self, task):
+        """Remove a task and its todos. Returns False if it did not exist."""
+        with self.transaction():
+            before = self.task_data(task)
+            if before is None:
+                return False
+            self.apply({"op": "delete_task", "task": task, "before": before})
+        return True
+
+    def add_todo(self, task, todo):
+        """Store a new todo and return its ID."""
+        with self.transaction():
+            if not self.has_task(task):
+                self.create_task(task, todo.get("created_at"))
+            todo_id = self._next_id(task)
+            self.apply({"op": "put", "task": task, "id": todo_id, "todo": dict(todo), "before": None,
+                        "at": todo.get("updated_at")})
+        return todo_id
+
+    def update_todo(self, task, todo_id, **fields):
+        with self.transaction():
+            before = self.get_todo(task, todo_id)
+            self.apply({"op": "put", "task": task, "id": todo_id, "todo": dict(before, **fields), "before": before,
+                        "at": fields.get("updated_at")})
+
+    def delete_todo(self, task, todo_id):
+        with self.transaction():
+            self.apply({"op": "delete", "task": task, "id": todo_id, "before": self.get_todo(task, todo_id)})
+
+    def open_todos(self, task):
+        return open_todo_descriptions(self.todos(task))
+
+
+class JsonTodoStore(TodoStore):
+    """All workspaces in one todos.json snapshot plus the todos.journal tail."""
+
+    name = "json"
+
+    def __init__(self):
+        super().__init__()
+        self._pending = []
+        self._owns_cache = False
+        self._file = VersionedFile(TODO_FILE)
+        self._lock = ExitStack()
+
+    def _begin(self):
+        # Commands in other processes wait for this one to commit, and the
+        # first read below picks up whatever they committed before it
+        self._lock.enter_context(self._file.locked())
+        # The document stays in memory for the whole transaction
+        self._owns_cache = not state_cache.is_enabled()
+        if self._owns_cache:
+            state_cache.enable()
+        self._pending = []
+
+    def _commit(self):
+        try:
+            if self._pending:
+                append_journal(JOURNAL_FILE, self._pending)
+                state_cache.refresh(TODO_FILE)
+                data = load_data()
+                if data.get("needs_snapshot") or data["journal_seq"] - data.get("snapshot_seq", 0) >= COMPACT_EVERY:
+                    self.compact()
+        finally:
+            self._end()
+
+    def _rollback(self):
+        state_cache.forget(TODO_FILE)
+        self._end()
+
+    def _end(self):
+        self._pending = []
+        try:
+            if self._owns_cache:
+                state_cache.disable()
+                self._owns_cache = False
+        finally:
+            self._lock.close()
+
+    def _apply(self, record):
+        apply_to_document(load_data(), record)
+
+    def _journal(self, record):
+        data = load_data()
+        record["seq"] = data["journal_seq"] = data.get("journal_seq", 0) + 1
+        self._pending.append(record)
+
+    def _next_id(self, task):
+        return str(load_data()["tasks"][task]["next_id"])
+
+    def compact(self):
+        """Fold the journal into a new snapshot, keeping the last KEEP_HISTORY records for log/undo."""
+        with self._file.locked():
+            data = load_data()
+            _write_todo_file(data)
+            trim_journal(JOURNAL_FILE, KEEP_HISTORY)
+            state_cache.refresh(TODO_FILE)
+
+    def journal_records(self):
+        return read_journal(JOURNAL_FILE)
+
+    def task_names(self):
+        return list(load_data()["tasks"])
+
+    def has_task(self, task):
+        return task in load_data()["tasks"]
+
+    def task_data(self, task):
+        return load_data()["tasks"].get(task)
+
+    def todos(self, task, status=None, priority=None):
+        """Return {todo_id: todo} for a task, optionally only todos with ``status`` and/or ``priority``.
+
+        Filters are answered from the task's indexes, so only matching todos are touched.
+        """
+        task_data = load_data()["tasks"].get(task)
+        if task_data is None:
+            return {}
+        todos = task_data["todos"]
+        if status is None and priority is None:
+            return todos
+
+        ids = None
+        if status is not None:
+            ids = task_data["by_status"].get(status, [])
+        if priority is not None:
+            by_priority = task_data["by_priority"].get(priority_key(priority), [])
+            ids = by_priority if ids is None else sorted(set(ids).intersection(by_priority))
+        return {str(number): todos[str(number)] for number in ids}
+
+    def get_todo(self, task, todo_id):
+        return load_data()["tasks"].get(task, {}).get("todos", {}).get(todo_id)
+
+    def count(self, task, status):
+        return len(load_data()["tasks"].get(task, {}).get("by_status", {}).get(status, []))
+
+    def todo_counts(self):
+        return {name: len(task.get("todos", {})) for name, task in load_data()["tasks"].items()}
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    name TEXT PRIMARY KEY,
+    id INTEGER,
+    created_at TEXT,
+    updated_at TEXT,
+    next_id INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS todos (
+    task TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    description TEXT,
+    status TEXT,
+    priority TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    time_spent REAL,
+    extra TEXT,
+    PRIMARY KEY (task, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS todos_task_status ON todos (task, status);
+CREATE INDEX IF NOT EXISTS todos_task_priority ON todos (task, priority);
+CREATE TABLE IF NOT EXISTS journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    txn TEXT,
+    record TEXT NOT NULL
+);
+"""
+
+
+def connect_db(path=None):
+    conn = sqlite3.connect(str(path or TODO_DB), isolation_level=None, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    if "next_id" not in {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}:
+        # todos.db from before todo IDs were allocated from a per-task counter
+        conn.execute("ALTER TABLE tasks ADD COLUMN next_id INTEGER NOT NULL DEFAULT 1")
+        conn.execute("UPDATE tasks SET next_id = (SELECT COALESCE(MAX(id), 0) + 1 FROM todos WHERE task = name)")
+    return conn
+
+
+def _todo_row(task, todo_id, todo):
+    extra = {k: v for k, v in todo.items() if k not in TODO_COLUMNS}
+    return (task, int(todo_id), *(todo.get(column) for column in TODO_COLUMNS), json_codec.dumps(extra) if extra else None)
+
+
+def _todo_from_row(row):
+    description, status, priority, created_at, updated_at, time_spent, extra = row
+    todo = {
+        "description": description,
+        "status": status,
+        "priority": priority,
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+    if time_spent is not None:
+        todo["time_spent"] = time_spent
+    if extra:
+        todo.update(json_codec.loads(extra))
+    return todo
+
+
+class SqliteTodoStore(TodoStore):
+    """todos.db: one row per todo, indexed by (task, status) and (task, priority)."""
+
+    name = "sqlite"
+    _COLUMNS = "description, status, priority, created_at, updated_at, time_spent, extra"
+
+    def __init__(self, path=None):
+        super().__init__()
+        self.path = path or TODO_DB
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = connect_db(self.path)
+        return self._conn
+
+    def _begin(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def _commit(self):
+        self.conn.execute("COMMIT")
+
+    def _rollback(self):
+        self.conn.execute("ROLLBACK")
+
+    def _apply(self, record):
+        op = record["op"]
+        task = record["task"]
+        if op in ("create_task", "restore_task"):
+            data = record["data"]
+            todos = data.get("todos", {})
+            next_id = max([data.get("next_id", 1)] + [int(todo_id) + 1 for todo_id in todos])
+            self.conn.execute("INSERT INTO tasks (name, id, created_at, updated_at, next_id) VALUES (?, ?, ?, ?, ?)",
+                              (task, data.get("id"), data.get("created_at"), data.get("updated_at"), next_id))
+            self.conn.executemany("INSERT INTO todos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  (_todo_row(task, todo_id, todo) for todo_id, todo in todos.items()))
+        elif op == "delete_task":
+            self.conn.execute("DELETE FROM todos WHERE task = ?", (task,))
+            self.conn.execute("DELETE FROM tasks WHERE name = ?", (task,))
+        elif op == "put":
+            self.conn.execute("INSERT OR REPLACE INTO todos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                              _todo_row(task, record["id"], record["todo"]))
+            self.conn.execute("UPDATE tasks SET updated_at = ?, next_id = MAX(next_id, ?) WHERE name = ?",
+                              (record["at"], int(record["id"]) + 1, task))
+        elif op == "delete":
+            self.conn.execute("DELETE FROM todos WHERE task = ? AND id = ?", (task, int(record["id"])))
+            self._touch(task, record["at"])
+        else:
+            raise ValueError(f"Unknown journal op: {op}")
+
+    def _journal(self, record):
+        cursor = self.conn.execute("INSERT INTO journal (txn, record) VALUES (?, ?)", (record["txn"], json_codec.dumps(record)))
+        record["seq"] = cursor.lastrowid
+        if record["seq"] % 100 == 0:
+            # Drop whole transactions that fell out of the retained history
+            self.conn.execute("DELETE FROM journal WHERE txn IN (SELECT txn FROM journal WHERE seq <= ?)",
+                              (record["seq"] - KEEP_HISTORY,))
+
+    def _next_id(self, task):
+        (todo_id,) = self.conn.execute("SELECT next_id FROM tasks WHERE name = ?", (task,)).fetchone()
+        return str(todo_id)
+
+    def _touch(self, task, now):
+        self.conn.execute("UPDATE tasks SET updated_at = ? WHERE name = ?", (now, task))
+
+    def journal_records(self):
+        records = []
+        for seq, record in self.conn.execute("SELECT seq, record FROM journal ORDER BY seq"):
+            record = json_codec.loads(record)
+            record["seq"] = seq
+            records.append(record)
+        return records
+
+    def task_names(self):
+        return [name for (name,) in self.conn.execute("SELECT name FROM tasks ORDER BY id")]
+
+    def has_task(self, task):
+        return self.conn.execute("SELECT 1 FROM tasks WHERE name = ?", (task,)).fetchone() is not None
+
+    def task_data(self, task):
+        row = self.conn.execute("SELECT id, created_at, updated_at, next_id FROM tasks WHERE name = ?", (task,)).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "created_at": row[1], "updated_at": row[2], "next_id": row[3], "todos": self.todos(task)}
+
+    def todos(self, task, status=None, priority=None):
+        where, params = "task = ?", [task]
+        if status is not None:
+            where += " AND status = ?"
+            params.append(status)
+        if priority == "none":
+            where += " AND priority IS NULL"
+        elif priority is not None:
+            where += " AND priority = ?"
+            params.append(priority)
+        rows = self.conn.execute(f"SELECT id, {self._COLUMNS} FROM todos WHERE {where} ORDER BY id", params)
+        return {str(row[0]): _todo_from_row(row[1:]) for row in rows}
+
+    def open_todos(self, task):
+        rows = self.conn.execute("SELECT id, description FROM todos WHERE task = ? AND status != 'Done' ORDER BY id", (task,))
+        return {str(todo_id): description or "" for todo_id, description in rows}
+
+    def get_todo(self, task, todo_id):
+        if not str(todo_id).isdigit():
+            return None
+        row = self.conn.execute(f"SELECT {self._COLUMNS} FROM todos WHERE task = ? AND id = ?", (task, int(todo_id))).fetchone()
+        return _todo_from_row(row) if row else None
+
+    def count(self, task, status):
+        return self.conn.execute("SELECT COUNT(*) FROM todos WHERE task = ? AND status = ?", (task, status)).fetchone()[0]
+
+    def todo_counts(self):
+        return dict(self.conn.execute("SELECT task, COUNT(*) FROM todos GROUP BY task"))
+
+
+STORES = {"json": JsonTodoStore, "sqlite": SqliteTodoStore}
+_store = None
+
+
+def get_store():
+    """Return the process-wide todo store."""
+    global _store
+    if _store is None:
+        name = get_store_name()
+        if name not in STORES:
+            raise click.ClickException(f"Unknown {STORE_ENV} '{name}' (expected one of: {', '.join(STORES)})")
+        _store = STORES[name]()
+    return _store
+
+
+def reset_store():
+    """Forget the selected store so the next get_store() picks again (e.g. after a migration)."""
+    global _store
+    _store = None
+
+
+def migrate_json_to_sqlite(db_path=None):
+    """Copy todos.json (and its journal) into a new todos.db in one pass. Returns (tasks, todos) copied.
+
+    Rows are streamed into SQLite task by task from the parsed document. The
+    database is built under a temporary name and moved into place at the end,
+    so an interrupted migration leaves no half-filled todos.db behind.
+    """
+    db_path = db_path or TODO_DB
+    if os.path.exists(db_path):
+        raise click.ClickException(f"{db_path} already exists")
+
+    data = _read_todo_file()
+
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = connect_db(tmp_path)
+    task_count = todo_count = 0
+    try:
+        conn.execute("BEGIN")
+        for position, (name, task) in enumerate(data.get("tasks", {}).items(), start=1):
+            todos = task.get("todos", {})
+            conn.execute("INSERT INTO tasks (name, id, created_at, updated_at, next_id) VALUES (?, ?, ?, ?, ?)",
+                         (name, task.get("id", position), task.get("created_at"), task.get("updated_at"), task["next_id"]))
+            conn.executemany("INSERT INTO todos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             (_todo_row(name, todo_id, todo) for todo_id, todo in todos.items()))
+            task_count += 1
+            todo_count += len(todos)
+        conn.execute("COMMIT")
+        # Fold the WAL back in so the file can be moved on its own
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return task_count, todo_count
+
+
+@click.group()
+def store():
+    """Inspect or migrate the todo store."""
+
+
+@store.command()
+def status():
+    """Show which todo store is in use."""
+    current = get_store()
+    path = current.path if current.name == "sqlite" else TODO_FILE
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    counts = current.todo_counts()
+    click.echo(f"store:      {current.name} ({path}, {size / 1024:.1f} KiB)")
+    click.echo(f"workspaces: {len(current.task_names())}")
+    click.echo(f"todos:      {sum(counts.values())}")
+    if current.name == "json":
+        data = load_data()
+        click.echo(f"journal:    {data.get('journal_seq', 0) - data.get('snapshot_seq', 0)} records since the snapshot"
+                   f" (compacted every {COMPACT_EVERY})")
+
+
+@store.command()
+def compact():
+    """Fold the todos.json journal into a new snapshot now."""
+    current = get_store()
+    if current.name != "json":
+        raise click.ClickException(f"The {current.name} store has no journal to compact")
+    with current.transaction():
+        current.compact()
+    click.secho(f"Compacted {TODO_FILE.name}", fg="green")
+
+
+@store.command()
+@click.option('--keep-json', is_flag=True, help="Leave todos.json in place instead of renaming it")
+def migrate(keep_json):
+    """Move todos from todos.json into the SQLite store (todos.db)."""
+    from fleck.daemon import is_running
+
+    if not TODO_FILE.exists() and not JOURNAL_FILE.exists():
+        raise click.ClickException(f"Nothing to migrate: {TODO_FILE} does not exist")
+    if is_running():
+        # fleckd keeps the JSON store in memory and would write it back after the move
+        raise click.ClickException("fleckd is running; stop it first with 'fleck daemon stop'")
+
+    tasks, todos = migrate_json_to_sqlite()
+    if not keep_json:
+        for path in (TODO_FILE, JOURNAL_FILE):
+            if path.exists():
+                backup = path.with_name(path.name + ".migrated")
+                os.replace(path, backup)
+                click.echo(f"Renamed {path.name} to {backup.name}")
+    reset_store()
+    # Todo completions now come straight from todos.db
+    from fleck.completion import rebuild_index
+    rebuild_index()
+    click.secho(f"Migrated {tasks} workspaces and {todos} todos to {TODO_DB}", fg="green")
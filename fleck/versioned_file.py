@@ -0,0 +1,163 @@
+import os
+import threading
+from contextlib import contextmanager
+
+# Safe shared writes for files that several processes update at once: the
+# CLI in more than one terminal, the timer GUI, the session tracker and fleckd
+# all read-modify-write the timer shards, and every command appends to the
+# JSON todo store.
+#
+# Each file gets a sidecar "<file>.lock". Holding an advisory lock on it
+# (flock, or msvcrt.locking on Windows) serializes writers. Its first bytes
+# hold a version counter that is bumped after every write. Writes go to a
+# temp file that replaces the real one, so a crash can never leave a
+# truncated file behind. Readers compare the counter (and the file's stat)
+# with what they parsed last and skip re-parsing when nothing changed.
+
+VERSION_WIDTH = 20
+# Windows locks byte ranges; keep the locked byte clear of the version digits
+LOCK_OFFSET = 64
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_fd(fd):
+        os.lseek(fd, LOCK_OFFSET, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after ten one-second retries; keep waiting
+                continue
+
+    def _unlock_fd(fd):
+        os.lseek(fd, LOCK_OFFSET, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd):
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_fd(fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def atomic_write(path, data):
+    """Write bytes to ``path`` through a temp file in the same directory and os.replace."""
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class VersionedFile:
+    """A file updated under an inter-process lock, with a version counter for cheap change checks."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.lock_path = f"{path}.lock"
+        self._mutex = threading.RLock()
+        self._fd = None
+        self._depth = 0
+        self._key = None
+        self._data = None
+
+    @contextmanager
+    def locked(self):
+        """Hold the file's lock for the block. Reentrant within a process."""
+        with self._mutex:
+            if self._depth == 0:
+                os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+                fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    _lock_fd(fd)
+                except BaseException:
+                    os.close(fd)
+                    raise
+                self._fd = fd
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    fd, self._fd = self._fd, None
+                    try:
+                        _unlock_fd(fd)
+                    finally:
+                        os.close(fd)
+
+    def version(self):
+        """The write counter, or None if the file was never written through this class."""
+        try:
+            with open(self.lock_path, 'rb') as f:
+                return int(f.read(VERSION_WIDTH) or 0)
+        except (OSError, ValueError):
+            return None
+
+    def bump(self):
+        """Bump the version, for changes to files guarded by this lock that write() doesn't make. Hold the lock."""
+        version = (self.version() or 0) + 1
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, b"%0*d" % (VERSION_WIDTH, version))
+        return version
+
+    def read(self, parse):
+        """Return ``parse(contents)``, reusing the last result while the file is unchanged.
+
+        Callers may modify the returned data only to write it back with write().
+        """
+        # Version first: writers replace the file before bumping it, so a
+        # race can only cost an extra parse later, never a stale result
+        key = (self.version(), _stat_key(self.path))
+        if key == self._key:
+            return self._data
+        with open(self.path, 'rb') as f:
+            data = parse(f.read())
+        self._key, self._data = key, data
+        return data
+
+    def write(self, raw, data=None):
+        """Atomically replace the file with ``raw`` and bump the version.
+
+        ``data`` is the parsed form of ``raw``; passing it lets the next
+        read() in this process skip parsing.
+        """
+        with self.locked():
+            atomic_write(self.path, raw)
+            version = self.bump()
+            if data is None:
+                self._key = self._data = None
+            else:
+                self._key, self._data = (version, _stat_key(self.path)), data
+
+    def remove(self):
+        """Delete the file (if it exists) and bump the version."""
+        with self.locked():
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.bump()
+            self._key = self._data = None
+
+    def forget(self):
+        """Drop the parsed data kept from the last read() or write()."""
+        self._key = self._data = None
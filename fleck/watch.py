@@ -0,0 +1,225 @@
+import os
+import sys
+import time
+import select
+import struct
+
+import click
+
+from fleck.config import TODO_FILE, TODO_DB, JOURNAL_FILE
+
+# Live views (`fleck watch`, `fleck list --watch`, `fleck timer`) redraw every
+# second but only go back to the stores when one of their files changes.
+# ChangeWatcher waits on inotify for that where it can (Linux, through libc,
+# no extra dependency) and otherwise compares the files' stat each tick.
+# Between changes the elapsed times shown are worked out from the TimerStates
+# already in memory, so an idle dashboard reads nothing from disk.
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _inotify(directories):
+    """Return (fd, {watch descriptor: directory}) watching ``directories``, or None without inotify."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    watches = {}
+    for directory in directories:
+        wd = libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            os.close(fd)
+            return None
+        watches[wd] = directory
+    return fd, watches
+
+
+class ChangeWatcher:
+    """Wait for any of a set of files to be written, replaced or removed."""
+
+    def __init__(self, paths):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self._names = {}
+        for path in self.paths:
+            self._names.setdefault(os.path.dirname(path), set()).add(os.path.basename(path))
+        watched = _inotify(self._names)
+        if watched is None:
+            self._fd, self._watches = None, {}
+        else:
+            self._fd, self._watches = watched
+        self._stamps = [_stat_key(path) for path in self.paths]
+
+    @property
+    def mode(self):
+        return "inotify" if self._fd is not None else "stat"
+
+    def wait(self, timeout):
+        """Block for up to ``timeout`` seconds. Returns True as soon as a watched file changes."""
+        if self._fd is None:
+            time.sleep(timeout)
+            stamps = [_stat_key(path) for path in self.paths]
+            changed, self._stamps = stamps != self._stamps, stamps
+            return changed
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self._fd], [], [], remaining)[0]:
+                return False
+            if self._drain():
+                return True
+
+    def _drain(self):
+        """Read the queued events; True if one was for a watched file (not a temp file or a neighbour)."""
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+                offset += length
+                if name in self._names.get(self._watches.get(wd), ()):
+                    changed = True
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def store_paths():
+    """The files any todo store change shows up in."""
+    return [TODO_FILE, JOURNAL_FILE, TODO_DB, f"{TODO_DB}-wal"]
+
+
+def next_tick():
+    """Seconds until the next whole wall-clock second, so counters tick over together."""
+    return 1 - time.time() % 1
+
+
+def _snapshot(workspace, statuses, priority, sort):
+    """Read the workspace's todos (those with ``statuses``, or all) and its timers as TimerStates."""
+    from fleck.models import TimerState
+    from fleck.todo_store import get_store
+    from fleck.timer_utils import load_task_timers
+    from fleck.cli_new_1 import select_todos
+
+    store = get_store()
+    if statuses is None:
+        todos = store.todos(workspace, None, priority)
+    else:
+        todos = {}
+        for status in statuses:
+            todos.update(store.todos(workspace, status, priority))
+    timers = {todo_id: TimerState.from_dict(timer_info) for todo_id, timer_info in load_task_timers(workspace).items()}
+    return select_todos(todos, sort=sort), timers
+
+
+def _render(items, timers, title, now, mode):
+    from rich import box
+    from rich.table import Table
+    from fleck.cli_new_1 import Status, format_seconds, STATUS_COLORS, PRIORITY_COLORS
+
+    table = Table(title=title, box=box.ROUNDED,
+                  caption=f"[dim]{time.strftime('%H:%M:%S')} · {mode} · Ctrl+C to exit[/dim]")
+    table.add_column("ID", style="cyan", no_wrap=True)
+    table.add_column("Description")
+    table.add_column("Status")
+    table.add_column("Priority")
+    table.add_column("Time", justify="right")
+
+    for todo_id, todo in items:
+        status, priority = todo.get("status"), todo.get("priority")
+        timer = timers.get(todo_id)
+        if status in (Status.IN_PROGRESS.value, Status.PAUSED.value):
+            time_str = format_seconds(timer.elapsed_at(now)) if timer else format_seconds(0)
+            if timer and timer.is_running:
+                time_str = f"[bold green]{time_str}[/bold green]"
+        elif status == Status.DONE.value:
+            time_str = format_seconds(todo.get("time_spent") or 0)
+        else:
+            time_str = "-"
+        status_color = STATUS_COLORS.get(status, "white")
+        priority_color = PRIORITY_COLORS.get(priority, "white")
+        table.add_row(todo_id, todo.get("description", ""), f"[{status_color}]{status}[/{status_color}]",
+                      f"[{priority_color}]{priority or 'none'}[/{priority_color}]", time_str)
+    if not items:
+        table.add_row("", "[dim]Nothing to show yet[/dim]", "", "", "")
+    return table
+
+
+def live_todos(workspace, statuses=None, priority=None, sort="id", title=None):
+    """Show the workspace's todos in a rich.Live table until Ctrl+C.
+
+    The stores are re-read when their files change; in between only the
+    running timers' elapsed times move, computed from memory once a second.
+    """
+    from rich.console import Console
+    from rich.live import Live
+    from fleck.models import read_clock
+    from fleck.timer_utils import timer_shard_path
+
+    title = title or f"Todos for Task: {workspace}"
+    with ChangeWatcher([*store_paths(), timer_shard_path(workspace)]) as watcher:
+        items, timers = _snapshot(workspace, statuses, priority, sort)
+        try:
+            with Live(_render(items, timers, title, read_clock(), watcher.mode),
+                      console=Console(), auto_refresh=False, transient=False) as live:
+                while True:
+                    changed = watcher.wait(next_tick())
+                    if changed:
+                        items, timers = _snapshot(workspace, statuses, priority, sort)
+                    if changed or any(timer.is_running for timer in timers.values()):
+                        live.update(_render(items, timers, title, read_clock(), watcher.mode), refresh=True)
+        except KeyboardInterrupt:
+            pass
+
+
+@click.command()
+@click.option('-w', '--workspace', help="Workspace to watch (default: the current one)")
+@click.option('--priority', type=click.Choice(["high", "medium", "low", "none"]), default=None,
+              help="Only todos with this priority")
+@click.option('--sort', type=click.Choice(["id", "created", "priority", "status"]), default="status",
+              help="Sort order")
+def watch(workspace, priority, sort):
+    """Live dashboard of the running and paused todos in the workspace."""
+    from fleck.config import get_current_workspace
+    from fleck.cli_new_1 import Status
+
+    workspace = workspace or get_current_workspace()
+    if not workspace:
+        click.secho("No active task. Use 'start <task_name>' to begin.", fg="red")
+        return
+    live_todos(workspace, (Status.IN_PROGRESS.value, Status.PAUSED.value), priority, sort,
+               title=f"Running and paused in {workspace}")
@@ -0,0 +1,428 @@
+import sys
+import time
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+import click
+from rich.table import Table
+from rich import box
+
+from fleck.session_manager import (
+    save_session,
+    load_session,
+    restore_session,
+    session_files,
+    iter_sessions,
+    delete_session,
+    get_session_summary
+)
+from fleck.config import SESSIONS_DIR, get_current_workspace
+from fleck import metrics
+from fleck import json_codec
+from fleck.platform_backend import get_backend
+from fleck.completion import complete_workspaces, remove_workspace
+from fleck.cli_new_1 import console, echo_json_rows
+from fleck.todo_store import get_store
+from fleck.timer_utils import get_timer_statuses, remove_task_timers
+
+# Workspace/session commands live here so that `fleck add`, `fleck list` and
+# friends never import the Windows, COM, git or HTTP stacks. They are wired into
+# the CLI through LazyGroup in cli_new_1.
+
+
+@click.command()
+# @click.argument('task_name')
+def save():
+    """Save the current workspace for a specific task."""
+    current_workspace = get_current_workspace()
+    with console.status(f"Saving workspace for task '{current_workspace}'...", spinner="dots"):
+        success, message = save_session(current_workspace)
+
+    if success:
+        console.print(f"[green]✓[/green] {message}")
+    else:
+        console.print(f"[red]✗[/red] {message}")
+
+@click.command()
+@click.argument('task_name', shell_complete=complete_workspaces)
+def restore(task_name):
+    """Restore a saved workspace for a specific task."""
+    # Check if session exists first
+    session_data = load_session(task_name)
+    if not session_data:
+        console.print(f"[red]✗[/red] No saved workspace found for task: {task_name}")
+        return
+
+    # Show summary before restoring
+    display_summary(task_name)
+
+    if click.confirm(f"Do you want to restore the workspace for '{task_name}'?"):
+        with console.status(f"Restoring workspace for task '{task_name}'...", spinner="dots"):
+            success, message = restore_session(task_name)
+
+        if success:
+            console.print(f"[green]✓[/green] {message}")
+        else:
+            console.print(f"[red]✗[/red] {message}")
+
+def get_gui_pids():
+    """Get the PIDs of all top-level visible GUI windows."""
+    return get_backend().gui_pids()
+
+
+def kill_only_gui_apps(exclude_names=None, dry_run=True):
+    backend = get_backend()
+    exclude_names = set(name.lower() for name in (exclude_names or []))
+    gui_pids = get_gui_pids()
+
+    for proc in backend.processes():
+        name = proc['name'].lower()
+        pid = proc['pid']
+
+        if name in exclude_names or pid not in gui_pids:
+            continue
+
+        if dry_run:
+            print(f"[Dry Run] Would kill GUI app: {name} (PID: {pid})")
+        elif backend.kill_process(pid):
+            print(f"Killed GUI app: {name} (PID: {pid})")
+
+
+@click.command()
+@click.argument('task_name', shell_complete=complete_workspaces)
+def focus(task_name):
+    """Enter Focus Mode: Close all apps and restore workspace for the given task."""
+    session_data = load_session(task_name)
+    if not session_data:
+        console.print(f"[red]✗[/red] No saved workspace found for task: {task_name}")
+        return
+
+    display_summary(task_name)
+    if click.confirm(f"Do you want to enter focus mode for '{task_name}'?"):
+        # with console.status(f"[yellow]Closing apps and restoring workspace for '{task_name}'...[/yellow]", spinner="dots"):
+            # Define processes to exclude (system critical + Python + this script)
+            exclude = ['explorer.exe', 'python.exe', 'code.exe', 'cmd.exe', 'powershell.exe','brave.exe',"fleck.exe"]  # Add more if needed
+
+            kill_only_gui_apps(exclude,False)
+            print("works")
+            switch_helper(task_name)
+            # success, message = switch_helper(task_name)
+
+            # if success:
+            #     console.print(f"[green]✓[/green] {message}")
+            # else:
+            #     console.print(f"[red]✗[/red] {message}")
+
+
+@click.command()
+@click.option('--sort', type=click.Choice(["name", "saved", "todos"]), default="name",
+              help="Sort by name, most recently saved, or most todos")
+@click.option('--limit', type=click.IntRange(min=0), default=None, help="Show at most N workspaces")
+@click.option('--offset', type=click.IntRange(min=0), default=0, help="Skip the first N workspaces")
+@click.option('--json', 'as_json', is_flag=True, help="Print a JSON array instead of a table")
+@click.option('--ndjson', is_flag=True, help="Print one JSON object per line")
+def tasks(sort, limit, offset, as_json, ndjson):
+    """List all available tasks."""
+    if as_json and ndjson:
+        raise click.UsageError("--json and --ndjson are mutually exclusive.")
+
+    current_workspace = get_current_workspace()
+    todo_counts = get_store().todo_counts()
+    # One read of the timer file for every workspace on the page
+    timers = get_timer_statuses()
+
+    files = session_files(sort, todo_counts)
+    page = files[offset:None if limit is None else offset + limit]
+    rows = (
+        dict(task_data, current=task_data["name"] == current_workspace, todo_count=todo_counts.get(task_data["name"], 0),
+             running_timers=sum(status["is_running"] for status in timers.get(task_data["name"], {}).values()))
+        for task_data in iter_sessions(page, start_id=offset + 1)
+    )
+
+    # Machine-readable output streams rows straight through, without rich
+    if as_json or ndjson:
+        echo_json_rows(rows, ndjson=ndjson)
+        return
+
+    if not files:
+        console.print("[yellow]No saved workspaces found.[/yellow]")
+        return
+
+    table = Table(title="Saved Workspaces", box=box.ROUNDED)
+    table.add_column("ID")
+    table.add_column("Task", style="cyan")
+    table.add_column("Last Saved", style="green")
+    table.add_column("Apps", justify="right")
+    table.add_column("Chrome Tabs", justify="right")
+    table.add_column("Brave Tabs", justify="right")
+    table.add_column("Edge Tabs", justify="right")
+    table.add_column("Folders", justify="right")
+    table.add_column("Todo Count", justify="right")
+    table.add_column("Running", justify="right")
+
+    for task_data in rows:
+        task_name_raw = task_data["name"]
+
+        # Highlight current workspace
+        task_name_display = (
+            f"[bold green]{task_name_raw} (current)[/bold green]"
+            if task_data["current"] else task_name_raw
+        )
+
+        timestamp = "Unknown"
+        if task_data.get("timestamp"):
+            try:
+                dt = datetime.fromisoformat(task_data["timestamp"])
+                timestamp = dt.strftime("%Y-%m-%d %H:%M:%S")
+            except Exception:
+                pass
+
+        table.add_row(
+            str(task_data.get("id", "-")),
+            task_name_display,
+            str(timestamp),
+            str(task_data.get("app_count", 0)),
+            str(task_data.get("chrome_tabs", 0)),
+            str(task_data.get("brave_tabs", 0)),
+            str(task_data.get("edge_tabs", 0)),
+            str(task_data.get("explorer", 0)),
+            str(task_data["todo_count"]),
+            str(task_data["running_timers"] or "")
+        )
+
+    console.print(table)
+    if len(page) < len(files):
+        console.print(f"[dim]Showing {len(page)} of {len(files)} workspaces[/dim]")
+
+
+@click.command()
+def delete_workspace():
+    """Delete a saved workspace."""
+    current_workspace = get_current_workspace()
+    # sessions_dir = Path(__file__).parent / "data" / "sessions"
+    sessions_dir = SESSIONS_DIR
+    current_file = sessions_dir / "current_session.json"
+
+    if click.confirm(f"Are you sure you want to delete the workspace for '{current_workspace}'?"):
+        success, message = delete_session(current_workspace)
+
+        if success:
+            # Clear current session
+            json_codec.write(current_file, {"current": ""})
+
+            # Remove from the todo store
+            if get_store().delete_task(current_workspace):
+                console.print(f"[green]✓[/green] Removed '{current_workspace}' from the todo store")
+            else:
+                console.print(f"[yellow]⚠[/yellow] Workspace not found in the todo store")
+
+            remove_workspace(current_workspace)
+            remove_task_timers(current_workspace)
+
+            console.print(f"[green]✓[/green] {message}")
+        else:
+            console.print(f"[red]✗[/red] {message}")
+
+
+@click.command()
+# @click.argument('task_name')
+def show():
+    """Show details of a saved workspace."""
+    display_summary(get_current_workspace())
+
+@click.command()
+# @click.argument('task_name')
+def gui():
+    """Open the workspace in the GUI viewer."""
+    current_workspace = get_current_workspace()
+    # Check if the session exists
+    session_data = load_session(current_workspace)
+    if not session_data:
+        console.print(f"[red]✗[/red] No saved workspace found for task: {current_workspace}")
+        return
+
+    # Get the path to the workspace_gui.py file
+    workspace_gui_path = Path(__file__).parent / "workspace_gui.py"
+
+    if not workspace_gui_path.exists():
+        console.print(f"[red]✗[/red] Workspace GUI not found at: {workspace_gui_path}")
+        return
+
+    # Launch the GUI
+    try:
+        subprocess.Popen([sys.executable, str(workspace_gui_path), current_workspace])
+        console.print(f"[green]✓[/green] Launched workspace viewer for '{current_workspace}'")
+    except Exception as e:
+        console.print(f"[red]✗[/red] Failed to launch workspace viewer: {e}")
+
+def display_summary(task_name):
+    """Display a summary of a workspace."""
+    summary = get_session_summary(task_name)
+
+    if not summary:
+        console.print(f"[red]✗[/red] No saved workspace found for task: {task_name}")
+        return
+
+    # Format timestamp
+    timestamp = "Unknown"
+    if summary.timestamp:
+        try:
+            dt = datetime.fromisoformat(summary.timestamp)
+            timestamp = dt.strftime("%Y-%m-%d %H:%M:%S")
+        except:
+            pass
+
+    # Print summary header
+    console.print(f"\n[bold cyan]Workspace Summary for '{task_name}'[/bold cyan]")
+    console.print(f"[dim]Last saved: {timestamp}[/dim]\n")
+
+    # Applications table
+    if summary.applications:
+        app_table = Table(title="Applications", box=box.SIMPLE)
+        app_table.add_column("Name", style="green")
+        app_table.add_column("Window Title")
+
+        for app in summary.applications:
+            app_table.add_row(app.name, app.title)
+
+        console.print(app_table)
+    else:
+        console.print("[yellow]No applications saved in this workspace.[/yellow]")
+
+    # Chrome tabs table
+    if summary.chrome_tabs:
+        chrome_table = Table(title="Chrome Tabs", box=box.SIMPLE)
+        chrome_table.add_column("Title", style="blue")
+        # chrome_table.add_column("URL", style="cyan")
+
+        for tab in summary.chrome_tabs:
+            url = tab.url or ""
+            title = tab.title or "No Title"
+            # chrome_table.add_row(f"[link={url}]{title}[/link]", url)
+            chrome_table.add_row(f"[link={url}]{title}[/link]")
+
+        console.print(chrome_table)
+
+    # Brave tabs table
+    if summary.brave_tabs:
+        brave_table = Table(title="Brave Tabs", box=box.SIMPLE)
+        brave_table.add_column("Title", style="orange1")
+        # brave_table.add_column("URL", style="cyan")
+
+        for tab in summary.brave_tabs:
+            url = tab.url or ""
+            title = tab.title or "No Title"
+            # brave_table.add_row(f"[link={url}]{title}[/link]", url)
+            brave_table.add_row(f"[link={url}]{title}[/link]")
+
+        console.print(brave_table)
+    else:
+        console.print("[yellow]No Brave tabs saved in this workspace.[/yellow]")
+
+    console.print("")
+
+    if summary.edge_tabs:
+        edge_table = Table(title="Edge Tabs", box=box.SIMPLE)
+        edge_table.add_column("Title", style="orange1")
+        # edge_table.add_column("URL", style="cyan")
+
+        for tab in summary.edge_tabs:
+            url = tab.url or ""
+            title = tab.title or "No Title"
+            # edge_table.add_row(f"[link={url}]{title}[/link]", url)
+            edge_table.add_row(f"[link=${url}]{title}[/link]")
+
+        console.print(edge_table)
+    else:
+        console.print("[yellow]No Edge tabs saved in this workspace.[/yellow]")
+
+    console.print("")
+
+    if summary.explorer:
+        explorer_table = Table(title="File Explorer",box=box.SIMPLE)
+        explorer_table.add_column("Folder",style="magenta")
+        explorer_table.add_column("Path",style="cyan")
+
+        for tab in summary.explorer:
+            path = tab.path
+            title = tab.title
+            explorer_table.add_row(title,path)
+        console.print(explorer_table)
+    else:
+        console.print("[yellow]No files saved in this workspace.[/yellow]")
+
+    console.print("")  # Add a blank line at the end
+
+
+@click.command()
+# @click.argument('task_name')
+def track_session():
+    """Start session tracking (app + browser tab) with auto-browser launch"""
+    from fleck.session_tracker import start_session_tracking
+
+    click.echo("🚀 Starting session tracking...")
+    start_session_tracking(get_current_workspace())
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        click.echo("🛑 Session tracking stopped.")
+
+
+def switch_helper(workspace_name):
+    with metrics.run("switch"):
+        _switch(workspace_name)
+
+
+def _switch(workspace_name):
+    # sessions_dir = Path(__file__).parent / "data" / "sessions"
+    sessions_dir = SESSIONS_DIR
+    session_path = sessions_dir / f"{workspace_name}.json"
+    current_file = sessions_dir / "current_session.json"
+
+    if not session_path.exists():
+        console.print(f"[red]✗ Workspace '{workspace_name}' does not exist.[/red]")
+        return
+
+    # Save current session if exists and confirmed
+    if current_file.exists():
+        current_data = json_codec.read(current_file)
+        current_workspace = current_data.get("current", "")
+
+        # if current_workspace and current_workspace != workspace_name:
+        # Prompts get their own span so `fleck perf` can tell user wait time from real work
+        with metrics.span("switch.prompt"):
+            save_first = click.confirm(f"Do you want to save the current workspace '{current_workspace}' before switching?")
+        if save_first:
+                success, msg = save_session(current_workspace)  # Assuming this returns (bool, str)
+                if success:
+                    console.print(f"[green]✓[/green] {msg}")
+                else:
+                    console.print(f"[red]✗[/red] Failed to save: {msg}")
+
+    # Set new current workspace
+    json_codec.write(current_file, {"current": workspace_name})
+    console.print(f"[blue]→ Switched to workspace:[/blue] '{workspace_name}'")
+
+    # Display and optionally restore
+    with metrics.span("switch.summary"):
+        display_summary(workspace_name)
+    with metrics.span("switch.prompt"):
+        restore = click.confirm(f"Do you want to restore the workspace for '{workspace_name}'?")
+    if restore:
+        with console.status(f"Restoring workspace '{workspace_name}'...", spinner="dots"):
+            success, message = restore_session(workspace_name)
+        if success:
+            console.print(f"[green]✓[/green] {message}")
+        else:
+            console.print(f"[red]✗[/red] {message}")
+    else:
+        console.print(f"[yellow]⚠ Workspace switched but not restored.[/yellow]")
+
+
+@click.command()
+@click.argument("workspace_name", shell_complete=complete_workspaces)
+def switch(workspace_name):
+    """Switch to another workspace and restore its session."""
+    switch_helper(workspace_name)
@@ -1,7 +1,6 @@
 import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 from pathlib import Path
 from datetime import datetime
 
@@ -47,7 +46,7 @@ class WorkspaceViewer(tk.Tk):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Applications")
         
-        apps = self.session_data.get("applications", [])
+        apps = self.session_data.applications
         
         # Create treeview
         columns = ("name", "title", "path")
@@ -66,9 +65,9 @@ class WorkspaceViewer(tk.Tk):
         # Add data
         for app in apps:
             tree.insert("", "end", values=(
-                app.get("name", ""),
-                app.get("title", ""),
-                app.get("path", "")
+                app.name or "",
+                app.title or "",
+                app.path or ""
             ))
         
         # Add scrollbar
@@ -83,7 +82,7 @@ class WorkspaceViewer(tk.Tk):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Chrome Tabs")
         
-        tabs = self.session_data.get("chrome_tabs", [])
+        tabs = self.session_data.chrome_tabs
         
         # Create treeview
         columns = ("title", "url")
@@ -100,8 +99,8 @@ class WorkspaceViewer(tk.Tk):
         # Add data
         for tab_data in tabs:
             tree.insert("", "end", values=(
-                tab_data.get("title", ""),
-                tab_data.get("url", "")
+                tab_data.title or "",
+                tab_data.url or ""
             ))
         
         # Add scrollbar
@@ -116,7 +115,7 @@ class WorkspaceViewer(tk.Tk):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Brave Tabs")
         
-        tabs = self.session_data.get("brave_tabs", [])
+        tabs = self.session_data.brave_tabs
         
         # Create treeview
         columns = ("title", "url")
@@ -133,8 +132,8 @@ class WorkspaceViewer(tk.Tk):
         # Add data
         for tab_data in tabs:
             tree.insert("", "end", values=(
-                tab_data.get("title", ""),
-                tab_data.get("url", "")
+                tab_data.title or "",
+                tab_data.url or ""
             ))
         
         # Add scrollbar
@@ -149,7 +148,7 @@ class WorkspaceViewer(tk.Tk):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="Edge Tabs")
         
-        tabs = self.session_data.get("edge_tabs", [])
+        tabs = self.session_data.edge_tabs
         
         # Create treeview
         columns = ("title", "url")
@@ -166,8 +165,8 @@ class WorkspaceViewer(tk.Tk):
         # Add data
         for tab_data in tabs:
             tree.insert("", "end", values=(
-                tab_data.get("title", ""),
-                tab_data.get("url", "")
+                tab_data.title or "",
+                tab_data.url or ""
             ))
         
         # Add scrollbar
@@ -182,7 +181,7 @@ class WorkspaceViewer(tk.Tk):
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="File Explorer Tabs")
         
-        tabs = self.session_data.get("explorer", [])
+        paths = self.session_data.explorer
         
         # Create treeview
         columns = ("title", "path")
@@ -197,10 +196,10 @@ class WorkspaceViewer(tk.Tk):
         tree.column("path", width=450)
         
         # Add data
-        for tab_data in tabs:
+        for path in paths:
             tree.insert("", "end", values=(
-                tab_data.get("title", ""),
-                tab_data.get("url", "")
+                path.title or "",
+                path.path or ""
             ))
         
         # Add scrollbar
@@ -220,17 +219,17 @@ class WorkspaceViewer(tk.Tk):
         summary_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Get counts
-        app_count = len(self.session_data.get("applications", []))
-        chrome_count = len(self.session_data.get("chrome_tabs", []))
-        brave_count = len(self.session_data.get("brave_tabs", []))
-        exp_count = len(self.session_data.get("explorer",[]))
-        edge_count = len(self.session_data.get("edge_tabs",[]))
+        app_count = len(self.session_data.applications)
+        chrome_count = len(self.session_data.chrome_tabs)
+        brave_count = len(self.session_data.brave_tabs)
+        exp_count = len(self.session_data.explorer)
+        edge_count = len(self.session_data.edge_tabs)
         
         # Format timestamp
         timestamp = "Unknown"
-        if self.session_data.get("timestamp"):
+        if self.session_data.timestamp:
             try:
-                dt = datetime.fromisoformat(self.session_data["timestamp"])
+                dt = datetime.fromisoformat(self.session_data.timestamp)
                 timestamp = dt.strftime("%Y-%m-%d %H:%M:%S")
             except:
                 pass
@@ -264,4 +263,6 @@ def main():
     app.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    from fleck import profiling
+    with profiling.from_env("workspace-gui"):
+        main()
\ No newline at end of file
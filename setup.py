@@ -4,6 +4,7 @@ setup(
     name="fleck",
     version="0.1",
     packages=["fleck"],
+    python_requires=">=3.10",  # slotted dataclasses in fleck/models.py
     install_requires=[
         'appdirs==1.4.4',
         'click==8.1.8',
@@ -15,9 +16,16 @@ setup(
         'pywin32==310',        # Only needed if you're doing Windows-specific automation
         'rich==14.0.0'
     ],
+    extras_require={
+        # Faster JSON for the todo, timer and session stores (see fleck/json_codec.py)
+        'fast': ['orjson>=3.8'],
+        # Vectorized `fleck report` (see fleck/report.py)
+        'report': ['numpy>=1.22'],
+    },
     entry_points={
         "console_scripts": [
-            "fleck = fleck.cli_new_1:cli",
+            "fleck = fleck.client:main",
+            "fleckd = fleck.daemon:main",
             # "fleck = fleck.cli:cli",
         ],
     },
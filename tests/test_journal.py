@@ -0,0 +1,57 @@
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+from fleck.journal import append_journal, read_journal
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def record(seq):
+    return {"op": "put", "task": "demo", "id": str(seq), "todo": {"description": f"todo {seq}"}, "before": None, "seq": seq}
+
+
+def test_append_after_torn_tail_keeps_every_record(tmp_path):
+    path = tmp_path / "todos.journal"
+    append_journal(path, [record(1), record(2)])
+    with open(path, 'ab') as f:
+        f.write(b'{"op":"put","task":"demo","id":"9","tod')
+
+    append_journal(path, [record(3)])
+    append_journal(path, [record(4)])
+
+    assert [r["seq"] for r in read_journal(path)] == [1, 2, 3, 4]
+    assert path.read_bytes().endswith(b"\n")
+
+
+def test_read_skips_a_damaged_line(tmp_path):
+    path = tmp_path / "todos.journal"
+    path.write_bytes(b"".join(json.dumps(record(seq)).encode() + b"\n" for seq in (1, 2))
+                     + b"not json\n" + json.dumps(record(3)).encode() + b"\n")
+
+    assert [r["seq"] for r in read_journal(path)] == [1, 2, 3]
+
+
+def fleck(data_dir, *args):
+    env = dict(os.environ, FLECK_DATA_DIR=str(data_dir), FLECK_NO_DAEMON="1", FLECK_STORE="json",
+               PYTHONPATH=str(REPO_ROOT))
+    result = subprocess.run([sys.executable, "-m", "fleck", *args], capture_output=True, text=True, env=env)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_store_writes_after_torn_tail_are_not_lost(tmp_path):
+    fleck(tmp_path, "create", "demo")
+    fleck(tmp_path, "add", "one")
+    with open(tmp_path / "todos.journal", 'ab') as f:
+        f.write(b'{"op":"put","task":"demo","id":"9","tod')
+
+    fleck(tmp_path, "add", "two")
+    fleck(tmp_path, "add", "three")
+
+    todos = json.loads(fleck(tmp_path, "list", "--json"))
+    assert [(todo["id"], todo["description"]) for todo in todos] == [("1", "one"), ("2", "two"), ("3", "three")]
+    seqs = [r["seq"] for r in read_journal(tmp_path / "todos.journal")]
+    assert seqs == sorted(set(seqs))